@@ -0,0 +1,34 @@
+"""
+Reference implementations the optimized report code is measured and tested against.
+"""
+import pandas as pd
+
+
+def normalize_rows_loop(df):
+    """
+    The original row-by-row normalization loop, the reference `normalize_work_orders` must
+    match. Timed by the 'normalize' benchmark and compared against in the tests.
+    """
+    # Initialize lists to store normalized data
+    normalized_rows = []
+
+    for _, row in df.iterrows():
+        # Split the multiple values
+        work_types = str(row['Work Types']).split('|') if pd.notna(row['Work Types']) else []
+        statuses = str(row['Statuses']).split('|') if pd.notna(row['Statuses']) else []
+        claimed_by = str(row['Claimed By']).split('|') if pd.notna(row['Claimed By']) else []
+
+        # Ensure claimed_by list is as long as work_types by padding with None
+        claimed_by.extend([None] * (len(work_types) - len(claimed_by)))
+
+        # Create a new row for each work type
+        for i, work_type in enumerate(work_types):
+            new_row = row.copy()
+            new_row['Work Types'] = work_type.strip()
+            new_row['Statuses'] = statuses[i].strip() if i < len(statuses) else None
+            new_row['Claimed By'] = claimed_by[i].strip() if claimed_by[i] else None
+
+            normalized_rows.append(new_row)
+
+    # Create a new DataFrame from the normalized rows
+    return pd.DataFrame(normalized_rows, columns=df.columns)
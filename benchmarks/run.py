@@ -0,0 +1,223 @@
+"""
+Benchmark the report jobs on synthetic exports and emit machine-readable results.
+
+Each measurement runs in a fresh process, so peak RSS is not inflated by earlier runs.
+Python-level peak allocations (tracemalloc) are only recorded with --tracemalloc, since
+tracing slows pandas down enough to distort the timings.
+
+The 'cleanup_scaling' job runs the sharded cleanup with 1, 2, 4, ... up to
+--max-workers processes (default: every core) and reports the speedup over one worker.
+The 'write' job does the same for the report writer's block formatting, against a
+single DataFrame.to_csv call.
+
+Usage:
+    python -m benchmarks.run --scales 10k 100k 1m --output results.json
+    python -m benchmarks.run --scales 1m --jobs cleanup_scaling --max-workers 16
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_export, generate_snapshot_pair
+from reports.instrumentation import peak_rss_bytes
+
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+JOBS = ['normalize', 'cleanup', 'cleanup_streaming', 'cleanup_scaling', 'weekly', 'write']
+
+# Rows per chunk for the streaming cleanup benchmark
+STREAMING_CHUNKSIZE = 100_000
+
+# The row-by-row reference loop is only timed up to this many rows
+LOOP_MAX_ROWS = 100_000
+
+
+def _timed(trace, function, *args, **kwargs):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    stats = {'wall_seconds': round(time.perf_counter() - start, 4)}
+    if trace:
+        stats['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, stats
+
+
+def _worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    return counts + [max_workers] if max_workers > 1 else counts
+
+
+def _job_output_to_stderr():
+    # The jobs print progress, from this process and from the workers it starts (which
+    # inherit its file descriptors); stdout is kept for the JSON report alone
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+
+def _measure(job, rows, workdir, trace, max_workers=None):
+    """
+    Run one job at one scale. Called in a fresh process.
+    """
+    from benchmarks.reference import normalize_rows_loop
+    from reports import csv_cleanup, weekly_report, writer
+
+    raw_file = os.path.join(workdir, f'raw_{rows}.csv')
+    measurement = {'job': job, 'rows': rows}
+
+    if job == 'normalize':
+        df = pd.read_csv(raw_file)
+        result, stats = _timed(trace, csv_cleanup.normalize_work_orders, df)
+        measurement.update(stats, output_rows=len(result))
+        if rows <= LOOP_MAX_ROWS:
+            reference, loop_stats = _timed(False, normalize_rows_loop, df)
+            measurement['loop_wall_seconds'] = loop_stats['wall_seconds']
+            measurement['speedup'] = round(loop_stats['wall_seconds'] / max(stats['wall_seconds'], 1e-9), 1)
+            # Both paths must write the same CSV
+            sort = csv_cleanup.SORT_COLUMNS
+            measurement['parity'] = (
+                result.sort_values(sort).to_csv(index=False) == reference.sort_values(sort).to_csv(index=False)
+            )
+
+    elif job in ('cleanup', 'cleanup_streaming'):
+        chunksize = STREAMING_CHUNKSIZE if job == 'cleanup_streaming' else None
+        output_file = os.path.join(workdir, f'{job}_{rows}.csv')
+        _, stats = _timed(trace, csv_cleanup.generate_csv_cleanup, raw_file, chunksize=chunksize,
+                          use_cache=False, output_file=output_file)
+        measurement.update(stats, output_rows=len(pd.read_csv(output_file, usecols=[0])))
+
+    elif job == 'cleanup_scaling':
+        # Shard every input, however small, so each worker count really uses that many processes
+        csv_cleanup.MIN_SHARD_BYTES = 1
+        runs = []
+        for workers in _worker_counts(max_workers or os.cpu_count() or 1):
+            output_file = os.path.join(workdir, f'{job}_{rows}_{workers}.csv')
+            _, stats = _timed(trace, csv_cleanup.generate_csv_cleanup, raw_file, use_cache=False,
+                              output_file=output_file, workers=workers)
+            with open(output_file, 'rb') as output:
+                content = output.read()
+            if not runs:
+                reference, single_worker_seconds = content, stats['wall_seconds']
+            runs.append(dict(
+                stats, workers=workers, parity=content == reference,
+                speedup=round(single_worker_seconds / max(stats['wall_seconds'], 1e-9), 2),
+            ))
+        measurement['scaling'] = runs
+
+    elif job == 'weekly':
+        old_file = os.path.join(workdir, f'clean_old_{rows}.csv')
+        new_file = os.path.join(workdir, f'clean_new_{rows}.csv')
+        outputs, stats = _timed(trace, weekly_report.generate_weekly_report, old_file, new_file,
+                                use_cache=False, output_dir=workdir, label=str(rows))
+        measurement.update(stats)
+        measurement['output_rows'] = [len(pd.read_csv(path, usecols=[0])) for path in outputs]
+
+    elif job == 'write':
+        # Output stage alone: one DataFrame.to_csv call against the writer with 1, 2, 4, ... processes
+        df = pd.read_csv(os.path.join(workdir, f'clean_new_{rows}.csv'), dtype=str)
+        reference_file = os.path.join(workdir, f'write_reference_{rows}.csv')
+        _, reference_stats = _timed(False, df.to_csv, reference_file, index=False, quoting=csv.QUOTE_ALL)
+        measurement['to_csv_wall_seconds'] = reference_stats['wall_seconds']
+        with open(reference_file, 'rb') as reference:
+            reference = reference.read()
+        # Format in worker processes at any size, so each worker count really uses that many
+        writer.PARALLEL_FORMAT_MIN_ROWS = 0
+        runs = []
+        for workers in _worker_counts(max_workers or os.cpu_count() or 1):
+            output_file = os.path.join(workdir, f'{job}_{rows}_{workers}.csv')
+            # Each run starts its own pool, as a job writing a single report does
+            _, stats = _timed(trace, writer.write_report, df, output_file, quoting=csv.QUOTE_ALL, workers=workers)
+            with open(output_file, 'rb') as output:
+                content = output.read()
+            if not runs:
+                single_worker_seconds = stats['wall_seconds']
+            runs.append(dict(
+                stats, workers=workers, parity=content == reference,
+                speedup=round(single_worker_seconds / max(stats['wall_seconds'], 1e-9), 2),
+            ))
+        measurement['scaling'] = runs
+        measurement['output_rows'] = len(df)
+
+    measurement['max_rss_bytes'] = peak_rss_bytes()
+    return measurement
+
+
+def prepare_inputs(rows, workdir, seed):
+    """
+    Write the raw export and cleaned old/new snapshots for one scale.
+    """
+    from reports.csv_cleanup import SORT_COLUMNS, normalize_work_orders
+
+    generate_export(rows, seed=seed).to_csv(os.path.join(workdir, f'raw_{rows}.csv'), index=False)
+    old, new = generate_snapshot_pair(rows, seed=seed)
+    for name, raw in (('old', old), ('new', new)):
+        cleaned = normalize_work_orders(raw).sort_values(SORT_COLUMNS)
+        cleaned.to_csv(os.path.join(workdir, f'clean_{name}_{rows}.csv'), index=False)
+
+
+def run_benchmarks(scales, jobs, workdir, seed=0, trace=False, max_workers=None):
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for scale in scales:
+        rows = SCALES[scale]
+        prepare_inputs(rows, workdir, seed)
+        for job in jobs:
+            # Executor workers may start processes of their own (multiprocessing.Pool workers may not)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                     initializer=_job_output_to_stderr) as executor:
+                measurement = executor.submit(_measure, job, rows, workdir, trace, max_workers).result()
+            print(json.dumps(measurement), file=sys.stderr)
+            results.append(measurement)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['10k', '100k'])
+    parser.add_argument('--jobs', nargs='+', choices=JOBS, default=JOBS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tracemalloc', action='store_true', help="Also record peak Python allocations")
+    parser.add_argument('--max-workers', type=int, default=None,
+                        help="Largest worker count for cleanup_scaling and write (default: number of CPU cores)")
+    parser.add_argument('--output', help="Write results JSON here instead of stdout")
+    parser.add_argument('--workdir', help="Keep generated inputs and outputs in this directory")
+    args = parser.parse_args(argv)
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run_benchmarks(args.scales, args.jobs, args.workdir, args.seed, args.tracemalloc,
+                                 args.max_workers)
+    else:
+        with tempfile.TemporaryDirectory(prefix='ccr_bench_') as workdir:
+            results = run_benchmarks(args.scales, args.jobs, workdir, args.seed, args.tracemalloc, args.max_workers)
+
+    report = {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark how long the GUI takes to start, with an import-time breakdown.
+
+Each run launches the app with the startup probe on. The app prints when its window is
+shown, when the first paint has happened, and when the report modules (pandas, numpy)
+have finished loading in the background, then quits. The wall time to each event is
+measured from process launch, so interpreter and bootloader start-up are included.
+
+The import breakdown comes from CPython's `-X importtime` (`PYTHONPROFILEIMPORTTIME` for
+a frozen build; if the bootloader ignores it, the frozen breakdown is left empty).
+
+Usage:
+    python -m benchmarks.startup --runs 5 --output startup.json
+    python -m benchmarks.startup --executable dist/main/main.exe --runs 5
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+MAIN_SCRIPT = Path(__file__).resolve().parent.parent / 'main.py'
+
+# Must match main.STARTUP_PROBE_ENV; main is not imported here, it would load PyQt6
+STARTUP_PROBE_ENV = 'CRISIS_CLEANUP_STARTUP_PROBE'
+
+# Number of modules listed in the import-time breakdown
+TOP_IMPORTS = 25
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)\s*$')
+
+
+def _command(executable):
+    if executable:
+        return [executable]
+    return [sys.executable, str(MAIN_SCRIPT)]
+
+
+def _environment(import_time, offscreen):
+    env = dict(os.environ, **{STARTUP_PROBE_ENV: '1'})
+    if import_time:
+        env['PYTHONPROFILEIMPORTTIME'] = '1'
+    if offscreen:
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+    return env
+
+
+def run_once(executable=None, import_time=False, offscreen=False, timeout=120):
+    """
+    Start the app once and time each startup event.
+
+    Returns:
+    dict: Wall seconds from launch to each event as seen from outside ('wall'), the
+    app's own timings ('in_process'), and the raw -X importtime lines when requested
+
+    Raises:
+    TimeoutError: If the app has not exited `timeout` seconds after launch
+    """
+    started = time.perf_counter()
+    # stderr goes to a file: -X importtime writes more than a pipe buffer holds, and an
+    # undrained pipe would block the app while stdout is being read
+    with tempfile.TemporaryFile('w+', encoding='utf-8', errors='replace') as stderr_file:
+        process = subprocess.Popen(
+            _command(executable), env=_environment(import_time, offscreen),
+            stdout=subprocess.PIPE, stderr=stderr_file, text=True,
+        )
+        # The deadline covers the whole run, reading stdout included
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            process.kill()
+
+        deadline = threading.Timer(timeout, expire)
+        deadline.start()
+        wall, in_process = {}, {}
+        try:
+            for line in process.stdout:
+                try:
+                    mark = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(mark, dict) and 'event' in mark:
+                    wall[mark['event']] = round(time.perf_counter() - started, 4)
+                    in_process[mark['event']] = mark['seconds']
+            process.wait()
+        finally:
+            deadline.cancel()
+            process.stdout.close()
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+
+    if timed_out.is_set():
+        raise TimeoutError(f"App did not exit within {timeout} seconds:\n{stderr[-2000:]}")
+    if process.returncode:
+        raise RuntimeError(f"App exited with code {process.returncode}:\n{stderr[-2000:]}")
+    return {'wall': wall, 'in_process': in_process, 'importtime': stderr.splitlines() if import_time else []}
+
+
+def import_breakdown(lines, top=TOP_IMPORTS):
+    """
+    Summarise -X importtime output.
+
+    Returns:
+    dict: Seconds spent in each top-level package's own modules, and the slowest modules
+    """
+    modules = []
+    for line in lines:
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us)))
+
+    packages = {}
+    for name, self_us, _ in modules:
+        package = name.split('.', 1)[0]
+        packages[package] = packages.get(package, 0) + self_us
+    slowest = sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+    return {
+        'total_seconds': round(sum(module[1] for module in modules) / 1e6, 4),
+        'packages': {
+            package: round(us / 1e6, 4)
+            for package, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        'slowest_modules': [
+            {'module': name, 'self_seconds': round(self_us / 1e6, 4), 'cumulative_seconds': round(cumulative / 1e6, 4)}
+            for name, self_us, cumulative in slowest
+        ],
+    }
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def run_benchmark(executable=None, runs=5, offscreen=False):
+    # A first untimed run warms the OS file cache, as on a second launch of the app
+    run_once(executable, offscreen=offscreen)
+    measurements = [run_once(executable, offscreen=offscreen) for _ in range(runs)]
+    events = sorted({event for measurement in measurements for event in measurement['wall']})
+    summary = {
+        event: {
+            'wall_median_seconds': round(_median([m['wall'][event] for m in measurements if event in m['wall']]), 4),
+            'in_process_median_seconds': round(
+                _median([m['in_process'][event] for m in measurements if event in m['in_process']]), 4
+            ),
+        }
+        for event in events
+    }
+    # Importing with -X importtime is slower, so it gets its own run
+    breakdown = import_breakdown(run_once(executable, import_time=True, offscreen=offscreen)['importtime'])
+    return {
+        'build': 'frozen' if executable else 'source',
+        'runs': [{'wall': m['wall'], 'in_process': m['in_process']} for m in measurements],
+        'summary': summary,
+        'imports': breakdown,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--executable', help="Frozen app to time instead of `python main.py`")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--offscreen', action='store_true', help="Use Qt's offscreen platform (no display needed)")
+    parser.add_argument('--output', help="Write results JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        **run_benchmark(args.executable, args.runs, args.offscreen),
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Deterministic generator of synthetic Crisis Cleanup exports for benchmarking.
+
+Exports look like the real thing: one row per case, pipe-delimited `Work Types`,
+`Statuses` and `Claimed By` (with missing and short entries), free-text and location
+columns, and any number of extra pass-through columns. Snapshot pairs model a week
+passing, with a controlled share of new cases and work orders that close.
+"""
+import numpy as np
+import pandas as pd
+
+
+WORK_TYPES = [
+    'ash', 'chimney_capping', 'debris', 'mold_remediation', 'muck_out', 'rebuild',
+    'shopping', 'tarp', 'trees', 'wellness_check',
+]
+OPEN_STATUSES = [
+    'Open, unassigned', 'Open, assigned', 'Open, partially completed', 'Open, needs follow-up',
+]
+CLOSED_STATUSES = [
+    'Closed, completed', 'Closed, incomplete', 'Closed, out of scope', 'Closed, done by others',
+]
+ORGANIZATIONS = [f'Relief Organization {i}' for i in range(1, 41)]
+CITIES = [('Asheville', 'Buncombe', 'NC'), ('Boone', 'Watauga', 'NC'), ('Marshall', 'Madison', 'NC'),
+          ('Erwin', 'Unicoi', 'TN'), ('Newport', 'Cocke', 'TN'), ('Valdosta', 'Lowndes', 'GA')]
+
+
+def _pick(rng, choices, size):
+    return np.asarray(choices, dtype=object)[rng.integers(0, len(choices), size)]
+
+
+def generate_export(cases, max_work_types=4, closed_rate=0.3, missing_rate=0.05, extra_columns=4,
+                    seed=0, first_case=1):
+    """
+    Generate a raw Crisis Cleanup export.
+
+    Parameters:
+    cases (int): Number of rows (one per case)
+    max_work_types (int): Each case gets between 1 and this many work types
+    closed_rate (float): Share of work orders with a closed status
+    missing_rate (float): Share of cases whose Statuses/Claimed By lists are short or empty
+    extra_columns (int): Number of extra pass-through columns
+    seed (int): Random seed; the same arguments always give the same export
+    first_case (int): Number of the first case
+
+    Returns:
+    pd.DataFrame: The export
+    """
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, max_work_types + 1, cases)
+
+    # Distinct work types per case: the first `count` entries of a random permutation
+    order = rng.random((cases, len(WORK_TYPES))).argsort(axis=1)[:, :max_work_types]
+    work_type_names = np.asarray(WORK_TYPES, dtype=object)[order]
+
+    total = int(counts.sum())
+    closed = rng.random(total) < closed_rate
+    statuses = np.where(closed, _pick(rng, CLOSED_STATUSES, total), _pick(rng, OPEN_STATUSES, total))
+    # Unclaimed work orders have an empty entry
+    claimers = np.where(rng.random(total) < 0.3, '', _pick(rng, ORGANIZATIONS, total))
+
+    short = rng.random(cases) < missing_rate
+    work_types_column, statuses_column, claimed_by_column = [], [], []
+    start = 0
+    for i, count in enumerate(counts):
+        end = start + count
+        work_types_column.append('|'.join(work_type_names[i, :count]))
+        status_list = statuses[start:end]
+        claimer_list = claimers[start:end]
+        if short[i]:
+            # Missing trailing entries, or the whole cell missing for single work orders
+            status_list = status_list[:count - 1]
+            claimer_list = claimer_list[:count - 1]
+        statuses_column.append('|'.join(status_list) or None)
+        claimed_by_column.append('|'.join(claimer_list) or None)
+        start = end
+
+    places = rng.integers(0, len(CITIES), cases)
+    case_numbers = np.arange(first_case, first_case + cases)
+    created = pd.Timestamp('2024-09-27') + pd.to_timedelta(rng.integers(0, 60 * 24 * 3600, cases), unit='s')
+
+    df = pd.DataFrame({
+        'Case Number': [f'W{n}' for n in case_numbers],
+        'Name': [f'Resident {n}' for n in case_numbers],
+        'Address': [f'{n % 9000 + 100} Main Street' for n in case_numbers],
+        'City': [CITIES[p][0] for p in places],
+        'County': [CITIES[p][1] for p in places],
+        'State': [CITIES[p][2] for p in places],
+        'Postal Code': [f'{28000 + p * 37:05d}' for p in places],
+        'Latitude': np.round(35.0 + rng.random(cases), 6),
+        'Longitude': np.round(-83.0 + rng.random(cases), 6),
+        'Work Types': work_types_column,
+        'Statuses': statuses_column,
+        'Claimed By': claimed_by_column,
+        'Created At': created.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'Notes': np.where(rng.random(cases) < 0.2, 'Needs follow-up,\nsee "access" notes', ''),
+    })
+    for i in range(1, extra_columns + 1):
+        df[f'Extra {i}'] = rng.integers(0, 1000, cases)
+    return df
+
+
+def _close_some(statuses, rng, rate):
+    if not isinstance(statuses, str):
+        return statuses
+    entries = statuses.split('|')
+    for i, entry in enumerate(entries):
+        if not entry.startswith('Closed') and rng.random() < rate:
+            entries[i] = CLOSED_STATUSES[int(rng.integers(0, len(CLOSED_STATUSES)))]
+    return '|'.join(entries)
+
+
+def generate_snapshot_pair(cases, new_rate=0.05, close_rate=0.1, seed=0, **export_options):
+    """
+    Generate an old export and the export a week later.
+
+    Parameters:
+    cases (int): Number of cases in the old export
+    new_rate (float): New cases in the new export, as a share of `cases`
+    close_rate (float): Share of open work orders that are closed in the new export
+    seed (int): Random seed
+    export_options: Passed to `generate_export`
+
+    Returns:
+    tuple[pd.DataFrame, pd.DataFrame]: The old and new raw exports
+    """
+    old = generate_export(cases, seed=seed, **export_options)
+
+    rng = np.random.default_rng(seed + 1)
+    new = old.copy()
+    new['Statuses'] = [_close_some(statuses, rng, close_rate) for statuses in new['Statuses']]
+    added = generate_export(int(cases * new_rate), seed=seed + 2, first_case=cases + 1, **export_options)
+    return old, pd.concat([new, added], ignore_index=True)
@@ -1,17 +1,128 @@
-import sys
+import time
+
+# Taken before anything else is imported, for the startup probe
+STARTED = time.perf_counter()
 
-from PyQt6.QtHelp import QCompressedHelpInfo
+import json
+import multiprocessing
+import os
+import sys
 
-from reports import csv_cleanup, weekly_report
+# Only lightweight modules are imported here. The report modules pull in pandas and
+# numpy, which take seconds to load in the frozen build, so they are imported in the
+# background once the window is up (see ModulePreloader) or when a job first runs.
+from reports.instrumentation import JobStats
+from reports.jobs import JobCancelled, JobProgress
 from pathlib import Path
-from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Qt, pyqtSignal
 from PyQt6.QtWidgets import (
-    QApplication, QComboBox, QDialog, QGridLayout, QGroupBox, QHBoxLayout,
-    QLabel, QPushButton, QSizePolicy, QTableWidget, QTabWidget, QTextEdit,
-    QVBoxLayout, QWidget, QFileDialog
+    QAbstractItemView, QApplication, QCheckBox, QComboBox, QDialog, QGridLayout, QGroupBox,
+    QHBoxLayout, QLabel, QLineEdit, QPushButton, QSizePolicy, QTableView, QTabWidget,
+    QTextEdit, QVBoxLayout, QWidget, QFileDialog
 )
 
 
+# Columns the results table can be filtered on
+FILTER_COLUMNS = ['Work Types', 'Statuses', 'Claimed By']
+
+# When set, print startup timings as JSON and quit once the report modules are loaded
+STARTUP_PROBE_ENV = 'CRISIS_CLEANUP_STARTUP_PROBE'
+
+
+def startup_mark(event):
+    """
+    Print the time since startup of `event` for the startup benchmark, if it is probing.
+    """
+    if os.environ.get(STARTUP_PROBE_ENV):
+        print(json.dumps({'event': event, 'seconds': round(time.perf_counter() - STARTED, 4)}), flush=True)
+
+
+def report_modules():
+    """
+    Import the heavy modules (pandas, numpy and the report jobs) and return the report
+    modules by name. Only the first call pays for the imports.
+
+    These are plain import statements rather than `importlib` calls on names built at
+    runtime, so PyInstaller finds them and bundles them, and everything they import,
+    in the frozen build.
+    """
+    # The results table model is only preloaded; it is used from the dialog
+    import results_model
+    from reports import csv_cleanup, pipeline, trend_report, weekly_report
+    return {
+        'csv_cleanup': csv_cleanup,
+        'pipeline': pipeline,
+        'trend_report': trend_report,
+        'weekly_report': weekly_report,
+    }
+
+
+def resolve_job(name):
+    """
+    Look up a report job by 'module.function' name, importing the report modules on first use.
+    """
+    module_name, function_name = name.rsplit('.', 1)
+    return getattr(report_modules()[module_name], function_name)
+
+
+class PreloaderSignals(QObject):
+    finished = pyqtSignal()
+
+
+class ModulePreloader(QRunnable):
+    """
+    Imports the heavy modules on the thread pool, so they are ready by the time a job runs.
+    """
+    def __init__(self):
+        super().__init__()
+        self.signals = PreloaderSignals()
+
+    def run(self):
+        report_modules()
+        self.signals.finished.emit()
+
+
+class JobSignals(QObject):
+    """
+    Signals emitted by a JobRunner. They are delivered on the GUI thread.
+    """
+    progress = pyqtSignal(str, int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class JobRunner(QRunnable):
+    """
+    Runs a report job on the thread pool so the GUI thread only handles widgets.
+
+    The job is named as 'module.function' in the reports package and is only imported
+    on the worker thread, so starting a job never blocks the GUI on pandas.
+    """
+    def __init__(self, job, *args, **kwargs):
+        super().__init__()
+        self.job = job
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self.progress = JobProgress(self.signals.progress.emit)
+        self.stats = JobStats(job.split('.', 1)[0])
+
+    def cancel(self):
+        self.progress.cancel()
+
+    def run(self):
+        try:
+            job = resolve_job(self.job)
+            result = job(*self.args, progress=self.progress, stats=self.stats, **self.kwargs)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
 class CrisisCleanupReports(QDialog):
     def __init__(self, parent=None):
         super(CrisisCleanupReports, self).__init__(parent)
@@ -19,7 +130,7 @@ class CrisisCleanupReports(QDialog):
         # Setup group boxes
         self.top_left_group_box = self.GroupBoxTopLeft()
         self.top_right_group_box = self.GroupBoxTopRight()
-        # self.bottom_group_box = self.GroupBoxBottom()  # Bottom group box
+        self.bottom_group_box = self.GroupBoxBottom()  # Bottom group box
 
         self.original_palette = QApplication.palette()
 
@@ -27,16 +138,21 @@ class CrisisCleanupReports(QDialog):
         main_layout = QGridLayout()
         main_layout.addWidget(self.top_left_group_box, 1, 0)
         main_layout.addWidget(self.top_right_group_box, 1, 1)
-        # main_layout.addWidget(self.bottom_group_box, 2, 0, 2, 2)  # Bottom group box
+        main_layout.addWidget(self.bottom_group_box, 2, 0, 2, 2)  # Bottom group box
 
         main_layout.setRowStretch(1, 1)
-        # main_layout.setRowStretch(2, 1)  # Bottom group box
+        main_layout.setRowStretch(2, 1)  # Bottom group box
         main_layout.setColumnStretch(0, 1)
         main_layout.setColumnStretch(1, 2)
         self.setLayout(main_layout)
 
         self.setWindowTitle("Crisis Cleanup Reports")
-        self.setFixedSize(700, 500)
+        self.setFixedSize(700, 750)
+
+        # Show per-stage stats of finished jobs in the Info and Results box
+        self.top_right_group_box.stats_ready.connect(self.bottom_group_box.show_stats)
+        # Preview the frames a finished job wrote in the Table tab
+        self.top_right_group_box.results_ready.connect(self.bottom_group_box.show_results)
 
         # Connect the drop-down list signal to update the right view
         self.top_left_group_box.combo_box_report_type.currentTextChanged.connect(
@@ -46,6 +162,14 @@ class CrisisCleanupReports(QDialog):
         # Explicitly initialize the top-right view with the default value (empty string)
         self.update_top_right_view(self.top_left_group_box.combo_box_report_type.currentText())
 
+        self.painted = False
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            # Runs once the event loop has finished painting the window
+            QTimer.singleShot(0, preload_modules)
 
     def update_top_right_view(self, selected_text):
         """
@@ -67,7 +191,8 @@ class CrisisCleanupReports(QDialog):
             self.setLayout(self.top_left_layout)
 
             self.combo_box_report_type = QComboBox()
-            self.combo_box_report_type.addItems(["", "CSV Cleanup", "Weekly Report"])
+            self.combo_box_report_type.addItems(["", "CSV Cleanup", "Weekly Report", "Weekly Report from Exports",
+                                                  "Trend Report"])
 
             self.combo_box_report_type.setCurrentText("")
 
@@ -81,6 +206,11 @@ class CrisisCleanupReports(QDialog):
             return self.combo_box_report_type.currentText()
 
     class GroupBoxTopRight(QGroupBox):
+        # Text summary of a finished job's per-stage stats
+        stats_ready = pyqtSignal(str)
+        # Result frames of a finished job, keyed by display name
+        results_ready = pyqtSignal(object)
+
         def __init__(self, parent=None):
             super().__init__(parent)
 
@@ -90,6 +220,11 @@ class CrisisCleanupReports(QDialog):
 
             # Store the selected file path
             self.selected_file = None
+            # Snapshots selected for the Trend Report job
+            self.trend_files = []
+
+            # Job currently running in the background, if any
+            self.current_job = None
 
 
         def update_view(self, selected_text):
@@ -122,20 +257,53 @@ class CrisisCleanupReports(QDialog):
                 self.run_report_button = QPushButton("Run Report")  # Add your custom name here
                 self.run_report_button.clicked.connect(lambda: self.run_csv_cleanup())
                 self.top_right_layout.addWidget(self.run_report_button)
+                self.add_job_controls()
+
+            elif selected_text == "Trend Report":
+                # Any number of files (Trend Report job)
+                self.select_trend_files_button = QPushButton("Select Snapshots")
+                self.select_trend_files_button.clicked.connect(self.select_trend_files)
+                self.top_right_layout.addWidget(self.select_trend_files_button)
+
+                self.trend_files_info_layout = QHBoxLayout()
+                self.trend_files_display_label = QLabel("")
+                self.remove_trend_files_button = QPushButton("Remove Files")
+                self.remove_trend_files_button.clicked.connect(self.remove_trend_files)
+                self.remove_trend_files_button.setEnabled(False)
+                self.trend_report_help_text = QLabel("Select two or more reports generated by the CSV Cleanup\n"
+                                                     "job. This job will generate weekly trend, time to close and\n"
+                                                     "claimer throughput reports in this program's directory.")
+
+                self.trend_files_info_layout.addWidget(self.trend_files_display_label)
+                self.trend_files_info_layout.addWidget(self.remove_trend_files_button)
+                self.top_right_layout.addLayout(self.trend_files_info_layout)
+                self.top_right_layout.addStretch(1)
+                self.top_right_layout.addWidget(self.trend_report_help_text)
+
+                self.run_report_button = QPushButton("Run Report")
+                self.run_report_button.clicked.connect(lambda: self.run_trend_report())
+                self.top_right_layout.addWidget(self.run_report_button)
+                self.add_job_controls()
 
-            elif selected_text == "Weekly Report":
+            elif selected_text in ("Weekly Report", "Weekly Report from Exports"):
                 # Two files (Weekly Report job)
+                from_exports = selected_text == "Weekly Report from Exports"
 
                 # First file (Old Report)
-                self.select_first_file_button = QPushButton("Select Old Report")
+                self.select_first_file_button = QPushButton("Select Old Export" if from_exports else "Select Old Report")
                 self.select_first_file_button.clicked.connect(lambda: self.select_csv_file("old"))
                 self.top_right_layout.addWidget(self.select_first_file_button)
 
                 self.file_one_info_layout = QHBoxLayout()
                 self.file_one_display_label = QLabel("")  # Old file label
-                self.weekly_report_help_text = QLabel("Select the old and new reports generated by the CSV Cleanup\n"
-                                                      "job. This job will generate a New Cases and Closed Cases\n"
-                                                      "report in the directory that this program is located in.")
+                if from_exports:
+                    self.weekly_report_help_text = QLabel("Select the old and new CSV files exported from the Crisis\n"
+                                                          "Cleanup app. They are cleaned in memory and compared into a\n"
+                                                          "New Cases and Closed Cases report in this program's directory.")
+                else:
+                    self.weekly_report_help_text = QLabel("Select the old and new reports generated by the CSV Cleanup\n"
+                                                          "job. This job will generate a New Cases and Closed Cases\n"
+                                                          "report in the directory that this program is located in.")
                 self.remove_file_one_button = QPushButton("Remove File")
                 self.remove_file_one_button.clicked.connect(lambda: self.remove_file("old"))
                 self.remove_file_one_button.setEnabled(False)
@@ -144,7 +312,7 @@ class CrisisCleanupReports(QDialog):
                 self.top_right_layout.addLayout(self.file_one_info_layout)
 
                 # Second file (New Report)
-                self.select_second_file_button = QPushButton("Select New Report")
+                self.select_second_file_button = QPushButton("Select New Export" if from_exports else "Select New Report")
                 self.select_second_file_button.clicked.connect(lambda: self.select_csv_file("new"))
                 self.top_right_layout.addWidget(self.select_second_file_button)
 
@@ -157,14 +325,19 @@ class CrisisCleanupReports(QDialog):
                 self.file_two_info_layout.addWidget(self.remove_file_two_button)
                 self.top_right_layout.addLayout(self.file_two_info_layout)
 
+                if from_exports:
+                    self.keep_cleaned_check_box = QCheckBox("Also save the cleaned CSV files")
+                    self.top_right_layout.addWidget(self.keep_cleaned_check_box)
+
                 self.top_right_layout.addStretch(1)
 
                 self.top_right_layout.addWidget(self.weekly_report_help_text)
                 # Add Run Report button
                 self.run_report_button = QPushButton("Run Report")
                 # Connect the button to the run_report_action method for Weekly Report
-                self.run_report_button.clicked.connect(lambda: self.run_weekly_report())
+                self.run_report_button.clicked.connect(lambda: self.run_weekly_report(from_exports))
                 self.top_right_layout.addWidget(self.run_report_button)
+                self.add_job_controls()
 
             elif selected_text == "":
 
@@ -176,10 +349,38 @@ class CrisisCleanupReports(QDialog):
                 self.top_right_layout.addWidget(self.help_text)
 
 
-        def run_weekly_report(self):
+        def add_job_controls(self):
+            """
+            Adds the job status label and cancel button below the Run Report button.
+            """
+            self.job_controls_layout = QHBoxLayout()
+            self.job_status_label = QLabel("")
+            self.cancel_job_button = QPushButton("Cancel")
+            self.cancel_job_button.clicked.connect(self.cancel_job)
+            self.cancel_job_button.setEnabled(False)  # Enabled while a job runs
+            self.job_controls_layout.addWidget(self.job_status_label, 1)
+            self.job_controls_layout.addWidget(self.cancel_job_button)
+            self.top_right_layout.addLayout(self.job_controls_layout)
+
+
+        def run_weekly_report(self, from_exports=False):
             # Check if both file types (old and new) are selected
             if self.old_report_file and self.new_report_file:
-                weekly_report.generate_weekly_report(self.old_report_file, self.new_report_file)
+                if from_exports:
+                    # Compact cleaned exports give the same reports with much less memory
+                    self.start_job('pipeline.generate_weekly_report_from_exports', self.old_report_file,
+                                   self.new_report_file, keep_cleaned=self.keep_cleaned_check_box.isChecked(),
+                                   compact=True)
+                else:
+                    self.start_job('weekly_report.generate_weekly_report', self.old_report_file, self.new_report_file)
+            else:
+                return
+
+
+        def run_trend_report(self):
+            # Check if enough snapshots were selected
+            if len(self.trend_files) >= 2:
+                self.start_job('trend_report.generate_trend_report', list(self.trend_files))
             else:
                 return
 
@@ -187,15 +388,83 @@ class CrisisCleanupReports(QDialog):
         def run_csv_cleanup(self):
             # Check if a file was selected
             if self.selected_file:
-                csv_cleanup.generate_csv_cleanup(self.selected_file)
+                self.start_job('csv_cleanup.generate_csv_cleanup', self.selected_file)
             else:
                 return
 
 
+        def start_job(self, job, *args, **kwargs):
+            """
+            Runs a report job in the background and wires its signals to the dialog.
+            """
+            if self.current_job is not None:
+                return
+
+            runner = JobRunner(job, *args, **kwargs)
+            runner.signals.progress.connect(self.on_job_progress)
+            runner.signals.finished.connect(self.on_job_finished)
+            runner.signals.failed.connect(self.on_job_failed)
+            runner.signals.cancelled.connect(self.on_job_cancelled)
+            self.current_job = runner
+
+            self.run_report_button.setEnabled(False)
+            self.cancel_job_button.setEnabled(True)
+            self.job_status_label.setText("Starting...")
+            QThreadPool.globalInstance().start(runner)
+
+
+        def cancel_job(self):
+            if self.current_job is not None:
+                self.current_job.cancel()
+                if hasattr(self, 'job_status_label'):
+                    self.job_status_label.setText("Cancelling...")
+
+
+        def is_current_job(self):
+            # Ignore late signals from a job that was cancelled by switching views
+            return self.current_job is not None and self.sender() is self.current_job.signals
+
+
+        def on_job_progress(self, stage, count):
+            if self.is_current_job():
+                self.job_status_label.setText(f"{stage}: {count:,}")
+
+
+        def on_job_finished(self, result):
+            if self.is_current_job():
+                self.stats_ready.emit(self.current_job.stats.summary())
+                self.results_ready.emit(self.current_job.progress.results)
+                outputs = [result] if isinstance(result, str) else list(result or [])
+                self.end_job("Done: " + ", ".join(Path(output).name for output in outputs))
+
+
+        def on_job_failed(self, message):
+            if self.is_current_job():
+                self.end_job(f"Failed: {message}")
+
+
+        def on_job_cancelled(self):
+            if self.is_current_job():
+                self.end_job("Cancelled")
+
+
+        def end_job(self, status_text):
+            self.current_job = None
+            if hasattr(self, 'job_status_label'):
+                self.job_status_label.setText(status_text)
+                self.cancel_job_button.setEnabled(False)
+                self.run_report_button.setEnabled(True)
+
+
         def clear_view(self):
             """
             Clears all widgets in the top-right group box and resets file state.
             """
+            # Stop any job still running for the previous view
+            if self.current_job is not None:
+                self.current_job.cancel()
+                self.current_job = None
+
             # Clear the layout widgets
             while self.top_right_layout.count():
                 widget = self.top_right_layout.takeAt(0).widget()
@@ -206,6 +475,7 @@ class CrisisCleanupReports(QDialog):
             self.selected_file = None
             self.old_report_file = None
             self.new_report_file = None
+            self.trend_files = []
 
             # Reset button and label attributes
             if hasattr(self, 'remove_file_button'):
@@ -217,6 +487,9 @@ class CrisisCleanupReports(QDialog):
             if hasattr(self, 'remove_file_two_button'):
                 self.remove_file_two_button.deleteLater()
                 del self.remove_file_two_button
+            if hasattr(self, 'remove_trend_files_button'):
+                self.remove_trend_files_button.deleteLater()
+                del self.remove_trend_files_button
 
             # Reset display labels if they exist
             if hasattr(self, 'file_display_label'):
@@ -228,6 +501,9 @@ class CrisisCleanupReports(QDialog):
             if hasattr(self, 'file_two_display_label'):
                 self.file_two_display_label.deleteLater()
                 del self.file_two_display_label
+            if hasattr(self, 'trend_files_display_label'):
+                self.trend_files_display_label.deleteLater()
+                del self.trend_files_display_label
 
             # Reset other GUI elements like help text or buttons, if needed
             if hasattr(self, 'csv_help_text'):
@@ -236,9 +512,21 @@ class CrisisCleanupReports(QDialog):
             if hasattr(self, 'weekly_report_help_text'):
                 self.weekly_report_help_text.deleteLater()
                 del self.weekly_report_help_text
+            if hasattr(self, 'trend_report_help_text'):
+                self.trend_report_help_text.deleteLater()
+                del self.trend_report_help_text
+            if hasattr(self, 'keep_cleaned_check_box'):
+                self.keep_cleaned_check_box.deleteLater()
+                del self.keep_cleaned_check_box
             if hasattr(self, 'run_report_button'):
                 self.run_report_button.deleteLater()
                 del self.run_report_button
+            if hasattr(self, 'job_status_label'):
+                self.job_status_label.deleteLater()
+                del self.job_status_label
+            if hasattr(self, 'cancel_job_button'):
+                self.cancel_job_button.deleteLater()
+                del self.cancel_job_button
 
 
         def select_csv_file(self, file_type):
@@ -270,6 +558,22 @@ class CrisisCleanupReports(QDialog):
                         return file_display_name
 
 
+        def select_trend_files(self):
+            selected_files, _ = QFileDialog.getOpenFileNames(self, "Select Snapshots", "", "CSV Files (*.csv)")
+            if selected_files:
+                self.trend_files = selected_files
+                self.trend_files_display_label.setText(f"Selected: {len(selected_files)} snapshots")
+                self.trend_files_display_label.setToolTip("\n".join(Path(path).name for path in selected_files))
+                self.remove_trend_files_button.setEnabled(True)
+
+
+        def remove_trend_files(self):
+            self.trend_files = []
+            self.trend_files_display_label.setText("")
+            self.trend_files_display_label.setToolTip("")
+            self.remove_trend_files_button.setEnabled(False)
+
+
         def remove_file(self, file_type):
             if file_type == "single":
                 self.selected_file = None
@@ -306,20 +610,56 @@ class CrisisCleanupReports(QDialog):
 
             # Tab 1: Table
             tab1 = QWidget()
-            table_widget = QTableWidget(10, 10)  # Create table (10x10)
-
-            tab1hbox = QHBoxLayout()
-            tab1hbox.setContentsMargins(5, 5, 5, 5)
-            tab1hbox.addWidget(table_widget)
-            tab1.setLayout(tab1hbox)
+            self.results = {}
+            # Created with the first results, once pandas has been imported
+            self.results_model = None
+
+            # Which result to show, and how many of its rows match the filters
+            self.results_combo_box = QComboBox()
+            self.results_combo_box.currentTextChanged.connect(self.show_result)
+            self.results_count_label = QLabel("")
+            results_select_layout = QHBoxLayout()
+            results_select_layout.addWidget(self.results_combo_box, 1)
+            results_select_layout.addWidget(self.results_count_label)
+
+            # Filters are applied shortly after typing stops, not on every keystroke
+            self.filter_timer = QTimer(self)
+            self.filter_timer.setSingleShot(True)
+            self.filter_timer.setInterval(250)
+            self.filter_timer.timeout.connect(self.apply_filters)
+            self.filter_edits = {}
+            filter_layout = QHBoxLayout()
+            for column in FILTER_COLUMNS:
+                filter_edit = QLineEdit()
+                filter_edit.setPlaceholderText(f"Filter {column}")
+                filter_edit.setClearButtonEnabled(True)
+                filter_edit.textChanged.connect(self.filter_timer.start)
+                filter_layout.addWidget(filter_edit)
+                self.filter_edits[column] = filter_edit
+
+            self.table_view = QTableView()
+            self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            self.table_view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+            self.table_view.setSortingEnabled(True)
+            self.table_view.verticalHeader().setDefaultSectionSize(20)
+
+            tab1vbox = QVBoxLayout()
+            tab1vbox.setContentsMargins(5, 5, 5, 5)
+            tab1vbox.addLayout(results_select_layout)
+            tab1vbox.addLayout(filter_layout)
+            tab1vbox.addWidget(self.table_view)
+            tab1.setLayout(tab1vbox)
 
             # Tab 2: Text Edit
             tab2 = QWidget()
-            text_edit = QTextEdit()
+            self.text_edit = QTextEdit()
+            self.text_edit.setReadOnly(True)
+            self.text_edit.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+            self.text_edit.setFontFamily("monospace")
 
             tab2hbox = QHBoxLayout()
             tab2hbox.setContentsMargins(5, 5, 5, 5)
-            tab2hbox.addWidget(text_edit)
+            tab2hbox.addWidget(self.text_edit)
             tab2.setLayout(tab2hbox)
 
             # Add tabs
@@ -333,9 +673,70 @@ class CrisisCleanupReports(QDialog):
             self.timer = QTimer(self)
             self.timer.start(1000)
 
+        def show_stats(self, summary):
+            """
+            Append a finished job's per-stage stats to the text tab and bring it to the front.
+            """
+            self.text_edit.append(summary + "\n")
+            self.tab_widget.setCurrentIndex(1)
+
+        def show_results(self, results):
+            """
+            Offer a finished job's result frames in the Table tab and show the first one.
+            """
+            if not results:
+                return
+            if self.results_model is None:
+                from results_model import ResultsTableModel
+                self.results_model = ResultsTableModel()
+                self.table_view.setModel(self.results_model)
+            self.results = dict(results)
+            self.results_combo_box.blockSignals(True)
+            self.results_combo_box.clear()
+            self.results_combo_box.addItems(list(self.results))
+            self.results_combo_box.blockSignals(False)
+            self.show_result(self.results_combo_box.currentText())
+            self.tab_widget.setCurrentIndex(0)
+
+        def show_result(self, name):
+            frame = self.results.get(name)
+            if frame is None:
+                return
+            self.table_view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+            self.results_model.set_frame(frame)
+            for column, filter_edit in self.filter_edits.items():
+                filter_edit.setEnabled(column in frame.columns)
+            self.apply_filters()
+
+        def apply_filters(self):
+            self.filter_timer.stop()
+            if self.results_model is None:
+                return
+            self.results_model.set_filters({
+                column: filter_edit.text().strip() for column, filter_edit in self.filter_edits.items()
+            })
+            self.results_count_label.setText(
+                f"{self.results_model.matching_rows():,} of {self.results_model.total_rows():,} rows"
+            )
+
+
+def preload_modules():
+    """
+    Import the report modules in the background once the window has first been painted;
+    with the startup probe on, quit once loaded.
+    """
+    startup_mark('first_paint')
+    preloader = ModulePreloader()
+    preloader.signals.finished.connect(lambda: startup_mark('modules_loaded'))
+    if os.environ.get(STARTUP_PROBE_ENV):
+        preloader.signals.finished.connect(QApplication.quit)
+    QThreadPool.globalInstance().start(preloader)
+
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Needed for worker processes in the PyInstaller build
     app = QApplication(sys.argv)  # Create QApplication instance
     main_window = CrisisCleanupReports()  # Create an instance of the main window
     main_window.show()  # Show the main application window
+    startup_mark('window_shown')
     sys.exit(app.exec())  # Run the application loop
@@ -0,0 +1,227 @@
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+
+# Parquet needs pyarrow; without it parsed frames are cached as pandas pickles
+CACHE_FORMAT = 'parquet' if importlib.util.find_spec('pyarrow') else 'pickle'
+
+
+# Environment variable that overrides where parsed exports are cached
+CACHE_DIR_ENV = 'CRISIS_CLEANUP_CACHE_DIR'
+
+# Total size of cached entries kept on disk before the least recently used are evicted
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Content hashes of the files read, so unchanged files are not hashed again
+INDEX_FILE = 'index.json'
+ENTRY_SUFFIXES = ('.parquet', '.pickle')
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def default_cache_dir():
+    """
+    Directory used for the parse cache when none is given.
+    """
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    if os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        return Path(os.environ['LOCALAPPDATA']) / 'crisis_cleanup_reports' / 'cache'
+    return Path.home() / '.cache' / 'crisis_cleanup_reports'
+
+
+def file_digest(path):
+    """
+    BLAKE2b content hash of a file, read in blocks.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_index(cache_dir):
+    try:
+        with open(cache_dir / INDEX_FILE, encoding='utf-8') as f:
+            return {'files': json.load(f).get('files', {})}
+    except (OSError, ValueError, AttributeError):
+        return {'files': {}}
+
+
+def _save_index(cache_dir, files, live_digests=None):
+    """
+    Store the content hashes in `files`, merged into the index as it is on disk now.
+
+    Other processes may have saved hashes of their own since this one loaded the index;
+    they are kept. With `live_digests`, hashes without a cached entry are dropped.
+    """
+    index = _load_index(cache_dir)
+    index['files'].update(files)
+    if live_digests is not None:
+        index['files'] = {
+            path: known for path, known in index['files'].items() if known['digest'] in live_digests
+        }
+    # Write then rename so a crash never leaves a half-written index behind
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    try:
+        os.replace(tmp_path, cache_dir / INDEX_FILE)
+    except OSError:
+        # Another process is replacing it (Windows); the hashes are only a shortcut
+        os.remove(tmp_path)
+
+
+def _content_digest(files, path):
+    """
+    Content hash of `path`, reusing the stored hash while its size and mtime are unchanged.
+    """
+    stat = os.stat(path)
+    key = str(Path(path).resolve())
+    known = files.get(key)
+    if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+        return known['digest']
+
+    digest = file_digest(path)
+    files[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest}
+    return digest
+
+
+def _cached_entries(cache_dir):
+    """
+    (name, size, last used) of every entry in the cache directory. Entries are listed
+    from the directory itself, so those written by other processes are counted too.
+    """
+    entries = []
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            if not entry.name.endswith(ENTRY_SUFFIXES):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Evicted by another process meanwhile
+                continue
+            entries.append((entry.name, stat.st_size, stat.st_mtime))
+    return entries
+
+
+def _remove_entry(entry_path):
+    """
+    Delete a cached entry. Returns False if it is still there (e.g. open in another
+    process on Windows), to be evicted later.
+    """
+    try:
+        os.remove(entry_path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return False
+    return True
+
+
+def _evict(cache_dir, max_bytes):
+    """
+    Remove least recently used entries until the cache fits in `max_bytes`.
+
+    Returns:
+    set[str]: Content hashes that still have an entry
+    """
+    entries = sorted(_cached_entries(cache_dir), key=lambda entry: entry[2])
+    total = sum(size for _, size, _ in entries)
+    kept = []
+    for name, size, _ in entries:
+        if total > max_bytes and _remove_entry(cache_dir / name):
+            total -= size
+        else:
+            kept.append(name)
+    return {name.split('-', 1)[0] for name in kept}
+
+
+def _write_entry(df, entry_path):
+    # Write then rename, so other processes never read or count a half-written entry
+    fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        if CACHE_FORMAT == 'parquet':
+            df.to_parquet(tmp_path)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, entry_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_csv_cached(path, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, reader=None, **read_csv_kwargs):
+    """
+    `pd.read_csv` backed by an on-disk cache of parsed frames.
+
+    Entries are keyed by the file's content hash and the read options, so an unchanged
+    export is loaded from a binary columnar file (Parquet when pyarrow is installed,
+    otherwise a pandas pickle) without parsing the CSV again. The content hash is only
+    recomputed when the file's size or mtime changes.
+
+    Several processes may share a cache directory. Entries are found, sized and evicted
+    from the directory listing (an entry's mtime is its last use), so the size limit
+    holds however many processes write to the cache at once.
+
+    Parameters:
+    path (str): CSV file to read
+    cache_dir (str): Optional cache directory (defaults to `default_cache_dir()`)
+    max_bytes (int): Size limit for the cache; least recently used entries are evicted
+    reader (callable): Optional parser used instead of `pd.read_csv`, called the same way
+    read_csv_kwargs: Options passed to the parser
+
+    Returns:
+    pd.DataFrame: The parsed file
+    """
+    reader = reader or pd.read_csv
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        # No writable cache location, fall back to a plain read
+        return reader(path, **read_csv_kwargs)
+
+    files = _load_index(cache_dir)['files']
+    reader_name = f"{reader.__module__}.{reader.__qualname__}"
+    options = repr((pd.__version__, CACHE_FORMAT, reader_name, sorted(read_csv_kwargs.items())))
+    options_digest = hashlib.blake2b(options.encode('utf-8'), digest_size=8).hexdigest()
+    name = f"{_content_digest(files, path)}-{options_digest}.{CACHE_FORMAT}"
+    entry_path = cache_dir / name
+
+    df = None
+    if entry_path.exists():
+        try:
+            if CACHE_FORMAT == 'parquet':
+                df = pd.read_parquet(entry_path)
+            else:
+                df = pd.read_pickle(entry_path)
+        except Exception:
+            # Corrupt, unreadable or just evicted entry, parse the CSV again below
+            df = None
+        else:
+            # The modification time records when an entry was last used
+            try:
+                os.utime(entry_path)
+            except OSError:
+                pass
+
+    if df is None:
+        df = reader(path, **read_csv_kwargs)
+        try:
+            _write_entry(df, entry_path)
+        except Exception:
+            # Frames Parquet cannot store (e.g. mixed-type columns) are simply not cached
+            _save_index(cache_dir, files)
+            return df
+
+    _save_index(cache_dir, files, _evict(cache_dir, max_bytes))
+    return df
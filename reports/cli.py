@@ -0,0 +1,300 @@
+"""
+Headless command-line entry point for the report jobs.
+
+Runs CSV Cleanup over whole directories of exports and weekly reports over a
+sequence of snapshots, fanning the work out across a process pool. Nothing here
+imports PyQt6, so it can run on a server without a display.
+
+Usage:
+    python -m reports.cli cleanup EXPORTS_DIR --output-dir OUT
+    python -m reports.cli weekly SNAPSHOT_1.csv SNAPSHOT_2.csv SNAPSHOT_3.csv --output-dir OUT
+    python -m reports.cli weekly --raw EXPORT_1.csv EXPORT_2.csv --output-dir OUT
+    python -m reports.cli trend SNAPSHOTS_DIR --output-dir OUT
+    python -m reports.cli watch DOWNLOADS_DIR --output-dir OUT
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime as c_time
+from pathlib import Path
+
+from reports import csv_cleanup, pipeline, trend_report, weekly_report
+from reports.watch import DEFAULT_INTERVAL, DEFAULT_QUEUE_SIZE, DEFAULT_SETTLE_SECONDS, ExportWatcher
+from reports.instrumentation import JobStats
+from reports.schema import ENGINE_PANDAS, ENGINE_PYARROW
+from reports.snapshots import SnapshotStore, generate_weekly_report_from_store, snapshot_time
+from reports.writer import FORMAT_CSV, OUTPUT_FORMATS, output_path
+
+
+def expand_csv_paths(paths, by_time=False):
+    """
+    Expand directories to the CSV files they contain; files pass through in the order given.
+
+    A directory's files are sorted by name, or with `by_time` oldest first by
+    `snapshot_time`, since default names ("csv_cleanup MM-DD-YY HHMMSS.csv") do not sort
+    by date across a year boundary.
+    """
+    expanded = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files = sorted(p for p in path.iterdir() if p.suffix.lower() == '.csv')
+            if by_time:
+                # Stable, so files taken at the same time stay in name order
+                files.sort(key=snapshot_time)
+            expanded.extend(files)
+        else:
+            expanded.append(path)
+    return [str(path) for path in expanded]
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _run_jobs(jobs, workers):
+    """
+    Run (description, function, args, kwargs) jobs in a process pool and print each outcome.
+
+    Returns:
+    int: Number of jobs that failed
+    """
+    failures = 0
+    with ProcessPoolExecutor(max_workers=min(workers, max(len(jobs), 1))) as executor:
+        futures = {
+            executor.submit(function, *args, **kwargs): description
+            for description, function, args, kwargs in jobs
+        }
+        for future in as_completed(futures):
+            description = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"FAILED {description}: {e}", file=sys.stderr)
+            else:
+                outputs = [result] if isinstance(result, str) else list(result)
+                print(f"done   {description} -> {', '.join(outputs)}")
+    return failures
+
+
+def cleanup_command(args):
+    inputs = expand_csv_paths(args.inputs)
+    os.makedirs(args.output_dir, exist_ok=True)
+    current_time = c_time.now().strftime("%m-%d-%y %H%M%S")
+
+    jobs = []
+    for input_file in inputs:
+        # Prefix each output with its export's name so parallel runs never collide
+        output_file = output_path(
+            os.path.join(args.output_dir, f"{Path(input_file).stem} csv_cleanup {current_time}.csv"),
+            args.output_format,
+        )
+        kwargs = {
+            'chunksize': args.chunksize,
+            'use_cache': not args.no_cache,
+            'output_file': output_file,
+            'engine': args.engine,
+            'stats': JobStats('csv_cleanup', trace_memory=args.trace_memory, profile=args.profile),
+            'compact': args.compact,
+            'output_format': args.output_format,
+            # Cores not needed for one export each go to sharding the exports
+            'workers': max(args.workers // max(len(inputs), 1), 1),
+        }
+        jobs.append((input_file, csv_cleanup.generate_csv_cleanup, (input_file,), kwargs))
+    return _run_jobs(jobs, args.workers)
+
+
+def weekly_command(args):
+    snapshots = expand_csv_paths(args.snapshots, by_time=True)
+    if len(snapshots) < 2:
+        kind = "raw exports" if args.raw else "cleaned snapshots"
+        print(f"At least two {kind} are needed for a weekly report.", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    jobs = []
+    for old_file, new_file in zip(snapshots, snapshots[1:]):
+        label = f"{Path(old_file).stem} to {Path(new_file).stem}"
+        kwargs = {
+            'use_cache': not args.no_cache,
+            'output_dir': args.output_dir,
+            'label': label,
+            'engine': args.engine,
+            'output_format': args.output_format,
+        }
+        if args.raw:
+            # Clean both exports in memory and diff them without writing cleaned CSVs in between
+            kwargs['keep_cleaned'] = args.keep_cleaned
+            kwargs['compact'] = args.compact
+            kwargs['stats'] = JobStats('pipeline', trace_memory=args.trace_memory, profile=args.profile)
+            job = pipeline.generate_weekly_report_from_exports
+        else:
+            kwargs['stats'] = JobStats('weekly_report', trace_memory=args.trace_memory, profile=args.profile)
+            job = weekly_report.generate_weekly_report
+        jobs.append((label, job, (old_file, new_file), kwargs))
+    return _run_jobs(jobs, args.workers)
+
+
+def trend_command(args):
+    snapshots = expand_csv_paths(args.snapshots)
+    if len(snapshots) < 2:
+        print("At least two cleaned snapshots are needed for a trend report.", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # A single job that loads and diffs the snapshots across its own worker processes
+    stats = JobStats('trend_report', trace_memory=args.trace_memory, profile=args.profile)
+    try:
+        outputs = trend_report.generate_trend_report(
+            snapshots, use_cache=not args.no_cache, output_dir=args.output_dir, engine=args.engine,
+            workers=args.workers, stats=stats,
+        )
+    except Exception as e:
+        print(f"FAILED trend report: {e}", file=sys.stderr)
+        return 1
+    print(f"done   {len(snapshots)} snapshots -> {', '.join(outputs)}")
+    return 0
+
+
+def watch_command(args):
+    try:
+        watcher = ExportWatcher(
+            args.watch_dir, args.output_dir, interval=args.interval, settle_seconds=args.settle_seconds,
+            queue_size=args.queue_size, workers=args.workers, use_cache=not args.no_cache, engine=args.engine,
+            compact=args.compact, output_format=args.output_format,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if not args.once:
+        print(f"Watching {args.watch_dir} for new exports (Ctrl+C to stop)")
+    try:
+        watcher.run(once=args.once)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    return 0
+
+
+def _snapshot_id(store, value):
+    # Snapshots can be named by id or by a date/time (latest snapshot taken by then)
+    if value is None or value.isdigit():
+        return int(value) if value else None
+    return store.snapshot_at(value)
+
+
+def ingest_command(args):
+    # Ingestion is sequential: each snapshot is stored relative to the previous one
+    with SnapshotStore(args.store) as store:
+        for path in expand_csv_paths(args.snapshots, by_time=True):
+            snapshot_id = store.ingest_file(path)
+            print(f"ingested {path} as snapshot {snapshot_id}")
+    return 0
+
+
+def history_command(args):
+    with SnapshotStore(args.store) as store:
+        if args.old is None and args.new is None:
+            print(store.snapshots().to_string(index=False))
+            return 0
+        old_snapshot = _snapshot_id(store, args.old)
+        new_snapshot = _snapshot_id(store, args.new)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    outputs = generate_weekly_report_from_store(args.store, old_snapshot, new_snapshot, output_dir=args.output_dir,
+                                                output_format=args.output_format)
+    print(f"done   -> {', '.join(outputs)}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m reports.cli',
+        description="Run Crisis Cleanup report jobs without the GUI.",
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--output-dir', default='.', help="Directory to write reports to (default: current directory)")
+    common.add_argument('--workers', type=int, default=default_workers(),
+                        help="Number of worker processes (default: number of CPU cores)")
+    common.add_argument('--no-cache', action='store_true', help="Always re-parse input CSVs")
+    common.add_argument('--engine', choices=[ENGINE_PANDAS, ENGINE_PYARROW], default=ENGINE_PANDAS,
+                        help="CSV parser backend (default: c)")
+    common.add_argument('--trace-memory', action='store_true',
+                        help="Record peak Python allocations per stage in the .stats.json sidecar (slower)")
+    common.add_argument('--profile', action='store_true',
+                        help="Capture a cProfile profile next to each output")
+
+    # Output format for the jobs that write full reports
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--output-format', choices=OUTPUT_FORMATS, default=FORMAT_CSV,
+                        help="Write reports as plain, gzip or zstd compressed CSV, or as Parquet (default: csv)")
+
+    cleanup = subparsers.add_parser('cleanup', parents=[common, output],
+                                    help="Run CSV Cleanup on raw exports")
+    cleanup.add_argument('inputs', nargs='+', help="Raw export CSV files or directories of them")
+    cleanup.add_argument('--chunksize', type=int, default=None,
+                         help="Stream each export in chunks of this many rows")
+    cleanup.add_argument('--compact', action='store_true',
+                         help="Store each case's columns once in memory and expand rows only while writing")
+    cleanup.set_defaults(handler=cleanup_command)
+
+    weekly = subparsers.add_parser('weekly', parents=[common, output],
+                                   help="Diff consecutive cleaned snapshots")
+    weekly.add_argument('snapshots', nargs='+',
+                        help="Cleaned snapshots oldest first, or a directory of them (ordered by when taken)")
+    weekly.add_argument('--raw', action='store_true',
+                        help="Inputs are raw exports: clean and diff them in one pass")
+    weekly.add_argument('--keep-cleaned', action='store_true',
+                        help="With --raw, also write the cleaned snapshots")
+    weekly.add_argument('--compact', action='store_true',
+                        help="With --raw, store each case's columns once in memory (lower peak memory)")
+    weekly.set_defaults(handler=weekly_command)
+
+    trend = subparsers.add_parser('trend', parents=[common],
+                                  help="Weekly trends over a series of cleaned snapshots")
+    trend.add_argument('snapshots', nargs='+',
+                       help="Cleaned snapshots in any order, or a directory of them (ordered by when taken)")
+    trend.set_defaults(handler=trend_command)
+
+    watch = subparsers.add_parser('watch', parents=[common, output],
+                                  help="Clean each new export in a folder and diff it against the previous one")
+    watch.add_argument('watch_dir', help="Folder the exports are downloaded to")
+    watch.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                       help=f"Seconds between scans of the folder (default: {DEFAULT_INTERVAL:g})")
+    watch.add_argument('--settle-seconds', type=float, default=DEFAULT_SETTLE_SECONDS,
+                       help="Seconds a file must stay unchanged before it is processed "
+                            f"(default: {DEFAULT_SETTLE_SECONDS:g})")
+    watch.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                       help=f"Maximum exports queued or in progress (default: {DEFAULT_QUEUE_SIZE})")
+    watch.add_argument('--compact', action='store_true',
+                       help="Store each case's columns once in memory while cleaning (lower peak memory)")
+    watch.add_argument('--once', action='store_true',
+                       help="Process the exports already in the folder, then exit")
+    watch.set_defaults(handler=watch_command)
+
+    ingest = subparsers.add_parser('ingest', help="Add cleaned snapshots to a snapshot store")
+    ingest.add_argument('snapshots', nargs='+',
+                        help="Cleaned snapshots oldest first, or a directory of them (ordered by when taken)")
+    ingest.add_argument('--store', required=True, help="SQLite snapshot store")
+    ingest.set_defaults(handler=ingest_command)
+
+    history = subparsers.add_parser('history', parents=[output],
+                                    help="List stored snapshots, or report changes between two of them")
+    history.add_argument('--store', required=True, help="SQLite snapshot store")
+    history.add_argument('--old', help="Old snapshot id or date (default: the one before --new)")
+    history.add_argument('--new', help="New snapshot id or date (default: the latest)")
+    history.add_argument('--output-dir', default='.', help="Directory to write reports to")
+    history.set_defaults(handler=history_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return 1 if args.handler(args) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
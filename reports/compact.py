@@ -0,0 +1,133 @@
+import csv
+
+import numpy as np
+import pandas as pd
+
+from reports.weekly_report import (
+    CASE_COLUMN, CHANGE_CLOSED, CHANGE_NEW, STATUS_COLUMN, WORK_TYPE_COLUMN, diff_reports,
+)
+from reports.writer import FORMAT_BLOCK_ROWS, write_report
+
+
+class CompactReport:
+    """
+    A cleaned report that keeps each case's columns once, however many work orders it has.
+
+    The flat report repeats every case-level column (address, notes, ...) on each of the
+    case's work-order rows. Here those columns live in `cases`, one row per case, and
+    each work order only stores the position of its case plus its own Work Types,
+    Statuses and Claimed By as categoricals (integer codes into an interned dictionary
+    of distinct values). Flat rows are only built when asked for, a block at a time when
+    writing, so they never all exist at once.
+
+    Parameters:
+    cases (pd.DataFrame): Case-level columns, one row per case
+    case_rows (np.ndarray): Position in `cases` of each work order's case
+    work_orders (dict[str, pd.Categorical]): Work-order-level columns, one value per work order
+    columns (list[str]): Column order of the flat report
+    """
+
+    def __init__(self, cases, case_rows, work_orders, columns):
+        self.cases = cases
+        self.case_rows = case_rows
+        self.work_orders = work_orders
+        self.columns = list(columns)
+
+    def __len__(self):
+        return len(self.case_rows)
+
+    def column(self, name):
+        """
+        One column of the flat report, as a Series with one value per work order.
+        """
+        if name in self.work_orders:
+            return pd.Series(self.work_orders[name], name=name)
+        return pd.Series(self.cases[name].to_numpy()[self.case_rows], name=name)
+
+    def key_frame(self, columns):
+        """
+        Flat frame of just `columns`, e.g. the keys and status needed to diff two reports.
+        """
+        return pd.DataFrame({name: self.column(name) for name in columns})
+
+    def take(self, positions):
+        """
+        The work orders at `positions`, in that order, sharing the same case table.
+        """
+        return CompactReport(
+            self.cases,
+            self.case_rows[positions],
+            {name: values.take(positions) for name, values in self.work_orders.items()},
+            self.columns,
+        )
+
+    def sort_values(self, by):
+        """
+        Sort the work orders the way `DataFrame.sort_values(by)` sorts the flat report.
+        """
+        # Categories are sorted, so ordering by their codes is ordering by their text
+        order = self.key_frame(by).sort_values(by).index.to_numpy()
+        return self.take(order)
+
+    def to_frame(self, positions=None):
+        """
+        Expand to the flat report (or the work orders at `positions`), with the flat
+        column order and index labels.
+        """
+        if positions is None:
+            positions = np.arange(len(self))
+        frame = self.cases.take(self.case_rows[positions])
+        for loc, name in enumerate(self.columns):
+            if name in self.work_orders:
+                frame.insert(loc, name, self.work_orders[name].take(positions))
+        return frame
+
+    def iter_frames(self, block_rows=FORMAT_BLOCK_ROWS):
+        """
+        Expand the flat report in blocks of `block_rows` work orders (always at least one block).
+        """
+        for start in range(0, max(len(self), 1), block_rows):
+            yield self.to_frame(np.arange(start, min(start + block_rows, len(self))))
+
+    def write(self, path, quoting=csv.QUOTE_MINIMAL, output_format=None, progress=None, workers=1, executor=None):
+        """
+        Write the flat report with `write_report`, expanding one block of rows at a time.
+
+        The output is identical to writing `self.to_frame()`.
+        """
+        write_report(self.iter_frames(), path, quoting=quoting, output_format=output_format, progress=progress,
+                     workers=workers, executor=executor)
+
+    def memory_usage(self):
+        """
+        Bytes held by the report, counting the contents of string columns.
+        """
+        work_orders = sum(
+            values.codes.nbytes + values.categories.memory_usage(deep=True)
+            for values in self.work_orders.values()
+        )
+        return int(self.cases.memory_usage(deep=True).sum()) + self.case_rows.nbytes + work_orders
+
+
+def compare_compact(old, new):
+    """
+    `compare_reports` for two compact reports: only the key and status columns are
+    expanded for the diff, and only the reported work orders are expanded to full rows.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: New cases and cases changed to closed, with the
+        new report's columns plus 'Change Type'.
+    """
+    keys = [CASE_COLUMN, WORK_TYPE_COLUMN, STATUS_COLUMN]
+    for col in keys:
+        if col not in old.columns or col not in new.columns:
+            raise ValueError(f"Column '{col}' missing in one of the files.")
+
+    change_types, _ = diff_reports(old.key_frame(keys), new.key_frame(keys))
+
+    new_cases = new.to_frame(np.flatnonzero(change_types == CHANGE_NEW))
+    new_cases['Change Type'] = CHANGE_NEW
+
+    changed_to_closed = new.to_frame(np.flatnonzero(change_types == CHANGE_CLOSED))
+    changed_to_closed['Change Type'] = CHANGE_CLOSED
+    return new_cases, changed_to_closed
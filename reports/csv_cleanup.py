@@ -1,56 +1,649 @@
+import csv
+import heapq
+import io
+import os
+import tempfile
+from concurrent.futures import as_completed
+
+import numpy as np
 import pandas as pd
 from datetime import datetime as c_time
 
+from reports.compact import CompactReport
+from reports.instrumentation import JobStats
+from reports.jobs import JobProgress, ROWS_NORMALIZED, ROWS_READ, ROWS_WRITTEN, job_process_pool
+from reports.quality import (
+    CLAIMER_COUNT_MISMATCH, DUPLICATE_KEY, MISSING_CASE_NUMBER, NO_WORK_TYPES, STATUS_COUNT_MISMATCH, QualityReport,
+    adjacent_duplicates,
+)
+from reports.schema import (
+    export_dtypes, export_reader, pyarrow_available, read_export, read_header, require_columns,
+)
+from reports.shards import shard_offsets
+from reports.snapshots import SnapshotStore, snapshot_time
+from reports.vocabulary import map_distinct
+from reports.writer import (
+    FORMAT_CSV, FORMAT_PARQUET, default_process_workers, open_output, output_path, write_report,
+)
+
+
+# Columns that hold one pipe-delimited entry per work order on a case
+WORK_TYPES_COLUMN = 'Work Types'
+STATUSES_COLUMN = 'Statuses'
+CLAIMED_BY_COLUMN = 'Claimed By'
+WORK_ORDER_COLUMNS = [WORK_TYPES_COLUMN, STATUSES_COLUMN, CLAIMED_BY_COLUMN]
+
+# Output ordering
+CASE_NUMBER_COLUMN = 'Case Number'
+SORT_COLUMNS = [CASE_NUMBER_COLUMN, WORK_TYPES_COLUMN]
+
+# Columns an export must have; checked from the header before anything else is read
+REQUIRED_COLUMNS = [CASE_NUMBER_COLUMN] + WORK_ORDER_COLUMNS
+
+# Maximum number of sorted runs merged at once in streaming mode
+MERGE_FAN_IN = 64
+
+# How often (in rows) the streaming merge reports progress
+PROGRESS_INTERVAL = 50_000
+
+# Exports are only split across processes in shards of at least this size; below it,
+# starting the workers costs more than they save
+MIN_SHARD_BYTES = 16 * 1024 ** 2
+
+# Format normalized shards are handed back in: Arrow IPC (Feather) when pyarrow is installed
+SHARD_FORMAT = 'feather' if pyarrow_available() else 'pickle'
 
-def generate_csv_cleanup(input_file):
+# Column holding the export row positions in a Feather shard, which cannot store an index
+SHARD_ROW_COLUMN = '__export_row__'
+
+
+def _split_pipe_column(column, row_positions, slots):
     """
-    Reads disaster relief data and splits rows with multiple work types into separate rows.
-    Each output row will have exactly one work type with its associated status and claimer.
+    Split a pipe-delimited column and line its pieces up with the work-type slots.
+
+    Pieces are matched to work types by (row position, slot) so that a cell with fewer
+    entries than work types comes back as NaN for the missing slots, and extra entries
+    past the last work type are dropped.
+
+    Parameters:
+    column (pd.Series): Raw pipe-delimited column from the export
+    row_positions (np.ndarray): Row position of each output work order
+    slots (np.ndarray): Index of each output work order within its row
+
+    Returns:
+    tuple[pd.Series, np.ndarray]: One (unstripped) piece per output work order,
+    positionally aligned, and the number of pieces in each cell (0 where missing)
+    """
+    present = column.notna().to_numpy()
+    cells = pd.Series(column[present].astype(str).to_numpy(), dtype=object)
+    pieces = cells.str.split('|').explode()
+
+    # Row position and slot of each piece
+    piece_rows = np.flatnonzero(present)[pieces.index.to_numpy()]
+    piece_slots = pieces.groupby(level=0, sort=False).cumcount().to_numpy()
+
+    pieces.index = pd.MultiIndex.from_arrays([piece_rows, piece_slots])
+    wanted = pd.MultiIndex.from_arrays([row_positions, slots])
+    counts = np.bincount(piece_rows, minlength=len(column))
+    return pd.Series(pieces.reindex(wanted).to_numpy(dtype=object)), counts
+
+
+def _work_order_slots(work_types):
+    """
+    Row position and slot (index within its row) of every work order.
+    """
+    present = work_types.notna().to_numpy()
+
+    # Number of work orders on each row (0 for rows without work types)
+    counts = np.zeros(len(work_types), dtype=np.int64)
+    counts[present] = work_types[present].astype(str).str.count(r'\|').to_numpy() + 1
+
+    row_positions = np.repeat(np.arange(len(work_types)), counts)
+    starts = np.cumsum(counts) - counts
+    slots = np.arange(len(row_positions)) - np.repeat(starts, counts)
+    return row_positions, slots
+
+
+def _split_work_order_column(df, column, row_positions, slots):
+    """
+    One cleaned value per work order for a work-order column, as an object array, and
+    the number of entries in each row's cell.
+    """
+    pieces, counts = _split_pipe_column(df[column], row_positions, slots)
+    # Each distinct entry is stripped once; missing entries come back as None
+    stripped = map_distinct(pieces, str.strip)
+    if column == CLAIMED_BY_COLUMN:
+        # An empty claimer entry means unclaimed, the same as a missing one
+        stripped[(pieces == '').to_numpy()] = None
+    return stripped, counts
+
+
+def _record_row_issues(df, entry_counts, quality):
+    """
+    Record rows without a case number or work types, and rows whose Statuses or
+    Claimed By list does not line up with Work Types, from the entry counts of the split.
+    """
+    work_types = entry_counts[WORK_TYPES_COLUMN]
+    has_work_types = work_types > 0
+    claimers = entry_counts[CLAIMED_BY_COLUMN]
+    rows = df.index.to_numpy()
+    case_numbers = df[CASE_NUMBER_COLUMN].to_numpy(dtype=object)
+
+    quality.rows += len(df)
+    quality.add_mask(MISSING_CASE_NUMBER, pd.isna(case_numbers), rows, case_numbers)
+    quality.add_mask(NO_WORK_TYPES, ~has_work_types, rows, case_numbers)
+    quality.add_mask(STATUS_COUNT_MISMATCH, has_work_types & (entry_counts[STATUSES_COLUMN] != work_types),
+                     rows, case_numbers)
+    # An empty Claimed By just means nothing is claimed yet
+    quality.add_mask(CLAIMER_COUNT_MISMATCH, has_work_types & (claimers > 0) & (claimers != work_types),
+                     rows, case_numbers)
+
+
+def _record_duplicate_keys(result, quality):
+    """
+    Record work orders whose (Case Number, Work Types) repeats, in a sorted report.
+    """
+    if isinstance(result, CompactReport):
+        rows = result.cases.index.to_numpy()[result.case_rows]
+        case_numbers = result.column(CASE_NUMBER_COLUMN).to_numpy(dtype=object)
+        work_types = result.column(WORK_TYPES_COLUMN).to_numpy(dtype=object)
+    else:
+        rows = result.index.to_numpy()
+        case_numbers = result[CASE_NUMBER_COLUMN].to_numpy(dtype=object)
+        work_types = result[WORK_TYPES_COLUMN].to_numpy(dtype=object)
+    quality.add_mask(DUPLICATE_KEY, adjacent_duplicates(case_numbers, work_types), rows, case_numbers)
+
+
+def normalize_work_orders(df, quality=None):
+    """
+    Split rows with multiple work types into one row per work type (vectorized).
+
+    `Work Types`, `Statuses` and `Claimed By` are split together and exploded in one
+    pass. Behaviour matches the original row-by-row loop: rows without work types are
+    dropped, missing statuses become None, and `Claimed By` is padded with None.
+
+    Parameters:
+    df (pd.DataFrame): Export as read from the Crisis Cleanup CSV
+    quality (QualityReport): Optional; malformed rows found while splitting are recorded here
+
+    Returns:
+    pd.DataFrame: Normalized rows, in input order (not yet sorted)
+    """
+    row_positions, slots = _work_order_slots(df[WORK_TYPES_COLUMN])
+    result = df.take(row_positions)
+    entry_counts = {}
+    for column in WORK_ORDER_COLUMNS:
+        result[column], entry_counts[column] = _split_work_order_column(df, column, row_positions, slots)
+    if quality is not None:
+        _record_row_issues(df, entry_counts, quality)
+        quality.work_orders += len(result)
+    return result
+
+
+def normalize_work_orders_compact(df, quality=None):
+    """
+    `normalize_work_orders` into a `CompactReport`: case-level columns are kept once
+    per case instead of being copied onto every work-order row.
+
+    Parameters:
+    df (pd.DataFrame): Export as read from the Crisis Cleanup CSV
+    quality (QualityReport): Optional; malformed rows found while splitting are recorded here
+
+    Returns:
+    CompactReport: Normalized work orders, in input order (not yet sorted)
+    """
+    row_positions, slots = _work_order_slots(df[WORK_TYPES_COLUMN])
+    # One column at a time, so only one column of split strings exists at once
+    work_orders = {}
+    entry_counts = {}
+    for column in WORK_ORDER_COLUMNS:
+        values, entry_counts[column] = _split_work_order_column(df, column, row_positions, slots)
+        work_orders[column] = pd.Categorical(values)
+    if quality is not None:
+        _record_row_issues(df, entry_counts, quality)
+        quality.work_orders += len(row_positions)
+    # Shares the export's column data rather than copying it
+    cases = pd.DataFrame({column: df[column] for column in df.columns if column not in WORK_ORDER_COLUMNS},
+                         copy=False)
+    return CompactReport(cases, row_positions, work_orders, df.columns)
+
+
+def cleanup_dtypes(input_file):
+    """
+    dtypes an export is read with for cleaning: the export schema, and text for columns
+    not in it. Unknown columns are passed through as exported rather than inferred, since
+    a chunk or shard of the export could infer a different type than the whole file.
+    """
+    return export_dtypes(read_header(input_file), unknown=str)
+
+
+def _run_sort_key(case_position, work_type_position):
+    """
+    Build the merge key for rows read back from a spilled run.
+
+    Matches `sort_values(SORT_COLUMNS)` on the chunk: missing case numbers (written
+    as empty fields) sort last, everything else compares as text.
+    """
+    def key(row):
+        case_number = row[case_position]
+        return (case_number == '', case_number, row[work_type_position])
+    return key
+
+
+def _merge_runs(run_paths, output_file, fan_in=MERGE_FAN_IN, progress=None, output_format=None, quality=None):
+    """
+    K-way merge sorted CSV runs into `output_file`, streaming row by row.
+
+    When there are more runs than `fan_in`, groups of runs are merged into
+    intermediate runs first so the number of open files stays bounded.
+
+    Parameters:
+    run_paths (list[str]): Sorted CSV runs, in input order, all with the same header
+    output_file (str): Path of the merged CSV to write
+    fan_in (int): Maximum number of runs open at once
+    progress (JobProgress): Optional progress reporter for rows written to `output_file`
+    output_format (str): 'csv' (default), 'csv.gz' or 'csv.zst' for `output_file`
+    quality (QualityReport): Optional; repeated (Case Number, Work Types) keys in the
+        merged output are recorded here
+    """
+    while len(run_paths) > fan_in:
+        merged_paths = []
+        for start in range(0, len(run_paths), fan_in):
+            group = run_paths[start:start + fan_in]
+            merged_path = f"{group[0]}.merged"
+            _merge_runs(group, merged_path, fan_in)
+            if progress is not None:
+                progress.check_cancelled()
+            for path in group:
+                os.remove(path)
+            merged_paths.append(merged_path)
+        run_paths = merged_paths
+
+    files = [open(path, newline='', encoding='utf-8') for path in run_paths]
+    try:
+        readers = [csv.reader(f) for f in files]
+        headers = [next(reader) for reader in readers]
+        header = headers[0]
+        case_position, work_type_position = header.index(CASE_NUMBER_COLUMN), header.index(WORK_TYPES_COLUMN)
+        key = _run_sort_key(case_position, work_type_position)
+
+        with io.TextIOWrapper(open_output(output_file, output_format or FORMAT_CSV),
+                              encoding='utf-8', newline='') as out:
+            # Same line endings as DataFrame.to_csv so both modes produce identical files
+            writer = csv.writer(out, lineterminator=os.linesep)
+            writer.writerow(header)
+            # heapq.merge is stable across inputs, so ties keep input (chunk) order
+            rows_written = 0
+            previous = None
+            for row in heapq.merge(*readers, key=key):
+                writer.writerow(row)
+                rows_written += 1
+                if quality is not None:
+                    # Equal keys are adjacent in the merged output; missing case numbers are written as ''
+                    if previous is not None and row[case_position] != '' and \
+                            row[case_position] == previous[case_position] and \
+                            row[work_type_position] == previous[work_type_position]:
+                        quality.add(DUPLICATE_KEY, None, [row[case_position]])
+                    previous = row
+                if progress is not None and rows_written % PROGRESS_INTERVAL == 0:
+                    progress.update(ROWS_WRITTEN, rows_written)
+            if progress is not None:
+                progress.update(ROWS_WRITTEN, rows_written)
+    finally:
+        for f in files:
+            f.close()
+
+
+def _generate_csv_cleanup_streaming(input_file, output_file, chunksize, progress, stats, output_format=None,
+                                    quality=None):
+    """
+    Chunked version of `generate_csv_cleanup` for exports larger than memory.
+
+    Each chunk is normalized and sorted on its own, spilled to a temporary sorted
+    run, and the runs are merged into the output with an external merge sort. Only
+    one chunk is held in memory at a time.
+
+    Chunks are read with the same dtypes as the in-memory mode (see `cleanup_dtypes`),
+    so both modes write the same text for every value.
+    """
+    with tempfile.TemporaryDirectory(prefix='csv_cleanup_') as run_dir:
+        run_paths = []
+        columns = None
+        rows_read = 0
+        rows_normalized = 0
+        with pd.read_csv(input_file, dtype=cleanup_dtypes(input_file), chunksize=chunksize) as reader:
+            chunks = iter(reader)
+            while True:
+                with stats.stage('read_csv') as stage:
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        stage.add_rows(len(chunk))
+                if chunk is None:
+                    break
+                columns = chunk.columns
+                rows_read += len(chunk)
+                progress.update(ROWS_READ, rows_read)
+
+                with stats.stage('normalize') as stage:
+                    result = normalize_work_orders(chunk, quality=quality)
+                    stage.add_rows(len(result))
+                rows_normalized += len(result)
+                progress.update(ROWS_NORMALIZED, rows_normalized)
+
+                with stats.stage('sort'):
+                    result = result.sort_values(SORT_COLUMNS)
+
+                with stats.stage('spill'):
+                    run_path = os.path.join(run_dir, f"run_{len(run_paths):06d}.csv")
+                    result.to_csv(run_path, index=False, encoding='utf-8')
+                    run_paths.append(run_path)
+
+        with stats.stage('merge') as stage:
+            if run_paths:
+                _merge_runs(run_paths, output_file, progress=progress, output_format=output_format,
+                            quality=quality)
+            else:
+                # Header-only export
+                write_report(pd.DataFrame(columns=columns), output_file, output_format=output_format)
+            stage.add_rows(rows_normalized)
+
+
+def _clean_shard(input_file, header, start, end, dtype, engine, shard_path):
+    """
+    Parse and normalize one byte range of an export. Runs in a worker process.
+
+    The normalized rows are written to a file next to `shard_path` instead of being
+    returned, so the frame is not pickled through the pool's pipe. Rows are numbered
+    from the start of the shard.
+
+    Returns:
+    tuple[str, int, int, QualityReport]: Path of the written shard, rows read, rows
+    normalized and the shard's quality report
+    """
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        source = io.BytesIO(header + f.read(end - start))
+    df = export_reader(engine)(source, dtype=dtype)
+    rows_read = len(df)
+    quality = QualityReport(input_file)
+    result = normalize_work_orders(df, quality=quality)
+    del df, source
+
+    if SHARD_FORMAT == 'feather':
+        try:
+            result.rename_axis(SHARD_ROW_COLUMN).reset_index().to_feather(f"{shard_path}.feather")
+            return f"{shard_path}.feather", rows_read, len(result), quality
+        except Exception:
+            # Columns Arrow cannot store (e.g. mixed types) fall back to a pickle
+            pass
+    result.to_pickle(f"{shard_path}.pickle")
+    return f"{shard_path}.pickle", rows_read, len(result), quality
+
+
+def _read_shard(path, row_offset):
+    """
+    Load a normalized shard, indexed by row position in the whole export.
+    """
+    if path.endswith('.feather'):
+        frame = pd.read_feather(path).set_index(SHARD_ROW_COLUMN)
+        frame.index.name = None
+    else:
+        frame = pd.read_pickle(path)
+    frame.index = frame.index + row_offset
+    return frame
+
+
+def _concat_shards(frames):
+    """
+    Concatenate normalized shards in input order.
+
+    Categorical columns get the union of every shard's categories first (sorted, as
+    `read_csv` sorts them), so they stay categorical instead of falling back to object.
+    """
+    for column in frames[0].columns:
+        if all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = pd.Index(
+                np.concatenate([frame[column].cat.categories.to_numpy(dtype=object) for frame in frames])
+            ).unique().sort_values()
+            for frame in frames:
+                frame[column] = frame[column].cat.set_categories(categories)
+    return pd.concat(frames)
+
+
+def _shard_count(input_file, workers):
+    workers = workers or default_process_workers()
+    return int(max(1, min(workers, os.path.getsize(input_file) // MIN_SHARD_BYTES)))
+
+
+def _normalize_sharded(input_file, shards, progress, engine=None, quality=None):
+    """
+    Read and normalize an export in `shards` worker processes, one byte range each.
+
+    Ranges are split at record boundaries (see `shard_offsets`), and every range is
+    parsed with the full header and the same dtypes as the whole export (see
+    `cleanup_dtypes`), so no shard infers a type of its own. The normalized shards are
+    concatenated in input order and indexed by export row, so sorting the result gives
+    the same frame as normalizing the whole export in one process.
+
+    Returns:
+    tuple[pd.DataFrame, int]: Normalized rows in input order, and the number of rows read
+    """
+    header, ranges = shard_offsets(input_file, shards)
+    dtype = cleanup_dtypes(input_file)
+
+    with tempfile.TemporaryDirectory(prefix='csv_cleanup_') as shard_dir, \
+            job_process_pool(len(ranges)) as executor:
+        try:
+            futures = [
+                executor.submit(_clean_shard, input_file, header, start, end, dtype, engine,
+                                os.path.join(shard_dir, f"shard_{i:04d}"))
+                for i, (start, end) in enumerate(ranges)
+            ]
+            rows_read = 0
+            rows_normalized = 0
+            for future in as_completed(futures):
+                _, shard_read, shard_normalized, _ = future.result()
+                rows_read += shard_read
+                rows_normalized += shard_normalized
+                progress.update(ROWS_READ, rows_read)
+                progress.update(ROWS_NORMALIZED, rows_normalized)
+        except BaseException:
+            # Drop queued shards when the job is cancelled or a shard fails
+            executor.shutdown(cancel_futures=True)
+            raise
+        frames = []
+        row_offset = 0
+        for future in futures:
+            path, shard_read, _, shard_quality = future.result()
+            frames.append(_read_shard(path, row_offset))
+            if quality is not None:
+                quality.merge(shard_quality, row_offset)
+            row_offset += shard_read
+    return _concat_shards(frames), rows_read
+
+
+def clean_export(input_file, progress=None, use_cache=True, engine=None, stats=None, compact=False, workers=None,
+                 quality=None):
+    """
+    Read a raw export and return it normalized to one work order per row, sorted by
+    Case Number and Work Types, without writing anything.
 
     Parameters:
     input_file (str): Path to original CSV file
-    output_file (str): Path to new CSV file created by this script
+    progress (JobProgress): Optional progress reporter; cancelling it stops the job
+    use_cache (bool): Reuse a previously parsed copy of an unchanged export
+    engine (str): CSV engine for reading, 'c' (default) or 'pyarrow'
+    stats (JobStats): Optional instrumentation to record the stages in
+    compact (bool): Return a `CompactReport` instead of a flat frame, storing each
+        case's columns once rather than once per work order
+    workers (int): Processes to read and normalize a large export in, a shard of rows
+        each (default: CPU cores, or 1 inside a worker process). Exports under
+        MIN_SHARD_BYTES per shard, and compact mode, use one process. The parse cache is
+        not used when the export is sharded.
+    quality (QualityReport): Optional; malformed rows and duplicate keys found while
+        normalizing and sorting are recorded here
+
+    Returns:
+    pd.DataFrame or CompactReport: The cleaned report
+
+    Raises:
+    ValueError: If the export lacks a required column (checked before the body is read)
     """
+    progress = progress or JobProgress()
+    stats = stats or JobStats('csv_cleanup')
+    quality = quality or QualityReport(input_file)
+    require_columns(input_file, REQUIRED_COLUMNS)
+
+    shards = 1 if compact else _shard_count(input_file, workers)
+    if shards > 1:
+        # Parse and split work orders in parallel, one shard of the export per process
+        with stats.stage('read_and_normalize') as stage:
+            result, rows_read = _normalize_sharded(input_file, shards, progress, engine=engine, quality=quality)
+            stage.add_rows(rows_read)
+        with stats.stage('sort'):
+            result = result.sort_values(SORT_COLUMNS)
+            _record_duplicate_keys(result, quality)
+        progress.check_cancelled()
+        return result
+
     # Read the original CSV file you are wanting to effect/use as an input
-    df = pd.read_csv(input_file)
+    with stats.stage('read_csv') as stage:
+        df = read_export(input_file, unknown=str, engine=engine, use_cache=use_cache)
+        stage.add_rows(len(df))
+    progress.update(ROWS_READ, len(df))
+
+    # Split every work order onto its own row
+    with stats.stage('normalize') as stage:
+        normalize = normalize_work_orders_compact if compact else normalize_work_orders
+        result = normalize(df, quality=quality)
+        stage.add_rows(len(result))
+    del df
+    progress.update(ROWS_NORMALIZED, len(result))
 
-    # Initialize lists to store normalized data
-    normalized_rows = []
+    # Sort by Case Number and Work Types for organization
+    with stats.stage('sort'):
+        result = result.sort_values(SORT_COLUMNS)
+        _record_duplicate_keys(result, quality)
+    progress.check_cancelled()
+    return result
+
+
+def report_quality(quality, output_file):
+    """
+    Write a data-quality report as the `.quality.json` sidecar of `output_file`, and
+    print its summary if it found anything.
+    """
+    quality.write_sidecar(output_file)
+    if quality.issue_count:
+        print(f"Data quality issues in {os.path.basename(quality.source)}:\n{quality.summary()}")
+
+
+def generate_csv_cleanup(input_file, chunksize=None, progress=None, use_cache=True, output_file=None,
+                         engine=None, snapshot_store=None, stats=None, compact=False, output_format=None,
+                         workers=None):
+    """
+    Reads disaster relief data and splits rows with multiple work types into separate rows.
+    Each output row will have exactly one work type with its associated status and claimer.
+
+    Parameters:
+    input_file (str): Path to original CSV file
+    chunksize (int): Optional number of input rows per chunk. When set, the export is
+        streamed in chunks and sorted with an external merge sort, so memory use stays
+        bounded regardless of input size.
+    progress (JobProgress): Optional progress reporter; cancelling it stops the job
+    use_cache (bool): Reuse a previously parsed copy of an unchanged export (not used
+        in streaming mode)
+    output_file (str): Optional output path (defaults to a timestamped file in the
+        current directory)
+    engine (str): CSV engine for reading, 'c' (default) or 'pyarrow' (not used in
+        streaming mode). The output is the same with either.
+    snapshot_store (str): Optional SQLite snapshot store to ingest the cleaned report into,
+        dated by the export (`snapshot_time(input_file)`). The output is only written, or
+        in streaming mode only renamed into place, once the snapshot is stored.
+    stats (JobStats): Optional instrumentation; per-stage stats are always written to a
+        `.stats.json` sidecar next to the output
+    compact (bool): Keep the cleaned report as a `CompactReport` and expand it to flat
+        rows only while writing, a block at a time. The output is the same; peak memory
+        is much lower. No result frame is kept for previewing (not used in streaming mode)
+    output_format (str): 'csv' (default), 'csv.gz', 'csv.zst' or 'parquet' (not in
+        streaming mode). The default output name gets the matching suffix.
+    workers (int): Processes to read and normalize a large export in, a shard of rows
+        each (default: CPU cores, or 1 inside a worker process; not used in streaming
+        or compact mode). The output is the same for any number of workers.
+
+    Returns:
+    str: Path of the CSV file written. Malformed rows and duplicate keys are counted
+    in a `.quality.json` sidecar next to it.
 
-    for _, row in df.iterrows():
-        # Split the multiple values
-        work_types = str(row['Work Types']).split('|') if pd.notna(row['Work Types']) else []
-        statuses = str(row['Statuses']).split('|') if pd.notna(row['Statuses']) else []
-        claimed_by = str(row['Claimed By']).split('|') if pd.notna(row['Claimed By']) else []
+    Raises:
+    ValueError: If the export lacks a required column (checked before the body is read),
+    or is older than the latest snapshot in `snapshot_store` (checked before anything runs)
+    """
+    progress = progress or JobProgress()
+    stats = stats or JobStats('csv_cleanup')
 
-        # Ensure claimed_by list is as long as work_types by padding with None
-        claimed_by.extend([None] * (len(work_types) - len(claimed_by)))
+    ### Output file ###
+    if output_file is None:
+        # Get current time in DD-MM-YY- HHMMSS format
+        current_time = c_time.now().strftime("%m-%d-%y %H%M%S")
+        # Setup output file
+        output_file = output_path(f"csv_cleanup {current_time}.csv", output_format)
 
-        # Create a new row for each work type
-        for i, work_type in enumerate(work_types):
-            new_row = row.copy()
-            new_row['Work Types'] = work_type.strip()
-            new_row['Statuses'] = statuses[i].strip() if i < len(statuses) else None
-            new_row['Claimed By'] = claimed_by[i].strip() if claimed_by[i] else None
+    if snapshot_store:
+        # Dated by the export rather than by this run, the same as `SnapshotStore.ingest_file`
+        taken_at = snapshot_time(input_file)
+        with SnapshotStore(snapshot_store) as store:
+            store.check_order(taken_at, os.path.basename(output_file))
 
-            normalized_rows.append(new_row)
+    quality = QualityReport(input_file)
+    if chunksize:
+        if output_format == FORMAT_PARQUET:
+            raise ValueError("Parquet output is not available in streaming mode.")
+        require_columns(input_file, REQUIRED_COLUMNS)
+        # The snapshot is ingested from the merged file, which only gets its final name once stored
+        merged_file = os.path.join(os.path.dirname(output_file),
+                                   f".partial {os.path.basename(output_file)}") if snapshot_store else output_file
+        try:
+            with stats:
+                _generate_csv_cleanup_streaming(input_file, merged_file, chunksize, progress, stats, output_format,
+                                                quality=quality)
+                if snapshot_store:
+                    with stats.stage('snapshot_ingest'), SnapshotStore(snapshot_store) as store:
+                        store.ingest_file(merged_file, chunksize=chunksize, label=os.path.basename(output_file),
+                                          taken_at=taken_at, source_file=output_file)
+                    os.replace(merged_file, output_file)
+        finally:
+            if merged_file != output_file and os.path.exists(merged_file):
+                os.remove(merged_file)
+        stats.write_sidecar(output_file)
+        report_quality(quality, output_file)
+        return output_file
 
-    # Create a new DataFrame from the normalized rows
-    result = pd.DataFrame(normalized_rows)
+    with stats:
+        result = clean_export(input_file, progress=progress, use_cache=use_cache, engine=engine, stats=stats,
+                              compact=compact, workers=workers, quality=quality)
 
-    # Sort by Case Number and Work Types for organization
-    result = result.sort_values(['Case Number', 'Work Types'])
+        if snapshot_store:
+            # Stored before the output is written, so a snapshot that fails leaves no output behind
+            with stats.stage('snapshot_ingest'), SnapshotStore(snapshot_store) as store:
+                store.ingest(result.iter_frames() if compact else result, label=os.path.basename(output_file),
+                             taken_at=taken_at, source_file=os.path.abspath(output_file))
 
-    ### Save to CSV ###
-    # Get current time in DD-MM-YY- HHMMSS format
-    current_time = c_time.now().strftime("%m-%d-%y %H%M%S")
-    # Setup output file
-    output_file = f"csv_cleanup {current_time}.csv"
-    result.to_csv(output_file, index=False)
+        ### Save to CSV ###
+        with stats.stage('to_csv') as stage:
+            if compact:
+                result.write(output_file, output_format=output_format, progress=progress)
+            else:
+                write_report(result, output_file, output_format=output_format, progress=progress)
+            stage.add_rows(len(result))
+        progress.update(ROWS_WRITTEN, len(result))
+    stats.write_sidecar(output_file)
+    report_quality(quality, output_file)
+    if not compact:
+        progress.add_result("Cleaned", result)
 
     # Print summary statistics
     # print(f"\nNormalization complete. Summary:")
-    # print(f"Original rows: {len(df)}")
     # print(f"Normalized rows: {len(result)}")
     # print("\nWork Types distribution:")
     # print(result['Work Types'].value_counts())
@@ -59,4 +652,4 @@ def generate_csv_cleanup(input_file):
     # print("\nClaimer distribution:")
     # print(result['Claimed By'].value_counts())
 
-    # return result
+    return output_file
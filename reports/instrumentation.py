@@ -0,0 +1,218 @@
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# Number of functions listed from a cProfile capture in the stats sidecar
+PROFILE_TOP_FUNCTIONS = 25
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of this process in bytes, or None if it cannot be read.
+    """
+    # Linux: VmHWM belongs to the current address space, unlike ru_maxrss which survives exec
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+        return None
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, other platforms kilobytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def sidecar_base(output_file):
+    """
+    `output_file` without its extension, the name sidecar files are written under.
+    """
+    base, extension = os.path.splitext(output_file)
+    if extension.lower() in ('.gz', '.zst'):
+        # report.csv.gz -> report
+        base = os.path.splitext(base)[0]
+    return base
+
+
+class Stage:
+    """
+    Timing, memory and row counts recorded for one stage of a job.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.wall_seconds = 0.0
+        self.calls = 0
+        self.rows = None
+        self.peak_rss_bytes = None
+        self.peak_traced_bytes = None
+
+    def add_rows(self, rows):
+        self.rows = (self.rows or 0) + int(rows)
+
+    def to_dict(self):
+        return {
+            'stage': self.name,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'calls': self.calls,
+            'rows': self.rows,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'peak_traced_bytes': self.peak_traced_bytes,
+        }
+
+
+class JobStats:
+    """
+    Per-stage instrumentation shared by the report jobs.
+
+    A job wraps its whole run in `with stats:` and each step in `with stats.stage(name)`.
+    Repeated stages (e.g. one per chunk) accumulate. Stats can be shown as text or
+    written as a JSON sidecar next to an output file.
+
+    Parameters:
+    job (str): Job name
+    trace_memory (bool): Record peak Python allocations per stage with tracemalloc
+        (accurate but slows pandas down noticeably)
+    profile (bool): Capture a cProfile profile of the whole job
+    """
+
+    def __init__(self, job, trace_memory=False, profile=False):
+        self.job = job
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.stages = {}
+        self.wall_seconds = 0.0
+        self.peak_rss_bytes = None
+        self.profiler = None
+        self._started = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_seconds += time.perf_counter() - self._started
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.peak_rss_bytes = peak_rss_bytes()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time one stage of the job. Yields the `Stage`, so callers can record row counts.
+        """
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = Stage(name)
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall_seconds += time.perf_counter() - start
+            record.calls += 1
+            record.peak_rss_bytes = peak_rss_bytes()
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1]
+                record.peak_traced_bytes = max(record.peak_traced_bytes or 0, peak)
+
+    def to_dict(self):
+        data = {
+            'job': self.job,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'stages': [stage.to_dict() for stage in self.stages.values()],
+        }
+        if self.profiler is not None:
+            data['profile'] = self._profile_top()
+        return data
+
+    def _profile_top(self):
+        profile = pstats.Stats(self.profiler)
+        entries = sorted(profile.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                'function': f"{os.path.basename(filename)}:{line}({function})",
+                'calls': calls,
+                'total_seconds': round(total_time, 4),
+                'cumulative_seconds': round(cumulative_time, 4),
+            }
+            for (filename, line, function), (_, calls, total_time, cumulative_time, _)
+            in entries[:PROFILE_TOP_FUNCTIONS]
+        ]
+
+    def summary(self):
+        """
+        Human-readable per-stage table.
+        """
+        lines = [f"{self.job}: {self.wall_seconds:.2f} s total, peak RSS {_megabytes(self.peak_rss_bytes)}"]
+        for stage in self.stages.values():
+            rows = f"{stage.rows:,} rows" if stage.rows is not None else ""
+            line = f"  {stage.name:<16} {stage.wall_seconds:8.2f} s  {rows:>16}  peak RSS {_megabytes(stage.peak_rss_bytes)}"
+            if stage.peak_traced_bytes is not None:
+                line += f"  traced {_megabytes(stage.peak_traced_bytes)}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def write_sidecar(self, output_file):
+        """
+        Write the stats as `<output name>.stats.json` next to `output_file`; with profiling
+        on, the raw profile is also saved as `<output name>.prof`.
+
+        Returns:
+        str: Path of the JSON file
+        """
+        base = sidecar_base(output_file)
+        sidecar = f"{base}.stats.json"
+        with open(sidecar, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        if self.profiler is not None:
+            self.profiler.dump_stats(f"{base}.prof")
+        return sidecar
+
+
+def _megabytes(size):
+    return "n/a" if size is None else f"{size / 1024 ** 2:,.1f} MB"
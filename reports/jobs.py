@@ -0,0 +1,73 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Progress stages reported by the report jobs
+ROWS_READ = 'Rows read'
+ROWS_NORMALIZED = 'Rows normalized'
+ROWS_COMPARED = 'Rows compared'
+ROWS_WRITTEN = 'Rows written'
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a report job when the user cancels it.
+    """
+
+
+class JobProgress:
+    """
+    Progress reporting and cancellation shared between a report job and its caller.
+
+    A job calls `update()` as it moves through its stages; the caller receives the
+    counts through `callback` and can stop the job at the next update with `cancel()`.
+    Both sides may live on different threads. Jobs also hand their in-memory result
+    frames to `add_result()`, so the caller can preview them without re-reading the
+    output files.
+
+    Parameters:
+    callback (callable): Optional function called as callback(stage, count)
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.results = {}
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def update(self, stage, count):
+        """
+        Report that `count` rows have been processed for `stage`, then stop the job
+        if it has been cancelled.
+        """
+        if self.callback is not None:
+            self.callback(stage, int(count))
+        self.check_cancelled()
+
+    def add_result(self, name, frame):
+        """
+        Keep a reference to a result frame the job has written, under a display name.
+        """
+        self.results[name] = frame
+
+
+def job_process_pool(max_workers):
+    """
+    Process pool for the parallel stages of a report job.
+
+    The GUI runs jobs on a thread pool, and forking a process with other threads running
+    (Qt's among them) can leave the child deadlocked on a lock held by one of them. The
+    workers are therefore always started with 'spawn', on every platform.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
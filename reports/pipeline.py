@@ -0,0 +1,104 @@
+import os
+
+from datetime import datetime as c_time
+
+from reports.compact import compare_compact
+from reports.csv_cleanup import REQUIRED_COLUMNS, clean_export, report_quality
+from reports.instrumentation import JobStats
+from reports.jobs import JobProgress, ROWS_COMPARED
+from reports.quality import QualityReport
+from reports.schema import require_columns
+from reports.writer import format_pool, output_path, write_report
+from reports.weekly_report import compare_reports, write_weekly_reports
+
+
+def generate_weekly_report_from_exports(old_export, new_export, progress=None, use_cache=True, output_dir=None,
+                                        label=None, engine=None, keep_cleaned=False, stats=None, compact=False,
+                                        output_format=None, workers=None):
+    """
+    Generate the weekly New Cases and Closed Cases reports straight from two raw exports.
+
+    Both exports are cleaned in memory with the CSV Cleanup logic and the cleaned frames
+    are compared directly, skipping the write and re-read of two cleaned CSV files.
+
+    Parameters:
+        old_export (str): Path to the older raw Crisis Cleanup export.
+        new_export (str): Path to the newer raw Crisis Cleanup export.
+        progress (JobProgress): Optional progress reporter; cancelling it stops the job.
+        use_cache (bool): Reuse previously parsed copies of unchanged exports.
+        output_dir (str): Optional directory for the reports (defaults to the current directory).
+        label (str): Optional text used in the file names instead of the current time.
+        engine (str): CSV engine for reading, 'c' (default) or 'pyarrow'.
+        keep_cleaned (bool): Also write the two cleaned reports, as CSV Cleanup would.
+        stats (JobStats): Optional instrumentation; per-stage stats are always written to a
+            `.stats.json` sidecar next to each report.
+        compact (bool): Hold the cleaned exports as `CompactReport`s, so each case's columns
+            are stored once instead of once per work order, and expand only the reported
+            work orders. The reports are the same; peak memory is much lower.
+        output_format (str): 'csv' (default), 'csv.gz', 'csv.zst' or 'parquet', for the
+            reports and the cleaned files.
+        workers (int): Processes to format reports of a million rows or more in, one pool
+            for the whole job (default: this process).
+
+    Each export's data-quality report is written as a `.quality.json` sidecar named after
+    its cleaned report (e.g. `csv_cleanup new <label>.quality.json`), as CSV Cleanup
+    would, whether or not the cleaned reports are kept.
+
+    Returns:
+        tuple[str, ...]: Paths of the New Cases and Closed Cases reports, followed by the
+        cleaned old and new reports when `keep_cleaned` is set.
+    """
+    progress = progress or JobProgress()
+    stats = stats or JobStats('weekly_report_from_exports')
+    # Both exports are checked before either is cleaned
+    for export in (old_export, new_export):
+        require_columns(export, REQUIRED_COLUMNS)
+    if label is None:
+        # Get current time in DD-MM-YY- HHMMSS format
+        label = c_time.now().strftime("%m-%d-%y %H%M%S")
+
+    with stats:
+        cleaned = []
+        for name, export in (('old', old_export), ('new', new_export)):
+            cleaned_file = output_path(os.path.join(output_dir or '', f"csv_cleanup {name} {label}.csv"),
+                                       output_format)
+            quality = QualityReport(export)
+            df = clean_export(export, progress=progress, use_cache=use_cache, engine=engine, stats=stats,
+                              compact=compact, quality=quality)
+            report_quality(quality, cleaned_file)
+            cleaned.append((cleaned_file, df))
+        (_, df_old), (_, df_new) = cleaned
+
+        with stats.stage('diff') as stage:
+            if compact:
+                new_cases, changed_to_closed = compare_compact(df_old, df_new)
+            else:
+                new_cases, changed_to_closed = compare_reports(df_old, df_new)
+            stage.add_rows(len(df_new))
+        progress.update(ROWS_COMPARED, len(df_new))
+
+        # One pool formats every report of the job
+        largest = max(len(new_cases), len(changed_to_closed))
+        if keep_cleaned:
+            largest = max(largest, len(df_old), len(df_new))
+        with format_pool(workers, largest) as executor:
+            cleaned_files = []
+            if keep_cleaned:
+                for cleaned_file, df in cleaned:
+                    with stats.stage('write_cleaned') as stage:
+                        if compact:
+                            df.write(cleaned_file, output_format=output_format, progress=progress,
+                                     workers=workers, executor=executor)
+                        else:
+                            write_report(df, cleaned_file, output_format=output_format, progress=progress,
+                                         workers=workers, executor=executor)
+                        stage.add_rows(len(df))
+                    cleaned_files.append(cleaned_file)
+
+            outputs = write_weekly_reports(new_cases, changed_to_closed, progress=progress, output_dir=output_dir,
+                                           label=label, stats=stats, output_format=output_format, workers=workers,
+                                           executor=executor)
+
+    for output in outputs:
+        stats.write_sidecar(output)
+    return (*outputs, *cleaned_files)
@@ -0,0 +1,138 @@
+"""
+Data-quality report for a raw export, filled in while it is parsed and normalized.
+
+Nothing here reads the export again: the cleanup job hands over the masks it already
+has (work-order counts per row, sorted keys) and the report keeps counts and a few
+example rows per issue. The report is written as a `.quality.json` sidecar next to the
+cleaned output.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from reports.instrumentation import sidecar_base
+
+
+# Issues checked, with the wording used in summaries
+MISSING_CASE_NUMBER = 'missing_case_number'
+NO_WORK_TYPES = 'no_work_types'
+STATUS_COUNT_MISMATCH = 'status_count_mismatch'
+CLAIMER_COUNT_MISMATCH = 'claimer_count_mismatch'
+DUPLICATE_KEY = 'duplicate_key'
+ISSUES = {
+    MISSING_CASE_NUMBER: "rows without a case number",
+    NO_WORK_TYPES: "rows without work types (dropped)",
+    STATUS_COUNT_MISMATCH: "rows with a different number of statuses than work types",
+    CLAIMER_COUNT_MISMATCH: "rows with a different number of claimers than work types",
+    DUPLICATE_KEY: "work orders repeating an earlier (case number, work type)",
+}
+
+# Example rows kept per issue
+SAMPLE_SIZE = 5
+
+
+class QualityReport:
+    """
+    Counts and example rows of data-quality issues in one export.
+
+    Rows are numbered from 1 in export order, not counting the header. Duplicate keys
+    found while merging a streamed export have no row number.
+
+    Parameters:
+    source (str): Path of the export
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self.rows = 0
+        self.work_orders = 0
+        self.counts = dict.fromkeys(ISSUES, 0)
+        self.samples = {issue: [] for issue in ISSUES}
+
+    def add(self, issue, rows, case_numbers):
+        """
+        Record the rows that have `issue`.
+
+        Parameters:
+        issue (str): One of ISSUES
+        rows (np.ndarray): Zero-based export row positions, or None where unknown
+        case_numbers (np.ndarray): Case number of each row
+        """
+        self.counts[issue] += len(case_numbers)
+        room = SAMPLE_SIZE - len(self.samples[issue])
+        if room <= 0:
+            return
+        rows = [None] * min(room, len(case_numbers)) if rows is None else rows[:room]
+        for row, case_number in zip(rows, case_numbers[:room]):
+            self.samples[issue].append({
+                'row': None if row is None else int(row) + 1,
+                'case_number': None if pd.isna(case_number) else str(case_number),
+            })
+
+    def add_mask(self, issue, mask, rows, case_numbers):
+        """
+        `add` for the rows where `mask` is True.
+        """
+        if mask.any():
+            self.add(issue, rows[mask], case_numbers[mask])
+
+    def merge(self, other, row_offset=0):
+        """
+        Add the counts and samples of a report on a later part of the same export,
+        whose rows start at `row_offset`.
+        """
+        self.rows += other.rows
+        self.work_orders += other.work_orders
+        for issue in ISSUES:
+            self.counts[issue] += other.counts[issue]
+            room = SAMPLE_SIZE - len(self.samples[issue])
+            for sample in other.samples[issue][:max(room, 0)]:
+                row = sample['row']
+                self.samples[issue].append(dict(sample, row=None if row is None else row + row_offset))
+
+    @property
+    def issue_count(self):
+        return sum(self.counts.values())
+
+    def summary(self):
+        """
+        One line per issue found, e.g. "12 rows with a different number of statuses than work types".
+        """
+        return "\n".join(f"{count:,} {ISSUES[issue]}" for issue, count in self.counts.items() if count)
+
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'rows': self.rows,
+            'work_orders': self.work_orders,
+            'issues': {
+                issue: {'description': ISSUES[issue], 'count': self.counts[issue], 'samples': self.samples[issue]}
+                for issue in ISSUES
+            },
+        }
+
+    def write_sidecar(self, output_file):
+        """
+        Write the report as `<output name>.quality.json` next to `output_file`.
+
+        Returns:
+        str: Path of the JSON file
+        """
+        sidecar = f"{sidecar_base(output_file)}.quality.json"
+        with open(sidecar, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return sidecar
+
+
+def adjacent_duplicates(case_numbers, work_types):
+    """
+    For keys already sorted, True on every work order whose (case number, work type)
+    equals the one before it. Missing case numbers are never duplicates.
+    """
+    duplicated = np.zeros(len(case_numbers), dtype=bool)
+    if len(case_numbers) > 1:
+        duplicated[1:] = (
+            (case_numbers[1:] == case_numbers[:-1]) & (work_types[1:] == work_types[:-1]) & pd.notna(case_numbers[1:])
+        )
+    return duplicated
@@ -0,0 +1,181 @@
+import csv
+import gzip
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from reports.cache import read_csv_cached
+
+
+# Column kinds used by the export schema
+CATEGORY = 'category'
+STRING = 'string'
+FLOAT = 'float'
+DATETIME = 'datetime'
+
+# Known Crisis Cleanup export columns. Columns not listed here are passed through.
+EXPORT_SCHEMA = {
+    'Case Number': STRING,
+    'Work Types': CATEGORY,
+    'Statuses': CATEGORY,
+    'Claimed By': CATEGORY,
+    'Reported By': CATEGORY,
+    'Name': STRING,
+    'Address': STRING,
+    'City': CATEGORY,
+    'County': CATEGORY,
+    'State': CATEGORY,
+    'Postal Code': STRING,
+    'Phone 1': STRING,
+    'Phone 2': STRING,
+    'Email': STRING,
+    'Latitude': FLOAT,
+    'Longitude': FLOAT,
+    'Incident': CATEGORY,
+    'Created At': DATETIME,
+    'Updated At': DATETIME,
+}
+
+# pandas dtypes for each column kind. Dates and coordinates are read as text, so reports
+# write them back exactly as exported (a coordinate of "35.10" or "unknown" included).
+# Callers that need numbers convert them, e.g. with pd.to_numeric(errors='coerce').
+_KIND_DTYPES = {
+    CATEGORY: 'category',
+    STRING: str,
+    FLOAT: str,
+    DATETIME: str,
+}
+
+# CSV parsers accepted by read_export. Reports are always written by pandas, so the
+# engine never changes an output.
+ENGINE_PANDAS = 'c'
+ENGINE_PYARROW = 'pyarrow'
+
+
+def pyarrow_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def read_header(path):
+    """
+    Read only the header row of a CSV file (plain, or gzip-compressed as written by the
+    report jobs' 'csv.gz' output format).
+    """
+    opener = gzip.open if str(path).lower().endswith('.gz') else open
+    with opener(path, 'rt', newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def require_columns(path, columns):
+    """
+    Check that a CSV file has `columns` from its header alone, before any of its body
+    is read, so a wrong file fails in milliseconds rather than after it is parsed.
+
+    Returns:
+    list[str]: The header
+
+    Raises:
+    ValueError: Naming the file and every missing column
+    """
+    header = read_header(path)
+    missing = [column for column in columns if column not in header]
+    if missing:
+        names = ', '.join(f"'{column}'" for column in missing)
+        raise ValueError(f"Column{'s' if len(missing) > 1 else ''} {names} missing in {os.path.basename(path)}.")
+    return header
+
+
+def _read_csv_pyarrow(path, dtype, usecols=None):
+    """
+    Parse a CSV (path or binary file-like) with the multithreaded pyarrow reader and apply the pandas dtypes.
+
+    pandas' own `engine='pyarrow'` cannot read quoted values that span lines, which
+    free-text columns in the exports contain, so the reader is called directly. The
+    same values are read as missing as by `pd.read_csv`, so both engines give the same frame.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    from pandas._libs.parsers import STR_NA_VALUES
+
+    column_types = {column: pa.string() for column in dtype}
+    table = pa_csv.read_csv(
+        path,
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types, null_values=sorted(STR_NA_VALUES),
+                                              strings_can_be_null=True, include_columns=usecols),
+    )
+    df = table.to_pandas()
+    # pd.read_csv marks missing text as NaN, Arrow as None
+    text = [column for column in df.columns if df[column].dtype == object]
+    if text:
+        df[text] = df[text].fillna(np.nan)
+    categories = {column: 'category' for column, column_dtype in dtype.items() if column_dtype == 'category'}
+    return df.astype(categories) if categories else df
+
+
+def export_dtypes(columns, unknown=None):
+    """
+    `read_csv` dtype mapping for the given columns.
+
+    Parameters:
+    columns (list[str]): Column names from the file header
+    unknown: dtype for columns missing from EXPORT_SCHEMA (None lets pandas infer them)
+    """
+    dtypes = {}
+    for column in columns:
+        kind = EXPORT_SCHEMA.get(column)
+        if kind is not None:
+            dtypes[column] = _KIND_DTYPES[kind]
+        elif unknown is not None:
+            dtypes[column] = unknown
+    return dtypes
+
+
+def export_reader(engine=None):
+    """
+    CSV parser for an engine, called like `pd.read_csv(source, dtype=..., usecols=...)`.
+    """
+    engine = engine or ENGINE_PANDAS
+    if engine == ENGINE_PYARROW and not pyarrow_available():
+        raise ValueError("The pyarrow CSV engine needs the 'pyarrow' package to be installed.")
+    return _read_csv_pyarrow if engine == ENGINE_PYARROW else pd.read_csv
+
+
+def read_export(path, unknown=None, engine=None, parse_dates=False, use_cache=True, columns=None):
+    """
+    Read a Crisis Cleanup export (raw or cleaned) with the declared column schema.
+
+    Work-order columns are read as categoricals, and case numbers, free text, dates and
+    coordinates as strings, so pandas does not have to infer types column by column.
+
+    Parameters:
+    path (str): CSV file to read
+    unknown: dtype for columns not in EXPORT_SCHEMA (None lets pandas infer them)
+    engine (str): 'c' (default) or 'pyarrow' for the multithreaded pyarrow parser
+    parse_dates (bool): Convert the schema's date columns to datetimes
+    use_cache (bool): Reuse a previously parsed copy of an unchanged file
+    columns (list[str]): Only read these columns (those missing from the file are skipped)
+
+    Returns:
+    pd.DataFrame: The parsed export
+    """
+    reader = export_reader(engine)
+    header = read_header(path)
+    options = {}
+    if columns is not None:
+        header = [column for column in header if column in columns]
+        options['usecols'] = header
+    options['dtype'] = export_dtypes(header, unknown)
+
+    if use_cache:
+        df = read_csv_cached(path, reader=reader, **options)
+    else:
+        df = reader(path, **options)
+
+    if parse_dates:
+        for column, kind in EXPORT_SCHEMA.items():
+            if kind == DATETIME and column in df.columns:
+                df[column] = pd.to_datetime(df[column], errors='coerce', utc=True)
+    return df
@@ -0,0 +1,88 @@
+"""
+Split a CSV file into byte ranges that each hold whole records, so the ranges can be
+parsed independently (e.g. in parallel worker processes).
+"""
+import os
+
+
+# Bytes scanned per read while looking for record boundaries
+SCAN_BLOCK_SIZE = 4 * 1024 ** 2
+
+
+def _count_quotes(f, start, end):
+    """
+    Number of double quotes between two offsets of a binary file.
+    """
+    f.seek(start)
+    count = 0
+    remaining = end - start
+    while remaining > 0:
+        block = f.read(min(SCAN_BLOCK_SIZE, remaining))
+        if not block:
+            break
+        count += block.count(b'"')
+        remaining -= len(block)
+    return count
+
+
+def _next_record_start(f, position, in_quotes):
+    """
+    Offset just past the first newline at or after `position` that is not inside a
+    quoted field, given whether `position` itself is inside one.
+
+    Returns:
+    int: The offset, or None if the file ends first
+    """
+    f.seek(position)
+    while True:
+        block = f.read(SCAN_BLOCK_SIZE)
+        if not block:
+            return None
+        scanned = 0
+        while True:
+            newline = block.find(b'\n', scanned)
+            if newline < 0:
+                break
+            # Escaped quotes ("") come in pairs, so the parity of all quotes seen gives the quoting state
+            in_quotes ^= block.count(b'"', scanned, newline) % 2 == 1
+            if not in_quotes:
+                return position + newline + 1
+            scanned = newline + 1
+        in_quotes ^= block.count(b'"', scanned) % 2 == 1
+        position += len(block)
+
+
+def shard_offsets(path, shards):
+    """
+    Split a CSV file's records into about `shards` byte ranges of similar size.
+
+    Boundaries always fall right after a line ending that is outside quoted fields, so
+    a value spanning several lines is never cut. Ranges cover every record exactly once.
+
+    Parameters:
+    path (str): CSV file with a header row
+    shards (int): Number of ranges wanted; fewer come back for small files
+
+    Returns:
+    tuple[bytes, list[tuple[int, int]]]: The header line, and the (start, end) byte
+    offsets of each range
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        offsets = [f.tell()]
+        scanned, quotes = offsets[0], 0
+        for i in range(1, shards):
+            target = offsets[0] + (size - offsets[0]) * i // shards
+            if target <= offsets[-1]:
+                continue
+            quotes += _count_quotes(f, scanned, target)
+            scanned = target
+            boundary = _next_record_start(f, target, quotes % 2 == 1)
+            if boundary is None or boundary >= size:
+                break
+            quotes += _count_quotes(f, target, boundary)
+            scanned = boundary
+            offsets.append(boundary)
+    offsets.append(size)
+    return header, [(start, end) for start, end in zip(offsets, offsets[1:]) if end > start]
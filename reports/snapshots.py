@@ -0,0 +1,334 @@
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from reports.vocabulary import default_state_model
+from reports.weekly_report import (
+    CASE_COLUMN, CHANGE_CLOSED, CHANGE_NEW, CHANGE_REMOVED, STATUS_COLUMN, WORK_TYPE_COLUMN, write_weekly_reports,
+)
+
+
+# Timestamp in the default CSV Cleanup output name, e.g. "csv_cleanup 03-14-25 091500.csv"
+_CLEANUP_NAME_TIME = re.compile(r'(\d{2}-\d{2}-\d{2} \d{6})')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT NOT NULL,
+    taken_at TEXT NOT NULL,
+    source_file TEXT,
+    columns TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0
+);
+-- One row per version of a work order. A version is current from the snapshot
+-- that introduced it up to (not including) the snapshot that replaced or removed it.
+CREATE TABLE IF NOT EXISTS work_orders (
+    case_number TEXT NOT NULL,
+    work_type TEXT NOT NULL,
+    status TEXT,
+    row_hash INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    valid_from INTEGER NOT NULL REFERENCES snapshots (id),
+    valid_to INTEGER REFERENCES snapshots (id)
+);
+CREATE INDEX IF NOT EXISTS work_orders_key ON work_orders (case_number, work_type, valid_from);
+CREATE INDEX IF NOT EXISTS work_orders_valid_from ON work_orders (valid_from);
+CREATE INDEX IF NOT EXISTS work_orders_valid_to ON work_orders (valid_to);
+"""
+
+# Work orders that changed between two snapshots, with their version at each end
+_CHANGES_QUERY = """
+WITH changed AS (
+    SELECT case_number, work_type FROM work_orders WHERE valid_from > :old AND valid_from <= :new
+    UNION
+    SELECT case_number, work_type FROM work_orders WHERE valid_to > :old AND valid_to <= :new
+)
+SELECT c.case_number, c.work_type, o.status, o.data, n.status, n.data
+FROM changed c
+LEFT JOIN work_orders o
+    ON o.case_number = c.case_number AND o.work_type = c.work_type
+    AND o.valid_from <= :old AND (o.valid_to IS NULL OR o.valid_to > :old)
+LEFT JOIN work_orders n
+    ON n.case_number = c.case_number AND n.work_type = c.work_type
+    AND n.valid_from <= :new AND (n.valid_to IS NULL OR n.valid_to > :new)
+"""
+
+
+def snapshot_time(path):
+    """
+    When a cleaned snapshot was taken: the timestamp in a default CSV Cleanup file
+    name if there is one, otherwise the file's modification time.
+    """
+    match = _CLEANUP_NAME_TIME.search(os.path.basename(path))
+    if match:
+        return datetime.strptime(match.group(1), "%m-%d-%y %H%M%S")
+    return datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def _key_text(column):
+    return column.astype(object).fillna('').astype(str).to_numpy()
+
+
+def _row_hashes(df):
+    """
+    Content hash of every row, stable across runs and independent of column dtypes.
+    """
+    as_text = df.astype(object).where(df.notna(), '').astype(str)
+    return pd.util.hash_pandas_object(as_text, index=False).to_numpy().view(np.int64)
+
+
+def _row_json(df):
+    records = df.astype(object).where(df.notna(), None).to_dict('records')
+    return [json.dumps(record, default=str) for record in records]
+
+
+class SnapshotStore:
+    """
+    Persistent history of cleaned reports in a local SQLite database.
+
+    Each ingested snapshot only stores the work orders that are new or whose content
+    hash changed since the previous snapshot, so diffing any two snapshots only touches
+    the rows that changed between them. Snapshots must be ingested oldest first.
+
+    Parameters:
+    path (str): SQLite database file (created if missing)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def snapshots(self):
+        """
+        All snapshots in the store, oldest first.
+        """
+        return pd.read_sql_query(
+            "SELECT id, label, taken_at, source_file, row_count FROM snapshots ORDER BY id",
+            self.connection,
+        )
+
+    def snapshot_at(self, when):
+        """
+        Id of the latest snapshot taken at or before `when` (a datetime or ISO string).
+        """
+        when = pd.Timestamp(when).isoformat()
+        row = self.connection.execute(
+            "SELECT id FROM snapshots WHERE taken_at <= ? ORDER BY taken_at DESC, id DESC LIMIT 1",
+            (when,),
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"No snapshot taken at or before {when}.")
+        return row[0]
+
+    def check_order(self, taken_at, label):
+        """
+        Raise ValueError if a snapshot taken at `taken_at` would be older than the latest
+        one in the store, since snapshots must be ingested oldest first.
+        """
+        taken_at = pd.Timestamp(taken_at).isoformat()
+        last = self.connection.execute("SELECT MAX(taken_at) FROM snapshots").fetchone()[0]
+        if last is not None and taken_at < last:
+            raise ValueError(
+                f"Snapshot '{label}' ({taken_at}) is older than the latest snapshot ({last}); "
+                "snapshots must be ingested oldest first."
+            )
+
+    def latest_snapshot(self):
+        row = self.connection.execute("SELECT MAX(id) FROM snapshots").fetchone()
+        return row[0]
+
+    def ingest(self, frames, label, taken_at=None, source_file=None):
+        """
+        Add a cleaned report as a new snapshot.
+
+        Parameters:
+        frames (pd.DataFrame or iterable of pd.DataFrame): The cleaned report, whole or
+            in chunks (e.g. from `pd.read_csv(..., chunksize=...)`)
+        label (str): Name shown for the snapshot
+        taken_at (datetime): When the export was taken (defaults to now)
+        source_file (str): Optional path of the cleaned CSV
+
+        Returns:
+        int: Id of the new snapshot
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        taken_at = pd.Timestamp(taken_at or datetime.now()).isoformat()
+
+        with self.connection:
+            self.check_order(taken_at, label)
+
+            cursor = self.connection.execute(
+                "INSERT INTO snapshots (label, taken_at, source_file, columns) VALUES (?, ?, ?, '[]')",
+                (label, taken_at, source_file),
+            )
+            snapshot_id = cursor.lastrowid
+
+            # Current version of every work order: key -> (rowid, row hash)
+            current = pd.read_sql_query(
+                "SELECT rowid, case_number, work_type, row_hash FROM work_orders WHERE valid_to IS NULL",
+                self.connection,
+            )
+            current_keys = pd.MultiIndex.from_arrays([current['case_number'], current['work_type']])
+            current_rowids = current['rowid'].to_numpy()
+            current_hashes = current['row_hash'].to_numpy()
+            seen = np.zeros(len(current), dtype=bool)
+            ingested_keys = None
+
+            columns = None
+            row_count = 0
+            for df in frames:
+                columns = list(df.columns) if columns is None else columns
+                row_count += len(df)
+
+                case_numbers = _key_text(df[CASE_COLUMN])
+                work_types = _key_text(df[WORK_TYPE_COLUMN])
+                keys = pd.MultiIndex.from_arrays([case_numbers, work_types])
+
+                # The first occurrence of a key wins, as in the weekly diff
+                first = ~keys.duplicated()
+                if ingested_keys is not None:
+                    first &= ~keys.isin(ingested_keys)
+                    ingested_keys = ingested_keys.append(keys[first])
+                else:
+                    ingested_keys = keys[first]
+
+                hashes = _row_hashes(df)
+                positions = current_keys.get_indexer(keys)
+                matched = positions >= 0
+                seen[positions[matched & first]] = True
+
+                same = np.zeros(len(df), dtype=bool)
+                same[matched] = current_hashes[positions[matched]] == hashes[matched]
+                changed = first & ~same
+
+                # Close the versions that are being replaced
+                replaced = current_rowids[positions[changed & matched]]
+                self.connection.executemany(
+                    "UPDATE work_orders SET valid_to = ? WHERE rowid = ?",
+                    ((snapshot_id, int(rowid)) for rowid in replaced),
+                )
+
+                rows = df[changed]
+                statuses = rows[STATUS_COLUMN].astype(object).where(rows[STATUS_COLUMN].notna(), None)
+                self.connection.executemany(
+                    "INSERT INTO work_orders (case_number, work_type, status, row_hash, data, valid_from) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    zip(case_numbers[changed], work_types[changed], statuses, map(int, hashes[changed]),
+                        _row_json(rows), [snapshot_id] * int(changed.sum())),
+                )
+
+            # Work orders missing from this snapshot were removed
+            self.connection.executemany(
+                "UPDATE work_orders SET valid_to = ? WHERE rowid = ?",
+                ((snapshot_id, int(rowid)) for rowid in current_rowids[~seen]),
+            )
+            self.connection.execute(
+                "UPDATE snapshots SET columns = ?, row_count = ? WHERE id = ?",
+                (json.dumps(columns or []), row_count, snapshot_id),
+            )
+        return snapshot_id
+
+    def ingest_file(self, path, chunksize=100_000, label=None, taken_at=None, source_file=None):
+        """
+        Ingest a cleaned CSV in chunks. The label, time and source file default to the
+        file's name, `snapshot_time()` and path.
+        """
+        with pd.read_csv(path, dtype=str, chunksize=chunksize) as reader:
+            return self.ingest(
+                reader,
+                label=label or os.path.basename(path),
+                taken_at=taken_at or snapshot_time(path),
+                source_file=os.path.abspath(source_file or path),
+            )
+
+    def changes(self, old_snapshot, new_snapshot):
+        """
+        Work orders that differ between two snapshots, classified like `diff_reports`.
+
+        Only versions created or retired between the two snapshots are read.
+
+        Returns:
+        pd.DataFrame: One row per changed work order with 'Change Type' and the old and
+        new version's status and row data (None where the work order did not exist)
+        """
+        if old_snapshot >= new_snapshot:
+            raise ValueError("The old snapshot must come before the new snapshot.")
+        for snapshot in (old_snapshot, new_snapshot):
+            if not self.connection.execute("SELECT 1 FROM snapshots WHERE id = ?", (snapshot,)).fetchone():
+                raise ValueError(f"Snapshot {snapshot} does not exist.")
+        rows = self.connection.execute(
+            _CHANGES_QUERY, {'old': old_snapshot, 'new': new_snapshot}
+        ).fetchall()
+        changes = pd.DataFrame(rows, columns=[
+            CASE_COLUMN, WORK_TYPE_COLUMN, 'old_status', 'old_data', 'new_status', 'new_data',
+        ])
+
+        existed = changes['old_data'].notna().to_numpy()
+        exists = changes['new_data'].notna().to_numpy()
+        model = default_state_model()
+        change_types = model.classify(model.state_codes(changes['old_status']),
+                                      model.state_codes(changes['new_status']))
+        changes['Change Type'] = np.select([~existed, ~exists], [CHANGE_NEW, CHANGE_REMOVED], default=change_types)
+        return changes
+
+    def report_rows(self, changes, change_type, snapshot):
+        """
+        Rebuild the new-snapshot rows for one change type as a report frame.
+        """
+        columns = json.loads(self.connection.execute(
+            "SELECT columns FROM snapshots WHERE id = ?", (snapshot,)
+        ).fetchone()[0])
+        selected = changes[changes['Change Type'] == change_type]
+        records = [json.loads(data) for data in selected['new_data']]
+        report = pd.DataFrame.from_records(records, columns=columns)
+        report = report.sort_values([CASE_COLUMN, WORK_TYPE_COLUMN]) if len(report) else report
+        report['Change Type'] = change_type
+        return report
+
+
+def generate_weekly_report_from_store(store_path, old_snapshot=None, new_snapshot=None, output_dir=None,
+                                      label=None, output_format=None):
+    """
+    Generate the New Cases and Closed Cases reports from the snapshot store instead of
+    two cleaned CSV files. Only work orders that changed between the two snapshots are
+    read, so the cost grows with the number of changes rather than the report size.
+
+    Parameters:
+        store_path (str): SQLite snapshot store written by `SnapshotStore`.
+        old_snapshot (int): Id of the old snapshot (defaults to the one before `new_snapshot`).
+        new_snapshot (int): Id of the new snapshot (defaults to the latest).
+        output_dir (str): Optional directory for the reports (defaults to the current directory).
+        label (str): Optional text used in the report file names instead of the current time.
+        output_format (str): One of `writer.OUTPUT_FORMATS` (default plain CSV).
+
+    Returns:
+        tuple[str, str]: Paths of the New Cases and Closed Cases reports.
+    """
+    with SnapshotStore(store_path) as store:
+        new_snapshot = new_snapshot or store.latest_snapshot()
+        if new_snapshot is None:
+            raise ValueError("The snapshot store is empty.")
+        old_snapshot = old_snapshot or new_snapshot - 1
+
+        changes = store.changes(old_snapshot, new_snapshot)
+        new_cases = store.report_rows(changes, CHANGE_NEW, new_snapshot)
+        changed_to_closed = store.report_rows(changes, CHANGE_CLOSED, new_snapshot)
+
+    return write_weekly_reports(new_cases, changed_to_closed, output_dir=output_dir, label=label,
+                                output_format=output_format)
@@ -0,0 +1,236 @@
+import os
+from datetime import datetime as c_time
+
+import pandas as pd
+
+from reports.csv_cleanup import CLAIMED_BY_COLUMN
+from reports.instrumentation import JobStats
+from reports.jobs import JobProgress, ROWS_COMPARED, ROWS_READ, ROWS_WRITTEN, job_process_pool
+from reports.schema import read_export, require_columns
+from reports.snapshots import snapshot_time
+from reports.weekly_report import (
+    CASE_COLUMN, CHANGE_CLOSED, CHANGE_NEW, CHANGE_REASSIGNED, CHANGE_REOPENED, STATUS_COLUMN, WORK_TYPE_COLUMN,
+    diff_reports, is_closed,
+)
+from reports.writer import write_report
+
+
+# Columns kept from each snapshot; everything else is skipped while parsing
+TREND_COLUMNS = [CASE_COLUMN, WORK_TYPE_COLUMN, STATUS_COLUMN, CLAIMED_BY_COLUMN]
+
+# Placeholder for work orders nobody has claimed
+UNCLAIMED = '(unclaimed)'
+
+
+def load_compact_snapshot(path, engine=None, use_cache=True):
+    """
+    Load only the key, status and claimer columns of a cleaned snapshot.
+
+    Work Types, Statuses and Claimed By are categoricals, so a snapshot takes little
+    more memory than its case numbers and is cheap to send between processes.
+
+    Returns:
+    pd.DataFrame: Case Number, Work Types, Statuses and Claimed By
+    """
+    df = read_export(path, unknown=str, engine=engine, use_cache=use_cache, columns=TREND_COLUMNS)
+    for col in [CASE_COLUMN, WORK_TYPE_COLUMN, STATUS_COLUMN]:
+        if col not in df.columns:
+            raise ValueError(f"Column '{col}' missing in {os.path.basename(path)}.")
+    if CLAIMED_BY_COLUMN not in df.columns:
+        df[CLAIMED_BY_COLUMN] = pd.Categorical([None] * len(df))
+    return df[TREND_COLUMNS]
+
+
+def diff_snapshots(df_old, df_new):
+    """
+    Summarise the changes between two consecutive compact snapshots.
+
+    Returns:
+    tuple[dict, pd.DataFrame, pd.DataFrame]: Change counts, the keys of work orders
+    that first appear in `df_new`, and the keys and claimers of work orders that
+    changed to closed
+    """
+    change_types, removed = diff_reports(df_old, df_new)
+    now_closed = is_closed(df_new[STATUS_COLUMN])
+    counts = {
+        'Opened': int((change_types == CHANGE_NEW).sum()),
+        'Closed': int((change_types == CHANGE_CLOSED).sum()),
+        'Reopened': int((change_types == CHANGE_REOPENED).sum()),
+        'Reassigned': int((change_types == CHANGE_REASSIGNED).sum()),
+        'Removed': len(removed),
+        'Open Work Orders': int((~now_closed).sum()),
+        'Closed Work Orders': int(now_closed.sum()),
+    }
+    keys = [CASE_COLUMN, WORK_TYPE_COLUMN]
+    opened = df_new.loc[(change_types == CHANGE_NEW).to_numpy(), keys]
+    closed = df_new.loc[(change_types == CHANGE_CLOSED).to_numpy(), keys + [CLAIMED_BY_COLUMN]]
+    return counts, opened, closed
+
+
+def weekly_counts(snapshot_times, counts):
+    """
+    One row per consecutive pair of snapshots, dated by the newer snapshot.
+    """
+    df = pd.DataFrame(counts)
+    df.insert(0, 'Week Ending', [when.strftime('%Y-%m-%d') for when in snapshot_times[1:]])
+    df.insert(1, 'Days', [
+        round((new - old).total_seconds() / 86400, 1) for old, new in zip(snapshot_times, snapshot_times[1:])
+    ])
+    return df
+
+
+def time_to_close(snapshot_times, opened, closed):
+    """
+    Days from the snapshot where a work order appears to the first one after it where it
+    is seen closed, summarised per work type.
+
+    A work order that drops out of the exports and appears again is opened again, so
+    each appearance is timed to its own closure. Work orders already present in the
+    first snapshot are left out until they appear again, since when they were opened is
+    unknown. Times are only as precise as the gaps between snapshots.
+
+    Parameters:
+    snapshot_times (list[datetime]): When each snapshot was taken
+    opened (list[pd.DataFrame]): Keys of new work orders per pair, from `diff_snapshots`
+    closed (list[pd.DataFrame]): Keys of work orders changed to closed per pair
+    """
+    keys = [CASE_COLUMN, WORK_TYPE_COLUMN]
+    times = pd.to_datetime(pd.Series(snapshot_times[1:]))
+
+    def events(frames, column):
+        stacked = pd.concat(
+            [frame[keys].astype(object).assign(**{column: times[i]}) for i, frame in enumerate(frames)],
+            ignore_index=True,
+        )
+        return stacked.sort_values(column, kind='stable')
+
+    # Each closure belongs to the latest opening before it, and each opening is timed to
+    # the first of its closures
+    durations = pd.merge_asof(
+        events(closed, 'Closed At'), events(opened, 'Opened At'), left_on='Closed At', right_on='Opened At',
+        by=keys, allow_exact_matches=False,
+    ).dropna(subset=['Opened At'])
+    durations = durations.drop_duplicates(keys + ['Opened At'], keep='first')
+    days = (durations['Closed At'] - durations['Opened At']).dt.total_seconds() / 86400
+
+    summary = days.groupby(durations[WORK_TYPE_COLUMN]).agg(['count', 'median', 'mean', 'max'])
+    summary.columns = ['Closed', 'Median Days', 'Mean Days', 'Max Days']
+    return summary.round(1).reset_index().sort_values(WORK_TYPE_COLUMN)
+
+
+def claimer_throughput(snapshot_times, closed):
+    """
+    Work orders each claimer closed per week, with a total column, busiest claimer first.
+    """
+    weeks = [when.strftime('%Y-%m-%d') for when in snapshot_times[1:]]
+    stacked = pd.concat(
+        [
+            pd.DataFrame({
+                CLAIMED_BY_COLUMN: frame[CLAIMED_BY_COLUMN].astype(object).fillna(UNCLAIMED).replace('', UNCLAIMED),
+                'Week Ending': weeks[i],
+            })
+            for i, frame in enumerate(closed)
+        ],
+        ignore_index=True,
+    )
+    table = pd.crosstab(stacked[CLAIMED_BY_COLUMN], stacked['Week Ending']).reindex(columns=weeks, fill_value=0)
+    table['Total'] = table.sum(axis=1)
+    table = table.sort_values('Total', ascending=False, kind='stable')
+    table.columns.name = None
+    return table.reset_index()
+
+
+def generate_trend_report(snapshot_files, progress=None, use_cache=True, output_dir=None, label=None,
+                          engine=None, workers=None, stats=None):
+    """
+    Generate trend reports over a series of cleaned snapshots (processed by csv_cleanup.py).
+
+    Snapshots are ordered by when they were taken and loaded in parallel worker processes.
+    Each consecutive pair is diffed here as soon as both are loaded, while later
+    snapshots are still loading, so every snapshot crosses between processes only once.
+
+    Exports three CSV files:
+    1. Trend Report: opened, closed, reopened and reassigned work orders per week
+    2. Time to Close: days from each appearance to the next closure, per work type
+    3. Claimer Throughput: work orders each claimer closed per week
+
+    Parameters:
+        snapshot_files (list[str]): Paths to two or more cleaned snapshots.
+        progress (JobProgress): Optional progress reporter; cancelling it stops the job.
+        use_cache (bool): Reuse previously parsed copies of unchanged snapshots.
+        output_dir (str): Optional directory for the reports (defaults to the current directory).
+        label (str): Optional text used in the file names instead of the current time.
+        engine (str): CSV engine for reading, 'c' (default) or 'pyarrow'.
+        workers (int): Number of worker processes (defaults to the number of CPU cores).
+        stats (JobStats): Optional instrumentation; per-stage stats are always written to a
+            `.stats.json` sidecar next to each report.
+
+    Returns:
+        tuple[str, str, str]: Paths of the Trend, Time to Close and Claimer Throughput reports.
+    """
+    progress = progress or JobProgress()
+    stats = stats or JobStats('trend_report')
+    if len(snapshot_files) < 2:
+        raise ValueError("At least two snapshots are needed for a trend report.")
+
+    # Check every header before any snapshot is loaded
+    for path in snapshot_files:
+        require_columns(path, [CASE_COLUMN, WORK_TYPE_COLUMN, STATUS_COLUMN])
+
+    taken = sorted((snapshot_time(path), path) for path in snapshot_files)
+    snapshot_times = [when for when, _ in taken]
+    workers = min(workers or os.cpu_count() or 1, len(taken))
+
+    counts, opened, closed = [], [], []
+    with stats:
+        with stats.stage('load_and_diff') as stage, job_process_pool(workers) as executor:
+            try:
+                loads = [executor.submit(load_compact_snapshot, path, engine, use_cache) for _, path in taken]
+                rows_read = 0
+                rows_compared = 0
+                previous = None
+                for load in loads:
+                    current = load.result()
+                    rows_read += len(current)
+                    progress.update(ROWS_READ, rows_read)
+                    if previous is not None:
+                        pair_counts, pair_opened, pair_closed = diff_snapshots(previous, current)
+                        counts.append(pair_counts)
+                        opened.append(pair_opened)
+                        closed.append(pair_closed)
+                        rows_compared += len(current)
+                        progress.update(ROWS_COMPARED, rows_compared)
+                    # Only the latest snapshot is kept
+                    previous = current
+                stage.add_rows(rows_read)
+            except BaseException:
+                # Drop queued loads and diffs when the job is cancelled or a snapshot fails
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        with stats.stage('aggregate'):
+            trend = weekly_counts(snapshot_times, counts)
+            close_times = time_to_close(snapshot_times, opened, closed)
+            throughput = claimer_throughput(snapshot_times, closed)
+
+        if label is None:
+            # Get current time in DD-MM-YY- HHMMSS format
+            label = c_time.now().strftime("%m-%d-%y %H%M%S")
+        outputs = {
+            "Trend": (trend, os.path.join(output_dir or '', f"trend_report {label}.csv")),
+            "Time to Close": (close_times, os.path.join(output_dir or '', f"time_to_close_report {label}.csv")),
+            "Claimer Throughput": (throughput, os.path.join(output_dir or '', f"claimer_throughput_report {label}.csv")),
+        }
+        written = 0
+        for name, (df, path) in outputs.items():
+            with stats.stage('to_csv') as stage:
+                write_report(df, path)
+                stage.add_rows(len(df))
+            written += len(df)
+            progress.update(ROWS_WRITTEN, written)
+            print(f"{name} report successfully generated: {path}")
+
+    for name, (df, path) in outputs.items():
+        stats.write_sidecar(path)
+        progress.add_result(name, df)
+    return tuple(path for _, path in outputs.values())
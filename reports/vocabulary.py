@@ -0,0 +1,225 @@
+"""
+Status vocabulary shared by the report jobs.
+
+An export only uses a handful of distinct `Statuses` values ("Open, unassigned",
+"Closed, completed", ...), repeated over every work order. Each distinct value is mapped
+to a canonical state code once and the codes are broadcast to the rows, so deciding
+what changed between two reports is integer work over small code arrays instead of a
+text scan of every row.
+
+Which statuses count as closed, and which state transitions count as a work order
+being closed, reopened or reassigned, is set by a `StateModel`. The default model
+treats any status containing "closed" (in any case) as closed. Another model can be
+loaded from a JSON file named by the CRISIS_CLEANUP_STATE_MODEL environment variable.
+"""
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# Change types assigned by the diff engine
+CHANGE_NEW = 'New Case'
+CHANGE_CLOSED = 'Changed to Closed'
+CHANGE_REOPENED = 'Reopened'
+CHANGE_REASSIGNED = 'Reassigned'
+CHANGE_UNCHANGED = 'Unchanged'
+CHANGE_REMOVED = 'Removed'
+
+# Canonical state codes
+STATE_MISSING = 0
+STATE_OPEN = 1
+STATE_CLOSED = 2
+STATE_NAMES = ['missing', 'open', 'closed']
+
+# Statuses matching this (case-insensitive) regular expression are closed
+DEFAULT_CLOSED_PATTERN = 'closed'
+
+# (old state, new state) -> change type, for work orders present in both reports
+DEFAULT_TRANSITIONS = {
+    (STATE_OPEN, STATE_CLOSED): CHANGE_CLOSED,
+    (STATE_MISSING, STATE_CLOSED): CHANGE_CLOSED,
+    (STATE_CLOSED, STATE_OPEN): CHANGE_REOPENED,
+    (STATE_CLOSED, STATE_MISSING): CHANGE_REOPENED,
+}
+
+# Change types a transition may map to. The reports select work orders by these names
+# (e.g. the Closed Cases report by CHANGE_CLOSED), so a model cannot introduce its own.
+TRANSITION_CHANGES = (CHANGE_CLOSED, CHANGE_REOPENED, CHANGE_REASSIGNED, CHANGE_UNCHANGED)
+
+# New states in which a change of claimer counts as a reassignment
+DEFAULT_REASSIGN_STATES = (STATE_OPEN,)
+
+# Environment variable naming a JSON state model used instead of the default one
+STATE_MODEL_ENV = 'CRISIS_CLEANUP_STATE_MODEL'
+
+# Distinct statuses remembered per model; a malformed export cannot grow the cache past this
+MAX_CACHED_STATUSES = 10_000
+
+
+def distinct_values(values):
+    """
+    Codes and distinct values of a column; categoricals reuse their own codes.
+
+    Returns:
+    tuple[np.ndarray, pd.Index]: Code of each value (-1 where missing) and the distinct values
+    """
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    return codes, pd.Index(uniques, dtype=object)
+
+
+def map_distinct(values, function):
+    """
+    Apply `function` to each distinct non-missing value once and broadcast the results.
+
+    Returns:
+    np.ndarray: Object array of results, None where a value is missing
+    """
+    codes, uniques = distinct_values(values)
+    mapped = np.empty(len(uniques) + 1, dtype=object)
+    mapped[:-1] = [function(value) for value in uniques]
+    mapped[-1] = None
+    return mapped[codes]
+
+
+def _state_code(name):
+    if isinstance(name, int):
+        return name
+    try:
+        return STATE_NAMES.index(name.lower())
+    except ValueError:
+        raise ValueError(f"Unknown state '{name}', expected one of {', '.join(STATE_NAMES)}.") from None
+
+
+class StateModel:
+    """
+    Maps raw statuses to canonical states and state transitions to change types.
+
+    Parameters:
+    closed_pattern (str): Regular expression, matched case-insensitively anywhere in a
+        status, that marks it as closed. Other statuses are open.
+    statuses (dict): Optional raw status -> state name ('open', 'closed') overrides,
+        checked before `closed_pattern`
+    transitions (dict): (old state, new state) -> change type (one of TRANSITION_CHANGES)
+        for work orders present in both reports; other transitions are unchanged.
+        Defaults to `DEFAULT_TRANSITIONS`.
+    reassign_states (iterable): New states in which a change of `Claimed By` is reported
+        as CHANGE_REASSIGNED (when no transition applies)
+
+    Raises:
+    ValueError: For an unknown state name or a change type outside TRANSITION_CHANGES
+    """
+
+    def __init__(self, closed_pattern=DEFAULT_CLOSED_PATTERN, statuses=None, transitions=None,
+                 reassign_states=DEFAULT_REASSIGN_STATES):
+        self.closed_pattern = re.compile(closed_pattern, re.IGNORECASE)
+        self.statuses = {status: _state_code(state) for status, state in (statuses or {}).items()}
+        transitions = DEFAULT_TRANSITIONS if transitions is None else transitions
+        unknown = sorted(set(transitions.values()) - set(TRANSITION_CHANGES))
+        if unknown:
+            names = ', '.join(f"'{change}'" for change in unknown)
+            raise ValueError(f"Unknown change type {names}, expected one of {', '.join(TRANSITION_CHANGES)}.")
+        self.reassign_states = [_state_code(state) for state in reassign_states]
+
+        # Change type of every (old state, new state) pair, as indexes into `changes`
+        self.changes = [CHANGE_UNCHANGED] + sorted(set(transitions.values()))
+        self._transition_table = np.zeros((len(STATE_NAMES), len(STATE_NAMES)), dtype=np.int8)
+        for (old, new), change in transitions.items():
+            self._transition_table[_state_code(old), _state_code(new)] = self.changes.index(change)
+
+        self._states = {}
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load a model from JSON, e.g.
+        {"closed_pattern": "closed|done", "statuses": {"Open, needs follow-up": "open"},
+         "transitions": [["open", "closed", "Changed to Closed"], ["closed", "open", "Reopened"]],
+         "reassign_states": ["open"]}
+        All keys are optional.
+        """
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        transitions = config.get('transitions')
+        if transitions is not None:
+            transitions = {(old, new): change for old, new, change in transitions}
+        return cls(
+            closed_pattern=config.get('closed_pattern', DEFAULT_CLOSED_PATTERN),
+            statuses=config.get('statuses'),
+            transitions=transitions,
+            reassign_states=config.get('reassign_states', DEFAULT_REASSIGN_STATES),
+        )
+
+    def state_of(self, status):
+        """
+        Canonical state of one raw status.
+        """
+        state = self._states.get(status)
+        if state is None:
+            if status in self.statuses:
+                state = self.statuses[status]
+            elif isinstance(status, str):
+                state = STATE_CLOSED if self.closed_pattern.search(status) else STATE_OPEN
+            else:
+                # Missing values are MISSING; anything else that is not text is never closed
+                state = STATE_MISSING if pd.isna(status) else STATE_OPEN
+            if len(self._states) >= MAX_CACHED_STATUSES:
+                self._states.clear()
+            self._states[status] = state
+        return state
+
+    def state_codes(self, statuses):
+        """
+        Canonical state of every status, as an int8 array. Each distinct status is
+        looked up once.
+        """
+        codes, uniques = distinct_values(statuses)
+        lookup = np.empty(len(uniques) + 1, dtype=np.int8)
+        lookup[:-1] = [self.state_of(status) for status in uniques]
+        lookup[-1] = STATE_MISSING
+        return lookup[codes]
+
+    def is_closed(self, statuses):
+        """
+        Whether each status is a closed status, as a boolean array.
+        """
+        return self.state_codes(statuses) == STATE_CLOSED
+
+    def classify(self, old_states, new_states, claimer_changed=None):
+        """
+        Change type of work orders present in both reports, from their old and new states.
+
+        Parameters:
+        old_states (np.ndarray): State codes in the old report
+        new_states (np.ndarray): State codes in the new report, aligned with `old_states`
+        claimer_changed (np.ndarray): Optional boolean array, True where `Claimed By` changed
+
+        Returns:
+        np.ndarray: Change type of each work order
+        """
+        change_codes = self._transition_table[old_states, new_states]
+        changes = self.changes
+        if claimer_changed is not None and self.reassign_states:
+            reassigned = claimer_changed & (change_codes == 0) & np.isin(new_states, self.reassign_states)
+            changes = changes + [CHANGE_REASSIGNED]
+            change_codes = np.where(reassigned, len(changes) - 1, change_codes)
+        return np.asarray(changes)[change_codes]
+
+
+_default_model = None
+
+
+def default_state_model():
+    """
+    The model used when none is given: loaded from the file named by
+    CRISIS_CLEANUP_STATE_MODEL if set, otherwise the built-in default. Loaded once per process.
+    """
+    global _default_model
+    if _default_model is None:
+        path = os.environ.get(STATE_MODEL_ENV)
+        _default_model = StateModel.from_file(path) if path else StateModel()
+    return _default_model
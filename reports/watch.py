@@ -0,0 +1,265 @@
+"""
+Watch a folder for new Crisis Cleanup exports and report on each one as it arrives.
+
+Every export that lands in the folder is cleaned with CSV Cleanup, and the cleaned
+snapshot is diffed against the previous one with the weekly report. Files are picked up
+by polling, so this works the same on local disks and network shares.
+"""
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime as c_time
+from pathlib import Path
+
+from reports import csv_cleanup, weekly_report
+from reports.cache import file_digest
+from reports.instrumentation import JobStats
+
+
+# Seconds between scans of the watched folder
+DEFAULT_INTERVAL = 1.0
+
+# Seconds a file's size and mtime must stay unchanged before it counts as fully downloaded
+DEFAULT_SETTLE_SECONDS = 2.0
+
+# Exports queued or being processed at once; further arrivals wait for the next scan
+DEFAULT_QUEUE_SIZE = 8
+
+# Scans a settled file may fail to be read before it is given up on until it changes
+MAX_DIGEST_ATTEMPTS = 5
+
+# Record of processed exports, kept in the output directory
+STATE_FILE = '.watch_state.json'
+
+
+def _load_state(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'processed': {}, 'failed': [], 'latest': None}
+
+
+def _save_state(path, state):
+    # Write then rename so a crash never leaves a half-written state file behind
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _ignore_interrupt():
+    # Ctrl+C is handled by the watcher, which lets running jobs finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class ExportWatcher:
+    """
+    Polls a folder and runs CSV Cleanup, then the weekly report against the previous
+    snapshot, for each new export.
+
+    A file is only picked up once its size and mtime have stayed the same for
+    `settle_seconds`, so exports still being downloaded are left alone. Files are
+    identified by content hash: a copy or re-download of an export that has already
+    been processed is skipped, and so is an export that failed until its content
+    changes. The hashes and the latest export and its cleaned snapshot are kept in `.watch_state.json`
+    in the output directory, so a restarted watcher carries on where it stopped.
+
+    Cleanups run in a process pool with at most `queue_size` exports queued or in
+    progress. Cleanups may finish in any order, but snapshots are chained in the order
+    the exports arrived, so each weekly report compares an export with the one before it.
+
+    Parameters:
+    watch_dir (str): Folder the exports are downloaded to
+    output_dir (str): Folder for cleaned snapshots and reports (must differ from `watch_dir`)
+    interval (float): Seconds between scans
+    settle_seconds (float): Seconds a file must stay unchanged before it is processed
+    queue_size (int): Maximum number of exports queued or in progress
+    workers (int): Number of worker processes (defaults to the number of CPU cores)
+    use_cache (bool): Reuse parsed copies of unchanged files
+    engine (str): CSV engine for reading, 'c' (default) or 'pyarrow'
+    compact (bool): Clean exports with the compact representation (lower peak memory)
+    output_format (str): Format of the weekly reports; cleaned snapshots are always CSV,
+        since they are the next report's input
+    """
+
+    def __init__(self, watch_dir, output_dir, interval=DEFAULT_INTERVAL, settle_seconds=DEFAULT_SETTLE_SECONDS,
+                 queue_size=DEFAULT_QUEUE_SIZE, workers=None, use_cache=True, engine=None, compact=False,
+                 output_format=None):
+        if Path(watch_dir).resolve() == Path(output_dir).resolve():
+            raise ValueError("The output directory must differ from the watched folder.")
+        self.watch_dir = watch_dir
+        self.output_dir = output_dir
+        self.interval = interval
+        self.settle_seconds = settle_seconds
+        self.queue_size = max(queue_size, 1)
+        self.workers = workers or os.cpu_count() or 1
+        self.use_cache = use_cache
+        self.engine = engine
+        self.compact = compact
+        self.output_format = output_format
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+        self.state = _load_state(self.state_path)
+
+        # Path -> (size, mtime_ns, monotonic time that signature was first seen)
+        self._candidates = {}
+        # Path -> (size, mtime_ns) of files already hashed, so they are not hashed again
+        self._seen = {}
+        # Path -> failed attempts to hash a settled file
+        self._digest_failures = {}
+        # (export path, digest, future) in arrival order, and (label, future) of weekly reports
+        self._cleanups = deque()
+        self._weeklies = []
+
+    def _settled_files(self):
+        """
+        Exports in the folder that have stopped changing and have not been looked at yet,
+        oldest first.
+        """
+        now = time.monotonic()
+        settled = []
+        present = set()
+        with os.scandir(self.watch_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith('.csv'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                present.add(entry.path)
+                if not stat.st_size:
+                    # Download not started yet
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if self._seen.get(entry.path) == signature:
+                    continue
+                known = self._candidates.get(entry.path)
+                if known is None or known[:2] != signature:
+                    self._candidates[entry.path] = (*signature, now)
+                    self._digest_failures.pop(entry.path, None)
+                elif now - known[2] >= self.settle_seconds:
+                    settled.append((stat.st_mtime_ns, entry.path, signature))
+
+        # Forget files that were moved or deleted
+        for known in (self._candidates, self._seen, self._digest_failures):
+            for path in [path for path in known if path not in present]:
+                del known[path]
+        return [(path, signature) for _, path, signature in sorted(settled)]
+
+    def _queued_digests(self):
+        return {digest for _, digest, _ in self._cleanups}
+
+    def _submit_new(self, executor):
+        for path, signature in self._settled_files():
+            if len(self._cleanups) + len(self._weeklies) >= self.queue_size:
+                # Left as a candidate; it is picked up by a later scan
+                break
+            try:
+                digest = file_digest(path)
+            except OSError as e:
+                # Usually still locked by the program downloading it; retried on the next scans
+                self._digest_failures[path] = self._digest_failures.get(path, 0) + 1
+                if self._digest_failures[path] >= MAX_DIGEST_ATTEMPTS:
+                    # Left alone until it changes, so the watcher does not wait on it forever
+                    print(f"FAILED read {path}: {e}", file=sys.stderr)
+                    del self._candidates[path]
+                    del self._digest_failures[path]
+                    self._seen[path] = signature
+                continue
+            del self._candidates[path]
+            self._digest_failures.pop(path, None)
+            self._seen[path] = signature
+            if digest in self.state['failed']:
+                print(f"skip   {path}: failed before and has not changed since")
+                continue
+            if digest in self.state['processed'] or digest in self._queued_digests():
+                print(f"skip   {path}: already processed")
+                continue
+
+            # Prefix the snapshot with its export's name so exports cleaned together never collide
+            current_time = c_time.now().strftime("%m-%d-%y %H%M%S")
+            output_file = os.path.abspath(
+                os.path.join(self.output_dir, f"{Path(path).stem} csv_cleanup {current_time}.csv")
+            )
+            future = executor.submit(
+                csv_cleanup.generate_csv_cleanup, path, use_cache=self.use_cache, output_file=output_file,
+                engine=self.engine, stats=JobStats('csv_cleanup'), compact=self.compact,
+            )
+            self._cleanups.append((path, digest, future))
+            print(f"queued {path}")
+
+    def _collect(self, executor):
+        """
+        Record finished cleanups in arrival order, start their weekly reports and report
+        finished weekly reports.
+        """
+        while self._cleanups and self._cleanups[0][2].done():
+            path, digest, future = self._cleanups.popleft()
+            try:
+                cleaned = future.result()
+            except Exception as e:
+                print(f"FAILED cleanup {path}: {e}", file=sys.stderr)
+                self.state['failed'].append(digest)
+                _save_state(self.state_path, self.state)
+                continue
+            print(f"done   cleanup {path} -> {cleaned}")
+
+            previous = self.state['latest']
+            if previous and os.path.exists(previous['cleaned']):
+                # Timestamped like the other reports, so a re-download under the same name
+                # does not overwrite the earlier reports
+                current_time = c_time.now().strftime("%m-%d-%y %H%M%S")
+                label = f"{Path(previous['export']).stem} to {Path(path).stem} {current_time}"
+                weekly = executor.submit(
+                    weekly_report.generate_weekly_report, previous['cleaned'], cleaned, use_cache=self.use_cache,
+                    output_dir=self.output_dir, label=label, engine=self.engine,
+                    stats=JobStats('weekly_report'), output_format=self.output_format,
+                )
+                self._weeklies.append((label, weekly))
+            self.state['processed'][digest] = cleaned
+            self.state['latest'] = {'export': path, 'cleaned': cleaned}
+            _save_state(self.state_path, self.state)
+
+        for label, future in [weekly for weekly in self._weeklies if weekly[1].done()]:
+            self._weeklies.remove((label, future))
+            try:
+                outputs = future.result()
+            except Exception as e:
+                print(f"FAILED weekly {label}: {e}", file=sys.stderr)
+            else:
+                print(f"done   weekly {label} -> {', '.join(outputs)}")
+
+    def idle(self):
+        """
+        True when no export is queued or in progress and none is waiting to settle.
+        """
+        return not (self._cleanups or self._weeklies or self._candidates)
+
+    def run(self, stop=None, once=False):
+        """
+        Watch until `stop` (a threading.Event) is set, or with `once` until every export
+        already in the folder has been processed.
+        """
+        stop = stop or threading.Event()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_interrupt) as executor:
+            try:
+                while not stop.is_set():
+                    self._collect(executor)
+                    self._submit_new(executor)
+                    if once and self.idle():
+                        break
+                    stop.wait(self.interval)
+            except BaseException:
+                # Drop queued jobs on Ctrl+C; the ones already running finish first
+                executor.shutdown(cancel_futures=True)
+                raise
+            self._collect(executor)
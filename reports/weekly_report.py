@@ -1,8 +1,184 @@
+import contextlib
+import csv
+import os
+
+import numpy as np
 import pandas as pd
 from datetime import datetime as c_time
 
+from reports.instrumentation import JobStats
+from reports.jobs import JobProgress, ROWS_COMPARED, ROWS_READ, ROWS_WRITTEN
+from reports.schema import read_export, require_columns
+from reports.vocabulary import (
+    CHANGE_CLOSED, CHANGE_NEW, CHANGE_REASSIGNED, CHANGE_REMOVED, CHANGE_REOPENED, CHANGE_UNCHANGED,
+    default_state_model,
+)
+from reports.writer import format_pool, output_path, write_report
+
+
+# Key columns
+CASE_COLUMN = 'Case Number'
+WORK_TYPE_COLUMN = 'Work Types'
+STATUS_COLUMN = 'Statuses'
+
+# Compared when both reports have it, to find reassigned work orders
+CLAIMED_BY_COLUMN = 'Claimed By'
+
+
+def _work_order_keys(df):
+    """
+    Build the (Case Number, Work Types) key index for a cleaned report.
+
+    Missing key values are treated as empty strings so they can still be matched.
+    """
+    return pd.MultiIndex.from_arrays([
+        df[CASE_COLUMN].astype(object).fillna('').astype(str).to_numpy(),
+        df[WORK_TYPE_COLUMN].astype(object).fillna('').astype(str).to_numpy(),
+    ])
+
+
+def is_closed(statuses, model=None):
+    """
+    Whether each status is a closed status under the state model, as a boolean array.
+    """
+    return (model or default_state_model()).is_closed(statuses)
+
+
+def _text(column):
+    return column.astype(object).fillna('').astype(str).to_numpy()
 
-def generate_weekly_report(old_file, new_file):
+
+def diff_reports(df_old, df_new, model=None):
+    """
+    Classify every work order in the new report against the old report in one pass.
+
+    The old report is indexed once by its (Case Number, Work Types) key and each new
+    row is looked up in that index, so no merged frame is built. Statuses are mapped
+    to state codes once per distinct value, and the state model decides which state
+    transitions are closures or reopenings. When both reports have `Claimed By`, a
+    changed claimer is reported as a reassignment.
+
+    Parameters:
+        df_old (pd.DataFrame): Cleaned "old" report.
+        df_new (pd.DataFrame): Cleaned "new" report.
+        model (StateModel): Optional state model (defaults to `default_state_model()`).
+
+    Returns:
+        tuple[pd.Series, pd.DataFrame]: The change type of every row in `df_new`
+        (aligned to its index) and the rows of `df_old` whose key no longer appears in
+        `df_new`.
+    """
+    model = model or default_state_model()
+    old_keys = _work_order_keys(df_old)
+    new_keys = _work_order_keys(df_new)
+
+    # Hash index over the old report; the first occurrence wins for duplicate keys
+    first_occurrence = ~old_keys.duplicated()
+    old_index = old_keys[first_occurrence]
+    old_states = model.state_codes(df_old[STATUS_COLUMN])[first_occurrence]
+
+    # Position of every new row's key in the old report (-1 when missing)
+    positions = old_index.get_indexer(new_keys)
+    matched = positions >= 0
+    old_positions = np.where(matched, positions, 0)
+
+    claimer_changed = None
+    if CLAIMED_BY_COLUMN in df_old.columns and CLAIMED_BY_COLUMN in df_new.columns:
+        old_claimers = _text(df_old[CLAIMED_BY_COLUMN])[first_occurrence]
+        claimer_changed = old_claimers[old_positions] != _text(df_new[CLAIMED_BY_COLUMN])
+
+    change_types = model.classify(old_states[old_positions], model.state_codes(df_new[STATUS_COLUMN]),
+                                  claimer_changed)
+    change_types = np.where(matched, change_types, CHANGE_NEW)
+
+    # Old rows whose key was never seen in the new report
+    seen = np.zeros(len(old_index), dtype=bool)
+    seen[positions[matched]] = True
+    removed = df_old[first_occurrence][~seen]
+
+    return pd.Series(change_types, index=df_new.index, name='Change Type'), removed
+
+
+def compare_reports(df_old, df_new):
+    """
+    Build the New Cases and Changed to Closed report frames from two cleaned reports.
+
+    Parameters:
+        df_old (pd.DataFrame): Cleaned "old" report.
+        df_new (pd.DataFrame): Cleaned "new" report.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: New cases and cases changed to closed, with the
+        new report's columns plus 'Change Type'.
+    """
+    # Ensure the required columns exist
+    for col in [CASE_COLUMN, WORK_TYPE_COLUMN, STATUS_COLUMN]:
+        if col not in df_old.columns or col not in df_new.columns:
+            raise ValueError(f"Column '{col}' missing in one of the files.")
+
+    ### Classify every new row against the old report ###
+    change_types, _ = diff_reports(df_old, df_new)
+
+    # Both reports keep the new file's columns and values, tagged with the change type
+    new_cases = df_new[change_types == CHANGE_NEW].copy()
+    new_cases['Change Type'] = CHANGE_NEW
+
+    changed_to_closed = df_new[change_types == CHANGE_CLOSED].copy()
+    changed_to_closed['Change Type'] = CHANGE_CLOSED
+    return new_cases, changed_to_closed
+
+
+def write_weekly_reports(new_cases, changed_to_closed, progress=None, output_dir=None, label=None, stats=None,
+                         output_format=None, workers=None, executor=None):
+    """
+    Write the New Cases and Closed Cases report CSVs (or another `output_format`).
+
+    Both reports are formatted in `executor`, the calling job's pool, or else in one
+    `format_pool` of `workers` processes (default: in this process).
+
+    Returns:
+        tuple[str, str]: Paths of the New Cases and Closed Cases reports.
+    """
+    progress = progress or JobProgress()
+    stats = stats or JobStats('weekly_report')
+
+    ### Export Results to Separate CSV Files ###
+    if label is None:
+        # Get current time in DD-MM-YY- HHMMSS format
+        label = c_time.now().strftime("%m-%d-%y %H%M%S")
+    new_cases_file = output_path(os.path.join(output_dir or '', f"new_cases_report {label}.csv"), output_format)
+    changed_statuses_file = output_path(
+        os.path.join(output_dir or '', f"closed_cases_report {label}.csv"), output_format
+    )
+
+    if executor is None:
+        pool = format_pool(workers, max(len(new_cases), len(changed_to_closed)))
+    else:
+        pool = contextlib.nullcontext(executor)
+    with pool as executor:
+        # Save New Cases Report
+        with stats.stage('to_csv') as stage:
+            write_report(new_cases, new_cases_file, quoting=csv.QUOTE_ALL, output_format=output_format,
+                         progress=progress, workers=workers, executor=executor)
+            stage.add_rows(len(new_cases))
+        progress.update(ROWS_WRITTEN, len(new_cases))
+        print(f"New Cases report successfully generated: {new_cases_file}")
+
+        # Save Changed Statuses Report
+        with stats.stage('to_csv') as stage:
+            write_report(changed_to_closed, changed_statuses_file, quoting=csv.QUOTE_ALL,
+                         output_format=output_format, progress=progress, workers=workers, executor=executor)
+            stage.add_rows(len(changed_to_closed))
+        progress.update(ROWS_WRITTEN, len(new_cases) + len(changed_to_closed))
+        print(f"Changed Statuses report successfully generated: {changed_statuses_file}")
+
+    progress.add_result("New Cases", new_cases)
+    progress.add_result("Closed Cases", changed_to_closed)
+    return new_cases_file, changed_statuses_file
+
+
+def generate_weekly_report(old_file, new_file, progress=None, use_cache=True, output_dir=None, label=None,
+                           engine=None, stats=None, output_format=None, workers=None):
     """
     Generate two separate reports comparing old and new data:
     - New cases (identified by Case Number and Work Type) in the new_file that do not exist in old_file.
@@ -15,90 +191,53 @@ def generate_weekly_report(old_file, new_file):
     Parameters:
         old_file (str): Path to the cleaned "old" dataset (processed by csv_cleanup.py).
         new_file (str): Path to the cleaned "new" dataset (processed by csv_cleanup.py).
+        progress (JobProgress): Optional progress reporter; cancelling it stops the job.
+        use_cache (bool): Reuse previously parsed copies of unchanged reports.
+        output_dir (str): Optional directory for the reports (defaults to the current directory).
+        label (str): Optional text used in the report file names instead of the current time.
+        engine (str): CSV engine for reading, 'c' (default) or 'pyarrow'.
+        stats (JobStats): Optional instrumentation; per-stage stats are always written to a
+            `.stats.json` sidecar next to each report.
+        output_format (str): 'csv' (default), 'csv.gz', 'csv.zst' or 'parquet'.
+        workers (int): Processes to format reports of a million rows or more in (default:
+            this process).
 
     Output:
         Two CSV files are generated with the results.
-    """
-    # Load both CSV files (input files are already normalized/cleaned)
-    df_old_original = pd.read_csv(old_file, dtype=str)
-    df_new_original = pd.read_csv(new_file, dtype=str)
-
-    # **Step 1: Ensure Columns Are in the Correct Order**
-    # Identify all unique columns across both files
-    column_order = sorted(set(df_old_original.columns) | set(df_new_original.columns))
-
-    # Align both DataFrames to have the same set of columns
-    df_old = df_old_original.reindex(columns=column_order, fill_value="")
-    df_new = df_new_original.reindex(columns=column_order, fill_value="")
-
-    # Specify key columns
-    case_column = 'Case Number'
-    work_type_column = 'Work Types'
-    status_column = 'Statuses'
 
-    # Ensure the required columns exist
-    for col in [case_column, work_type_column, status_column]:
-        if col not in df_old.columns or col not in df_new.columns:
-            raise ValueError(f"Column '{col}' missing in one of the files.")
-
-    ### 2. Find New Cases ###
-    # Create a unique identifier for comparison: Case Number + Work Types
-    df_old['unique_key'] = df_old[case_column] + '_' + df_old[work_type_column]
-    df_new['unique_key'] = df_new[case_column] + '_' + df_new[work_type_column]
-
-    # Locate entries in `new_file` that are not in `old_file` based on the unique_key
-    new_cases = df_new[~df_new['unique_key'].isin(df_old['unique_key'])].copy()
-    # new_df_columns = [col for col in merged_cases.columns if not col.endswith('_old')]
-    df_columns_new_cases = [col for col in df_new_original.columns]
-    new_cases = new_cases[df_columns_new_cases]
-    new_cases['Change Type'] = 'New Case'  # Tag these rows for clarity
-    # new_cases.rename(columns=lambda col: col[:-4] if col.endswith('_new') else col, inplace=True)
-
-    ### 3. Find Cases Changed to "Closed" ###
-    # Match old and new files on `Case Number` AND `Work Type`, including all columns
-    merged_cases = pd.merge(
-        df_old,  # Include all columns from old DataFrame
-        df_new,  # Include all columns from new DataFrame
-        on=[case_column, work_type_column],  # Use variables instead of hardcoded names
-        suffixes=('_old', '_new'),
-        how='inner'  # Only include rows that exist in both files
-    )
-
-    # Identify rows where status changed from non-Closed to Closed
-    changed_to_closed = merged_cases[
-        (~merged_cases[status_column + '_old'].str.contains('Closed', na=False, case=False)) &
-        (merged_cases[status_column + '_new'].str.contains('Closed', na=False, case=False))
-    ].copy()
-
-    # Keep all columns from the new DataFrame (remove _old suffix columns)
-    df_columns_changed_to_closed = [col for col in merged_cases.columns if not col.endswith('_old')]
-    changed_to_closed = changed_to_closed[df_columns_changed_to_closed]
-
-    # Remove "_new" suffix from all column names in changed_to_closed
-    changed_to_closed.rename(columns=lambda col: col[:-4] if col.endswith('_new') else col, inplace=True)
-
-    # Rename the new status column back to original name and add Previous Status
-    changed_to_closed.rename(columns={f"{status_column}_new": status_column}, inplace=True)
-    changed_to_closed = changed_to_closed[df_new_original.columns]
-    # changed_to_closed['Previous Status'] = merged_cases[status_column + '_old']
-    changed_to_closed['Change Type'] = 'Changed to Closed'
-
-    ### 4. Export Results to Separate CSV Files ###
-    # Get current time in DD-MM-YY- HHMMSS format
-    current_time = c_time.now().strftime("%m-%d-%y %H%M%S")
-    new_cases_file = f"new_cases_report {current_time}.csv"
-    changed_statuses_file = f"closed_cases_report {current_time}.csv"
-
-    # Remove unique_key from both DataFrames before saving
-    if 'unique_key' in new_cases.columns:
-        new_cases = new_cases.drop('unique_key', axis=1)
-    if 'unique_key' in changed_to_closed.columns:
-        changed_to_closed = changed_to_closed.drop('unique_key', axis=1)
-
-    # Save New Cases Report
-    new_cases.to_csv(new_cases_file, index=False, quoting=1)
-    print(f"New Cases report successfully generated: {new_cases_file}")
-
-    # Save Changed Statuses Report
-    changed_to_closed.to_csv(changed_statuses_file, index=False, quoting=1)
-    print(f"Changed Statuses report successfully generated: {changed_statuses_file}")
\ No newline at end of file
+    Returns:
+        tuple[str, str]: Paths of the New Cases and Closed Cases reports.
+    """
+    progress = progress or JobProgress()
+    stats = stats or JobStats('weekly_report')
+
+    # Check both headers before either file is loaded, so a wrong file fails immediately
+    for path in (old_file, new_file):
+        require_columns(path, [CASE_COLUMN, WORK_TYPE_COLUMN, STATUS_COLUMN])
+
+    with stats:
+        # Load both CSV files (input files are already normalized/cleaned).
+        # Known export columns use the declared schema; other columns are kept as text.
+        # Only the keys and status of the old report are used, so nothing else is read.
+        with stats.stage('read_csv') as stage:
+            df_old = read_export(old_file, unknown=str, engine=engine, use_cache=use_cache,
+                                 columns=[CASE_COLUMN, WORK_TYPE_COLUMN, STATUS_COLUMN])
+            stage.add_rows(len(df_old))
+        progress.update(ROWS_READ, len(df_old))
+        with stats.stage('read_csv') as stage:
+            df_new = read_export(new_file, unknown=str, engine=engine, use_cache=use_cache)
+            stage.add_rows(len(df_new))
+        progress.update(ROWS_READ, len(df_old) + len(df_new))
+
+        with stats.stage('diff') as stage:
+            new_cases, changed_to_closed = compare_reports(df_old, df_new)
+            stage.add_rows(len(df_new))
+        progress.update(ROWS_COMPARED, len(df_new))
+
+        outputs = write_weekly_reports(new_cases, changed_to_closed, progress=progress, output_dir=output_dir,
+                                       label=label, stats=stats, output_format=output_format, workers=workers)
+
+    # The same stats describe both reports
+    for output in outputs:
+        stats.write_sidecar(output)
+    return outputs
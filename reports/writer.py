@@ -0,0 +1,219 @@
+"""
+Output stage shared by the report jobs.
+
+CSV text is formatted a block of rows at a time and written, in order, through one
+large buffered (and optionally compressed) stream. Very large outputs can have their
+blocks formatted in worker processes while the parent writes finished ones; a job
+writing several reports starts one pool for all of them (see `format_pool`). The text of every block
+comes from `DataFrame.to_csv`, so plain CSV output is byte-identical to a single
+`to_csv` call with the same quoting.
+"""
+import contextlib
+import csv
+import gzip
+import importlib.util
+import itertools
+import math
+import multiprocessing
+import os
+from collections import deque
+
+import pandas as pd
+
+from reports.jobs import job_process_pool
+from reports.schema import pyarrow_available
+
+
+# Output formats. The compressed CSV formats hold the same text as FORMAT_CSV.
+FORMAT_CSV = 'csv'
+FORMAT_CSV_GZIP = 'csv.gz'
+FORMAT_CSV_ZSTD = 'csv.zst'
+FORMAT_PARQUET = 'parquet'
+OUTPUT_FORMATS = [FORMAT_CSV, FORMAT_CSV_GZIP, FORMAT_CSV_ZSTD, FORMAT_PARQUET]
+
+# Rows formatted per block
+FORMAT_BLOCK_ROWS = 100_000
+
+# Outputs with fewer rows are always formatted in this process. A spawned worker takes
+# about 0.6 s to start and import pandas, and shipping a 100k-row block to it and its
+# text back about 0.27 s, against 0.6 s to format the block here, so with two workers
+# the pool only pays for itself a few blocks past its start-up.
+# `python -m benchmarks.run --jobs write` measures it on a given machine.
+PARALLEL_FORMAT_MIN_ROWS = 1_000_000
+
+# Size of the write buffer for plain CSV output
+WRITE_BUFFER_BYTES = 8 * 1024 ** 2
+
+# Compression levels: favour speed, the outputs are written once and read a few times
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def zstd_available():
+    return importlib.util.find_spec('zstandard') is not None or pyarrow_available()
+
+
+def output_path(path, output_format=None):
+    """
+    `path` with its `.csv` suffix replaced by the output format's suffix, so a report keeps
+    its usual timestamped name, e.g. `csv_cleanup 03-14-25 091500.csv.gz`.
+    """
+    output_format = output_format or FORMAT_CSV
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}'.")
+    base = path[:-4] if path.lower().endswith('.csv') else path
+    return f"{base}.{output_format}"
+
+
+def default_process_workers():
+    # Inside a worker process (e.g. one job of the CLI's pool) the cores are already busy
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return os.cpu_count() or 1
+
+
+@contextlib.contextmanager
+def format_pool(workers, rows, block_rows=FORMAT_BLOCK_ROWS):
+    """
+    Process pool to pass to every `write_report` call of a job, so the workers are
+    started once per job rather than once per report.
+
+    Parameters:
+    workers (int): Processes to format blocks in (1 or None: this process)
+    rows (int): Rows of the largest report the job will write
+    block_rows (int): Rows formatted per block; there are never more workers than blocks
+
+    Yields:
+    ProcessPoolExecutor or None: None when the outputs are formatted in this process
+    """
+    workers = min(workers or 1, math.ceil(rows / block_rows))
+    if workers <= 1 or rows < PARALLEL_FORMAT_MIN_ROWS:
+        yield None
+        return
+    with job_process_pool(workers) as executor:
+        yield executor
+
+
+def _format_block(block, quoting, header):
+    return block.to_csv(None, index=False, header=header, quoting=quoting)
+
+
+def _blocks(frames, block_rows):
+    """
+    Split a frame, or each frame of an iterable, into blocks of at most `block_rows` rows.
+    """
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    for frame in frames:
+        if len(frame) <= block_rows:
+            yield frame
+        else:
+            for start in range(0, len(frame), block_rows):
+                yield frame.iloc[start:start + block_rows]
+
+
+def _formatted_blocks(blocks, quoting, workers=1, executor=None, progress=None, rows=None):
+    """
+    CSV text of each block, header first, in order.
+
+    Blocks are formatted here unless the output has at least PARALLEL_FORMAT_MIN_ROWS
+    rows (`rows`, or counted as the blocks are formatted when it is not known). The rest
+    then go to `executor`, or to a pool of at most `workers` processes and never more
+    than there are blocks left, with a bounded number of blocks in flight, so memory
+    stays proportional to the number of workers rather than to the output size.
+    """
+    parallel = (executor is not None or workers > 1) and (rows is None or rows >= PARALLEL_FORMAT_MIN_ROWS)
+    blocks = iter(blocks)
+    header = True
+    formatted = 0
+    for block in blocks:
+        if progress is not None:
+            progress.check_cancelled()
+        yield _format_block(block, quoting, header=header)
+        header = False
+        formatted += len(block)
+        if parallel and (rows is not None or formatted >= PARALLEL_FORMAT_MIN_ROWS):
+            break
+    else:
+        return
+
+    ahead = list(itertools.islice(blocks, max(workers, 1)))
+    if not ahead:
+        return
+    rest = itertools.chain(ahead, blocks)
+    if executor is not None:
+        yield from _pooled_blocks(executor, rest, quoting, workers, progress)
+    else:
+        with job_process_pool(len(ahead)) as pool:
+            yield from _pooled_blocks(pool, rest, quoting, len(ahead), progress)
+
+
+def _pooled_blocks(executor, blocks, quoting, workers, progress):
+    pending = deque()
+    try:
+        for block in blocks:
+            pending.append(executor.submit(_format_block, block, quoting, False))
+            if len(pending) >= 2 * workers:
+                if progress is not None:
+                    progress.check_cancelled()
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def open_output(path, output_format):
+    """
+    Binary stream for a CSV output: buffered for plain CSV, compressed for the csv.gz
+    and csv.zst formats.
+    """
+    if output_format == FORMAT_CSV_GZIP:
+        return gzip.open(path, 'wb', compresslevel=GZIP_LEVEL)
+    if output_format == FORMAT_CSV_ZSTD:
+        if importlib.util.find_spec('zstandard') is not None:
+            import zstandard
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(path, 'wb'), closefd=True)
+        if pyarrow_available():
+            import pyarrow as pa
+            return pa.output_stream(path, compression='zstd')
+        raise ValueError("zstd output needs the 'zstandard' or 'pyarrow' package to be installed.")
+    return open(path, 'wb', buffering=WRITE_BUFFER_BYTES)
+
+
+def write_report(frames, path, quoting=csv.QUOTE_MINIMAL, output_format=None, workers=1,
+                 block_rows=FORMAT_BLOCK_ROWS, progress=None, executor=None):
+    """
+    Write a report without the index.
+
+    Parameters:
+    frames (pd.DataFrame or iterable of pd.DataFrame): The report, whole or in consecutive
+        blocks with the same columns (e.g. `CompactReport.iter_frames()`)
+    path (str): Output path, already carrying the format's suffix (see `output_path`)
+    quoting (int): csv.QUOTE_MINIMAL or csv.QUOTE_ALL
+    output_format (str): One of OUTPUT_FORMATS (default plain CSV)
+    workers (int): Processes formatting blocks (default 1: formatted in this process), or
+        the size of `executor`. Outputs of fewer than PARALLEL_FORMAT_MIN_ROWS rows are
+        always formatted in this process.
+    block_rows (int): Rows formatted per block
+    progress (JobProgress): Optional; the write stops between blocks if it is cancelled
+    executor (ProcessPoolExecutor): Optional pool of the calling job (see `format_pool`),
+        used instead of starting one for this output
+    """
+    output_format = output_format or FORMAT_CSV
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}'.")
+
+    if output_format == FORMAT_PARQUET:
+        if not pyarrow_available():
+            raise ValueError("Parquet output needs the 'pyarrow' package to be installed.")
+        # Parquet needs the whole table at once
+        frame = frames if isinstance(frames, pd.DataFrame) else pd.concat(list(frames))
+        frame.to_parquet(path, index=False)
+        return
+
+    rows = len(frames) if isinstance(frames, pd.DataFrame) else None
+    with open_output(path, output_format) as out:
+        for text in _formatted_blocks(_blocks(frames, block_rows), quoting, workers or 1, executor, progress, rows):
+            out.write(text.encode('utf-8'))
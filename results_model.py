@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+# Rows handed to the view per fetchMore() call
+FETCH_BATCH_SIZE = 1000
+
+
+def _contains(series, text):
+    """
+    Case-insensitive substring match over a column, as a boolean array.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Match each distinct value once and broadcast through the codes
+        categories = series.cat.categories.astype(str)
+        matched = np.append(categories.str.contains(text, case=False, regex=False), False)
+        return matched[series.cat.codes.to_numpy()]
+    return series.astype(str).str.contains(text, case=False, regex=False).to_numpy() & series.notna().to_numpy()
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """
+    Read-only table model over a report frame of any size.
+
+    The view only ever asks for the rows it shows: rows are exposed in batches through
+    canFetchMore()/fetchMore(), and cells are formatted when painted. Filtering and
+    sorting work on an array of row positions into the frame, so the frame itself is
+    never copied.
+    """
+
+    def __init__(self, frame=None, parent=None):
+        super().__init__(parent)
+        self._frame = pd.DataFrame()
+        self._rows = np.arange(0)
+        self._loaded = 0
+        self._filters = {}
+        self._sort = None
+        if frame is not None:
+            self.set_frame(frame)
+
+    def set_frame(self, frame):
+        self.beginResetModel()
+        self._frame = frame
+        self._filters = {}
+        self._sort = None
+        self._rows = np.arange(len(frame))
+        self._loaded = min(len(self._rows), FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def matching_rows(self):
+        """
+        Number of rows left after filtering (the view may not have fetched them all yet).
+        """
+        return len(self._rows)
+
+    def total_rows(self):
+        return len(self._frame)
+
+    def set_filters(self, filters):
+        """
+        Show only rows where each column contains its filter text (case-insensitive).
+
+        Parameters:
+        filters (dict): Column name to filter text; empty texts are ignored
+        """
+        filters = {column: text for column, text in filters.items() if text}
+        if filters != self._filters:
+            self._filters = filters
+            self._refresh()
+
+    def _refresh(self):
+        self.beginResetModel()
+        mask = np.ones(len(self._frame), dtype=bool)
+        for column, text in self._filters.items():
+            if column in self._frame.columns:
+                mask &= _contains(self._frame[column], text)
+        rows = np.flatnonzero(mask)
+        if self._sort is not None:
+            rows = self._sorted(rows, *self._sort)
+        self._rows = rows
+        self._loaded = min(len(rows), FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def _sorted(self, rows, column, order):
+        values = self._frame.iloc[rows, column].reset_index(drop=True)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Sort by the text of the values, not by the order categories were first seen
+            values = values.cat.reorder_categories(values.cat.categories.sort_values())
+        positions = values.sort_values(
+            ascending=order == Qt.SortOrder.AscendingOrder, kind='stable', na_position='last'
+        ).index.to_numpy()
+        return rows[positions]
+
+    # QAbstractTableModel interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._frame.columns)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH_SIZE, len(self._rows) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        value = self._frame.iat[self._rows[index.row()], index.column()]
+        return "" if pd.isna(value) else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return str(self._frame.columns[section])
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if not 0 <= column < len(self._frame.columns):
+            return
+        self._sort = (column, order)
+        self._refresh()
@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from reports import cache
+from reports.cache import read_csv_cached
+
+
+def _write_exports(tmp_path, count, rows=2_000):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f'export_{i}.csv'
+        pd.DataFrame({
+            'Case Number': [f'W{i}-{row}' for row in range(rows)],
+            'Latitude': [35.0 + row / rows for row in range(rows)],
+        }).to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def _entries(cache_dir):
+    return [name for name, _, _ in cache._cached_entries(cache_dir)]
+
+
+def _entry_bytes(cache_dir):
+    return sum(size for _, size, _ in cache._cached_entries(cache_dir))
+
+
+def test_reads_from_cache(tmp_path):
+    path, = _write_exports(tmp_path, 1)
+    cache_dir = tmp_path / 'cache'
+    first = read_csv_cached(path, cache_dir=cache_dir, dtype={'Case Number': str})
+    second = read_csv_cached(path, cache_dir=cache_dir, dtype={'Case Number': str})
+    pd.testing.assert_frame_equal(first, second)
+    assert len(_entries(cache_dir)) == 1
+
+    # Other read options are another entry
+    read_csv_cached(path, cache_dir=cache_dir)
+    assert len(_entries(cache_dir)) == 2
+
+
+def test_changed_file_is_parsed_again(tmp_path):
+    path, = _write_exports(tmp_path, 1, rows=10)
+    cache_dir = tmp_path / 'cache'
+    read_csv_cached(path, cache_dir=cache_dir)
+    pd.DataFrame({'Case Number': ['W1'], 'Latitude': [1.0]}).to_csv(path, index=False)
+    assert list(read_csv_cached(path, cache_dir=cache_dir)['Case Number']) == ['W1']
+
+
+def test_evicts_least_recently_used(tmp_path):
+    paths = _write_exports(tmp_path, 3)
+    cache_dir = tmp_path / 'cache'
+    for path in paths:
+        read_csv_cached(path, cache_dir=cache_dir)
+    # Distinct last-use times, whatever the file system's mtime resolution
+    for name in _entries(cache_dir):
+        used = 1_000 * next(i for i, path in enumerate(paths) if name.startswith(cache.file_digest(path)))
+        os.utime(cache_dir / name, (used, used))
+    entry_size = _entry_bytes(cache_dir) // 3
+
+    # Room for two entries: the least recently used goes
+    read_csv_cached(paths[2], cache_dir=cache_dir, max_bytes=2 * entry_size + entry_size // 2)
+    digests = {name.split('-', 1)[0] for name in _entries(cache_dir)}
+    assert digests == {cache.file_digest(path) for path in paths[1:]}
+
+
+def test_concurrent_processes_respect_size_limit(tmp_path):
+    paths = _write_exports(tmp_path, 8)
+    cache_dir = tmp_path / 'cache'
+
+    with ProcessPoolExecutor(max_workers=8) as executor:
+        frames = list(executor.map(read_csv_cached, paths, [cache_dir] * 8))
+    assert [len(frame) for frame in frames] == [2_000] * 8
+    # Every entry written by any process is on disk and counted
+    assert len(_entries(cache_dir)) == 8
+    entry_size = _entry_bytes(cache_dir) // 8
+
+    # Concurrent readers under a limit of three entries
+    limit = 3 * entry_size + entry_size // 2
+    with ProcessPoolExecutor(max_workers=8) as executor:
+        list(executor.map(read_csv_cached, paths, [cache_dir] * 8, [limit] * 8))
+    assert _entry_bytes(cache_dir) <= limit
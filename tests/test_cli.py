@@ -0,0 +1,42 @@
+import os
+
+from reports.cli import expand_csv_paths, main
+
+
+CLEANED = """\
+Case Number,Work Types,Statuses,Claimed By
+W1,muck_out,"Open, unassigned",
+"""
+
+
+def _snapshot_dir(tmp_path):
+    snapshots = tmp_path / 'snapshots'
+    snapshots.mkdir()
+    names = ['csv_cleanup 01-02-25 090000.csv', 'csv_cleanup 12-23-24 090000.csv',
+             'csv_cleanup 12-30-24 090000.csv']
+    for name in names:
+        (snapshots / name).write_text(CLEANED, encoding='utf-8')
+    (snapshots / 'notes.txt').write_text('', encoding='utf-8')
+    return snapshots
+
+
+def test_directory_ordered_by_snapshot_time(tmp_path):
+    snapshots = _snapshot_dir(tmp_path)
+    assert [os.path.basename(path) for path in expand_csv_paths([snapshots], by_time=True)] == [
+        'csv_cleanup 12-23-24 090000.csv', 'csv_cleanup 12-30-24 090000.csv', 'csv_cleanup 01-02-25 090000.csv',
+    ]
+    # By name otherwise; files given one by one keep their order
+    assert os.path.basename(expand_csv_paths([snapshots])[0]) == 'csv_cleanup 01-02-25 090000.csv'
+    files = [str(snapshots / 'csv_cleanup 12-30-24 090000.csv'), str(snapshots / 'csv_cleanup 12-23-24 090000.csv')]
+    assert expand_csv_paths(files, by_time=True) == files
+
+
+def test_weekly_diffs_consecutive_snapshots_across_a_year(tmp_path):
+    snapshots = _snapshot_dir(tmp_path)
+    output_dir = tmp_path / 'out'
+    assert main(['weekly', str(snapshots), '--output-dir', str(output_dir), '--workers', '1', '--no-cache']) == 0
+    reports = sorted(name for name in os.listdir(output_dir) if name.startswith('new_cases_report') and name.endswith('.csv'))
+    assert reports == [
+        'new_cases_report csv_cleanup 12-23-24 090000 to csv_cleanup 12-30-24 090000.csv',
+        'new_cases_report csv_cleanup 12-30-24 090000 to csv_cleanup 01-02-25 090000.csv',
+    ]
@@ -0,0 +1,132 @@
+import io
+
+import pandas as pd
+import pytest
+
+from benchmarks.reference import normalize_rows_loop
+from reports.csv_cleanup import (
+    SORT_COLUMNS, generate_csv_cleanup, normalize_work_orders, normalize_work_orders_compact,
+)
+from reports.quality import (
+    CLAIMER_COUNT_MISMATCH, MISSING_CASE_NUMBER, NO_WORK_TYPES, STATUS_COUNT_MISMATCH, QualityReport,
+)
+from reports.schema import read_export
+from reports.snapshots import SnapshotStore
+
+
+# One row per case the vectorized path has to handle like the loop
+EXPORT = """\
+Case Number,Work Types,Statuses,Claimed By,Name,Latitude
+W1,muck_out|trees,"Open, unassigned|Closed, completed",Org A|Org B,Ann,35.10
+W2,,Open,Org A,No work types,35.2
+W3,muck_out|trees|debris,,,Missing statuses,
+W4,muck_out|trees|debris,"Open, unassigned",Org A,Short statuses and claimers,36.0
+W5,muck_out,"Open, unassigned|Closed, completed",Org A|Org B|Org C,Long lists,36.5
+W6,muck_out||trees,|Open|,|Org A|,Empty entries,37
+W7, muck_out | trees ," Open, assigned | Closed, completed "," Org A | Org B ",Surrounding spaces,37.25
+W8,trees,Open, ,Blank claimer,38
+,muck_out,Open,Org A,No case number,39
+W9,trees,"Closed, completed",Org C,Plain,40
+"""
+
+
+def _read(text, **kwargs):
+    return pd.read_csv(io.StringIO(text), **kwargs)
+
+
+def _as_csv(df):
+    return df.to_csv(index=False)
+
+
+@pytest.mark.parametrize('read_options', [{}, {'dtype': str}], ids=['inferred', 'text'])
+def test_normalize_matches_loop(read_options):
+    df = _read(EXPORT, **read_options)
+    assert _as_csv(normalize_work_orders(df)) == _as_csv(normalize_rows_loop(df))
+
+
+def test_normalize_matches_loop_with_export_schema(tmp_path):
+    path = tmp_path / 'export.csv'
+    path.write_text(EXPORT, encoding='utf-8')
+    df = read_export(path, use_cache=False)
+    assert _as_csv(normalize_work_orders(df)) == _as_csv(normalize_rows_loop(df))
+
+
+def test_normalize_matches_loop_sorted():
+    df = _read(EXPORT)
+    assert _as_csv(normalize_work_orders(df).sort_values(SORT_COLUMNS)) == \
+        _as_csv(normalize_rows_loop(df).sort_values(SORT_COLUMNS))
+
+
+def test_normalize_padding_and_dropping():
+    result = normalize_work_orders(_read(EXPORT, dtype=str)).set_index(['Case Number', 'Work Types'])
+    # Rows without work types are dropped
+    assert 'W2' not in result.index.get_level_values(0)
+    # Short Statuses and Claimed By are padded with missing values
+    assert result.loc[('W4', 'debris'), 'Statuses'] is None
+    assert result.loc[('W4', 'trees'), 'Claimed By'] is None
+    # Entries past the last work type are dropped
+    assert len(result.loc['W5']) == 1
+    # Empty claimer entries are unclaimed; surrounding spaces are stripped
+    assert result.loc[('W6', 'muck_out'), 'Claimed By'] is None
+    assert result.loc[('W6', ''), 'Statuses'] == 'Open'
+    assert result.loc[('W7', 'trees'), 'Statuses'] == 'Closed, completed'
+    assert result.loc[('W7', 'muck_out'), 'Claimed By'] == 'Org A'
+
+
+def test_compact_matches_flat():
+    df = _read(EXPORT, dtype=str)
+    flat = normalize_work_orders(df).sort_values(SORT_COLUMNS)
+    compact = normalize_work_orders_compact(df).sort_values(SORT_COLUMNS)
+    assert _as_csv(pd.concat(list(compact.iter_frames()))) == _as_csv(flat)
+
+
+def test_quality_counts():
+    quality = QualityReport()
+    normalize_work_orders(_read(EXPORT, dtype=str), quality=quality)
+    assert quality.rows == 10
+    assert quality.counts[MISSING_CASE_NUMBER] == 1
+    assert quality.counts[NO_WORK_TYPES] == 1
+    # W3 (none), W4 (short) and W5 (long)
+    assert quality.counts[STATUS_COUNT_MISMATCH] == 3
+    # W4 and W5; W3 has no claimers at all, which is not a mismatch
+    assert quality.counts[CLAIMER_COUNT_MISMATCH] == 2
+    assert [sample['case_number'] for sample in quality.samples[STATUS_COUNT_MISMATCH]] == ['W3', 'W4', 'W5']
+    assert [sample['row'] for sample in quality.samples[NO_WORK_TYPES]] == [2]
+
+
+def _write_export(tmp_path, text=EXPORT, name='export.csv'):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+# Values whose text changes if a mode reads them with another dtype
+TYPED_EXPORT = """\
+Case Number,Work Types,Statuses,Claimed By,Latitude,Postal Code,Household Size,Notes
+W1,muck_out|trees,"Open, unassigned|Closed, completed",Org A,35.10,02134,1.50,x
+W2,trees,Open,,36,02135,2.00,
+W3,debris,"Closed, completed",Org B,,02136,abc,"two
+lines"
+W4,muck_out,Open,Org A,37.25,,3,y
+"""
+
+
+@pytest.mark.parametrize('chunksize', [1, 2, 100])
+def test_streaming_matches_in_memory(tmp_path, chunksize):
+    input_file = _write_export(tmp_path, TYPED_EXPORT)
+    in_memory = generate_csv_cleanup(input_file, use_cache=False, output_file=str(tmp_path / 'in_memory.csv'),
+                                     workers=1)
+    streamed = generate_csv_cleanup(input_file, chunksize=chunksize, output_file=str(tmp_path / 'streamed.csv'))
+    with open(in_memory, 'rb') as a, open(streamed, 'rb') as b:
+        assert a.read() == b.read()
+
+
+def test_streamed_snapshot_matches_in_memory_snapshot(tmp_path):
+    input_file = _write_export(tmp_path, TYPED_EXPORT)
+    store_path = str(tmp_path / 'snapshots.db')
+    generate_csv_cleanup(input_file, use_cache=False, output_file=str(tmp_path / 'csv_cleanup 03-01-25 090000.csv'),
+                         snapshot_store=store_path, workers=1)
+    generate_csv_cleanup(input_file, chunksize=2, output_file=str(tmp_path / 'csv_cleanup 03-08-25 090000.csv'),
+                         snapshot_store=store_path)
+    with SnapshotStore(store_path) as store:
+        assert store.changes(1, 2).empty
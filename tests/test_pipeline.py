@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from reports.csv_cleanup import generate_csv_cleanup
+from reports.pipeline import generate_weekly_report_from_exports
+from reports.quality import NO_WORK_TYPES
+from reports.weekly_report import generate_weekly_report
+
+
+# A week apart: closed, reopened, reassigned, new and removed work orders, plus malformed rows
+OLD_EXPORT = """\
+Case Number,Work Types,Statuses,Claimed By,Name,Postal Code,Latitude,Notes
+W1,muck_out|trees,"Open, unassigned|Open, assigned",|Org A,Ann,02134,35.10,
+W2,debris,"Closed, completed",Org B,Bob,02135,unknown,"two
+lines"
+W3,trees|debris,"Open, assigned",Org A|Org C,Cy,,36,x
+W4,muck_out,"Open, unassigned",,Di,07001,1e-7,
+,trees,Open,,No case number,,,
+W5,,Open,Org A,No work types,,,
+"""
+
+NEW_EXPORT = """\
+Case Number,Work Types,Statuses,Claimed By,Name,Postal Code,Latitude,Notes
+W1,muck_out|trees,"Closed, completed|Open, assigned",Org D|Org A,Ann,02134,35.10,
+W2,debris,"Open, unassigned",,Bob,02135,unknown,"two
+lines"
+W3,trees|debris,"Open, assigned|Closed, completed",Org B|Org C,Cy,,36,x
+W6,muck_out| trees ," Open, unassigned ",Org A,Ed,02136,37.250,new
+,trees,Open,,No case number,,,
+"""
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _exports(tmp_path):
+    exports = []
+    for name, text in (('old', OLD_EXPORT), ('new', NEW_EXPORT)):
+        exports.append(str(tmp_path / f'{name}.csv'))
+        with open(exports[-1], 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+    return exports
+
+
+@pytest.mark.parametrize('compact', [False, True], ids=['flat', 'compact'])
+def test_fused_job_matches_cleanup_then_weekly_report(tmp_path, compact):
+    exports = _exports(tmp_path)
+
+    two_step = tmp_path / 'two_step'
+    two_step.mkdir()
+    cleaned = [
+        generate_csv_cleanup(export, use_cache=False, output_file=str(two_step / f'cleaned_{i}.csv'), workers=1)
+        for i, export in enumerate(exports)
+    ]
+    reports = generate_weekly_report(*cleaned, use_cache=False, output_dir=str(two_step), label='w')
+
+    fused = tmp_path / 'fused'
+    fused.mkdir()
+    outputs = generate_weekly_report_from_exports(*exports, use_cache=False, output_dir=str(fused), label='w',
+                                                  keep_cleaned=True, compact=compact)
+
+    assert len(outputs) == 4
+    for expected, actual in zip(list(reports) + cleaned, outputs):
+        assert _read_bytes(actual) == _read_bytes(expected), actual
+
+
+@pytest.mark.parametrize('keep_cleaned', [False, True])
+def test_fused_job_writes_quality_reports(tmp_path, keep_cleaned):
+    exports = _exports(tmp_path)
+    generate_weekly_report_from_exports(*exports, use_cache=False, output_dir=str(tmp_path), label='w',
+                                        keep_cleaned=keep_cleaned)
+    for name, export in zip(('old', 'new'), exports):
+        cleaned = generate_csv_cleanup(export, use_cache=False, output_file=str(tmp_path / f'cleaned_{name}.csv'),
+                                       workers=1)
+        # The same findings CSV Cleanup reports for the export
+        assert _read_bytes(tmp_path / f'csv_cleanup {name} w.quality.json') == \
+            _read_bytes(cleaned.replace('.csv', '.quality.json'))
+    with open(tmp_path / 'csv_cleanup old w.quality.json', encoding='utf-8') as f:
+        assert json.load(f)['issues'][NO_WORK_TYPES]['count'] == 1
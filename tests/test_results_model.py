@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QModelIndex, Qt
+
+import results_model
+from results_model import ResultsTableModel
+
+
+# Only QtCore is used, so no display is needed
+ASCENDING = Qt.SortOrder.AscendingOrder
+DESCENDING = Qt.SortOrder.DescendingOrder
+
+
+def _frame():
+    return pd.DataFrame({
+        'Case Number': ['W1', 'W2', 'W3', 'W4', 'W5', 'W6', 'W7'],
+        # Categories in first-seen order, not sorted, with a missing value
+        'Work Types': pd.Categorical(['trees', 'muck_out', None, 'Trees', 'debris', 'trees', 'muck_out'],
+                                     categories=['trees', 'muck_out', 'Trees', 'debris']),
+        'Claimed By': ['Org A', np.nan, 'org b', 'Nan Relief', None, 'ORG A', 'Org C'],
+        'Household Size': [3, 1, np.nan, 2, 3, np.nan, 1],
+    })
+
+
+def _column(model, name):
+    column = list(model._frame.columns).index(name)
+    return [model.data(model.index(row, column)) for row in range(model.rowCount())]
+
+
+def _case_numbers(model):
+    return _column(model, 'Case Number')
+
+
+def test_rows_are_fetched_in_batches(monkeypatch):
+    monkeypatch.setattr(results_model, 'FETCH_BATCH_SIZE', 3)
+    model = ResultsTableModel(_frame())
+    assert (model.rowCount(), model.matching_rows(), model.total_rows()) == (3, 7, 7)
+    assert model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 6
+    model.fetchMore()
+    assert model.rowCount() == 7
+    assert not model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 7
+    # A new filter starts again from the first batch
+    model.set_filters({'Claimed By': 'org'})
+    assert (model.rowCount(), model.matching_rows()) == (3, 4)
+    assert model.canFetchMore()
+
+
+def test_child_indexes_have_no_rows():
+    model = ResultsTableModel(_frame())
+    child = model.index(0, 0)
+    assert model.rowCount(child) == 0 and model.columnCount(child) == 0
+    assert not model.canFetchMore(child)
+    assert model.columnCount() == 4
+
+
+def test_filters_are_case_insensitive_and_skip_missing_values():
+    model = ResultsTableModel(_frame())
+    model.set_filters({'Work Types': 'TREES'})
+    assert _case_numbers(model) == ['W1', 'W4', 'W6']
+    # Missing values never match, not even text that looks like their string form
+    model.set_filters({'Claimed By': 'nan'})
+    assert _case_numbers(model) == ['W4']
+    model.set_filters({'Work Types': 'nan'})
+    assert _case_numbers(model) == []
+    # Filters on several columns all apply; empty texts are ignored
+    model.set_filters({'Work Types': 'trees', 'Claimed By': 'org a', 'Household Size': ''})
+    assert _case_numbers(model) == ['W1', 'W6']
+    model.set_filters({'Missing Column': 'x'})
+    assert model.matching_rows() == 7
+
+
+def test_sort_is_stable_with_missing_values_last():
+    model = ResultsTableModel(_frame())
+    model.sort(1, ASCENDING)
+    # By text (capitals first), not by category order; ties keep their order
+    assert _case_numbers(model) == ['W4', 'W5', 'W2', 'W7', 'W1', 'W6', 'W3']
+    model.sort(1, DESCENDING)
+    assert _case_numbers(model) == ['W1', 'W6', 'W2', 'W7', 'W5', 'W4', 'W3']
+    model.sort(3, ASCENDING)
+    assert _case_numbers(model) == ['W2', 'W7', 'W4', 'W1', 'W5', 'W3', 'W6']
+    model.sort(3, DESCENDING)
+    assert _case_numbers(model) == ['W1', 'W5', 'W4', 'W2', 'W7', 'W3', 'W6']
+    assert _column(model, 'Household Size')[-2:] == ['', '']
+
+
+def test_sort_applies_to_filtered_rows():
+    model = ResultsTableModel(_frame())
+    model.set_filters({'Claimed By': 'org'})
+    model.sort(2, DESCENDING)
+    assert _column(model, 'Claimed By') == ['org b', 'Org C', 'Org A', 'ORG A']
+    # The sort is kept when the filter changes
+    model.set_filters({'Claimed By': 'org a'})
+    assert _case_numbers(model) == ['W1', 'W6']
+    model.sort(99)
+    assert _case_numbers(model) == ['W1', 'W6']
+
+
+def test_headers_and_cells():
+    model = ResultsTableModel(_frame())
+    assert model.headerData(2, Qt.Orientation.Horizontal) == 'Claimed By'
+    assert model.headerData(0, Qt.Orientation.Vertical) == '1'
+    assert model.data(model.index(1, 2)) == ''
+    assert model.data(model.index(0, 3)) == '3.0'
+    assert model.data(model.index(0, 0), Qt.ItemDataRole.EditRole) is None
+    assert model.data(QModelIndex()) is None
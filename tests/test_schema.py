@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from reports.csv_cleanup import generate_csv_cleanup
+from reports.schema import ENGINE_PANDAS, ENGINE_PYARROW, pyarrow_available, read_export, require_columns
+from reports.weekly_report import generate_weekly_report
+
+
+pytestmark = pytest.mark.skipif(not pyarrow_available(), reason="needs pyarrow")
+
+# Values that come out differently if the engines parse or write them differently:
+# leading zeros, trailing zeros, whole floats, missing-value markers, quoted line breaks
+OLD_EXPORT = """\
+Case Number,Work Types,Statuses,Claimed By,Postal Code,Latitude,Household Size,Notes
+W1,muck_out|trees,"Open, unassigned|Open, assigned",Org A,02134,35.10,1.50,NA
+W2,debris,"Open, assigned",,02135,36,2.00,None
+W3,trees,"Closed, completed",Org B,,,abc,"two
+lines"
+"""
+
+NEW_EXPORT = """\
+Case Number,Work Types,Statuses,Claimed By,Postal Code,Latitude,Household Size,Notes
+W1,muck_out|trees,"Closed, completed|Open, assigned",Org A,02134,35.10,1.50,NA
+W2,debris,"Closed, completed",,02135,36,2.00,
+W3,trees,"Closed, completed",Org B,,,abc,"two
+lines"
+W4,muck_out,"Open, unassigned",,07001,40.0,3,<NA>
+"""
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_engines_read_the_same_frame(tmp_path):
+    path = _write(tmp_path, 'export.csv', NEW_EXPORT)
+    frames = [read_export(path, unknown=str, engine=engine, use_cache=False)
+              for engine in (ENGINE_PANDAS, ENGINE_PYARROW)]
+    pd.testing.assert_frame_equal(*frames)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_engines_write_the_same_reports(tmp_path, compact):
+    exports = [_write(tmp_path, 'old.csv', OLD_EXPORT), _write(tmp_path, 'new.csv', NEW_EXPORT)]
+    outputs = {}
+    for engine in (ENGINE_PANDAS, ENGINE_PYARROW):
+        out = tmp_path / engine
+        out.mkdir()
+        cleaned = [
+            generate_csv_cleanup(export, use_cache=False, output_file=str(out / f'cleaned_{i}.csv'), engine=engine,
+                                 compact=compact, workers=1)
+            for i, export in enumerate(exports)
+        ]
+        reports = generate_weekly_report(*cleaned, use_cache=False, output_dir=str(out), label='w', engine=engine)
+        outputs[engine] = [_read_bytes(path) for path in cleaned + list(reports)]
+    assert outputs[ENGINE_PANDAS] == outputs[ENGINE_PYARROW]
+    # Values are written as exported
+    assert b'02134,35.10,1.50' in outputs[ENGINE_PYARROW][0]
+
+
+def test_require_columns(tmp_path):
+    path = _write(tmp_path, 'export.csv', "Case Number,Statuses\nW1,Open\n")
+    assert require_columns(path, ['Case Number']) == ['Case Number', 'Statuses']
+    with pytest.raises(ValueError, match="Columns 'Work Types', 'Claimed By' missing in export.csv"):
+        require_columns(path, ['Work Types', 'Case Number', 'Claimed By'])
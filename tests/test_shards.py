@@ -0,0 +1,91 @@
+import io
+
+import pandas as pd
+import pytest
+
+from reports import csv_cleanup, shards
+from reports.csv_cleanup import generate_csv_cleanup
+from reports.shards import shard_offsets
+
+
+HEADER = 'Case Number,Work Types,Statuses,Claimed By,Notes\n'
+
+RECORDS = [
+    'W1,muck_out,Open,Org A,plain\n',
+    'W2,trees,"Closed, completed",Org B,"two\nlines"\n',
+    'W3,debris,Open,,"quote "" and\n""newline"" inside"\n',
+    'W4,trees,Open,Org A,"\n\n\n"\n',
+    'W5,muck_out|trees,"Open|Closed, completed",Org C,"a,b"\n',
+    'W6,trees,Open,Org A,""\n',
+    'W7,debris,Open,Org B,last\n',
+]
+
+
+def _write(tmp_path, text, newline='\n'):
+    path = tmp_path / 'export.csv'
+    path.write_bytes(text.replace('\n', newline).encode('utf-8'))
+    return str(path)
+
+
+def _check_ranges(path, header, ranges):
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data.startswith(header)
+    # Consecutive ranges that cover the body exactly once
+    assert ranges[0][0] == len(header) and ranges[-1][1] == len(data)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    # Each range parses on its own into whole records
+    parts = [pd.read_csv(io.BytesIO(header + data[start:end]), dtype=str) for start, end in ranges]
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), pd.read_csv(path, dtype=str))
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r\n'], ids=['lf', 'crlf'])
+@pytest.mark.parametrize('count', [1, 2, 3, 7, 50])
+def test_ranges_hold_whole_records(tmp_path, newline, count):
+    path = _write(tmp_path, HEADER + ''.join(RECORDS), newline)
+    header, ranges = shard_offsets(path, count)
+    assert len(ranges) <= min(count, len(RECORDS))
+    _check_ranges(path, header, ranges)
+
+
+@pytest.mark.parametrize('block_size', [1, 3, 16])
+def test_quotes_are_tracked_across_scan_blocks(tmp_path, monkeypatch, block_size):
+    monkeypatch.setattr(shards, 'SCAN_BLOCK_SIZE', block_size)
+    path = _write(tmp_path, HEADER + ''.join(RECORDS * 5))
+    header, ranges = shard_offsets(path, 12)
+    assert len(ranges) > 1
+    _check_ranges(path, header, ranges)
+
+
+def test_last_record_without_line_ending(tmp_path):
+    path = _write(tmp_path, HEADER + ''.join(RECORDS).rstrip('\n'))
+    header, ranges = shard_offsets(path, 4)
+    _check_ranges(path, header, ranges)
+
+
+def test_header_only(tmp_path):
+    path = _write(tmp_path, HEADER)
+    assert shard_offsets(path, 4) == (HEADER.encode('utf-8'), [])
+
+
+def _mixed_export(rows=60):
+    # 'Extra' is not in the export schema; its early rows look numeric, its later ones do not
+    lines = ['Case Number,Work Types,Statuses,Claimed By,Extra,Household Size\n']
+    for i in range(rows):
+        extra = ['007', '1.50', '', '3'][i % 4] if i < rows // 2 else ['abc', '2.0', '', 'x y'][i % 4]
+        lines.append(f'W{i:03d},muck_out|trees,"Open, unassigned|Closed, completed",Org {i % 3}|,{extra},'
+                     f'{"" if i % 5 == 0 else i % 7}\n')
+    return ''.join(lines)
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_sharded_cleanup_matches_one_process(tmp_path, monkeypatch, workers):
+    input_file = _write(tmp_path, _mixed_export())
+    single = generate_csv_cleanup(input_file, use_cache=False, output_file=str(tmp_path / 'single.csv'), workers=1)
+    monkeypatch.setattr(csv_cleanup, 'MIN_SHARD_BYTES', 1)
+    assert csv_cleanup._shard_count(input_file, workers) == workers
+    sharded = generate_csv_cleanup(input_file, use_cache=False, output_file=str(tmp_path / 'sharded.csv'),
+                                   workers=workers)
+    with open(single, 'rb') as a, open(sharded, 'rb') as b:
+        assert a.read() == b.read()
+    assert '007' in pd.read_csv(sharded, dtype=str)['Extra'].tolist()
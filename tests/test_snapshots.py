@@ -0,0 +1,129 @@
+import gzip
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from reports.csv_cleanup import generate_csv_cleanup
+from reports.snapshots import SnapshotStore, generate_weekly_report_from_store, snapshot_time
+from reports.weekly_report import CHANGE_CLOSED, CHANGE_NEW, CHANGE_REMOVED, CHANGE_REOPENED
+from reports.writer import FORMAT_CSV_GZIP
+
+
+COLUMNS = ['Case Number', 'Work Types', 'Statuses', 'Claimed By']
+
+WEEKS = [
+    pd.DataFrame([
+        ['W1', 'muck_out', 'Open, unassigned', None],
+        ['W1', 'trees', 'Open, assigned', 'Org A'],
+        ['W2', 'debris', 'Closed, completed', 'Org B'],
+        ['W3', 'trees', 'Open, assigned', 'Org A'],
+    ], columns=COLUMNS),
+    pd.DataFrame([
+        ['W1', 'muck_out', 'Closed, completed', 'Org A'],
+        ['W1', 'trees', 'Open, assigned', 'Org A'],
+        ['W2', 'debris', 'Open, unassigned', None],
+        ['W4', 'muck_out', 'Open, unassigned', None],
+    ], columns=COLUMNS),
+    pd.DataFrame([
+        ['W1', 'muck_out', 'Closed, completed', 'Org A'],
+        ['W1', 'trees', 'Closed, completed', 'Org A'],
+        ['W2', 'debris', 'Open, unassigned', None],
+        ['W4', 'muck_out', 'Open, unassigned', None],
+    ], columns=COLUMNS),
+]
+
+
+def _store(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    for week, df in enumerate(WEEKS):
+        store.ingest(df, label=f'week {week}', taken_at=datetime(2025, 1, 1 + 7 * week))
+    return store
+
+
+def _change_types(changes):
+    return dict(zip(zip(changes['Case Number'], changes['Work Types']), changes['Change Type']))
+
+
+def test_changes_between_consecutive_snapshots(tmp_path):
+    with _store(tmp_path) as store:
+        assert _change_types(store.changes(1, 2)) == {
+            ('W1', 'muck_out'): CHANGE_CLOSED,
+            ('W2', 'debris'): CHANGE_REOPENED,
+            ('W3', 'trees'): CHANGE_REMOVED,
+            ('W4', 'muck_out'): CHANGE_NEW,
+        }
+        # Unchanged work orders are not stored again
+        assert store.changes(2, 3)['Case Number'].tolist() == ['W1']
+
+
+def test_changes_across_several_snapshots(tmp_path):
+    with _store(tmp_path) as store:
+        assert _change_types(store.changes(1, 3)) == {
+            ('W1', 'muck_out'): CHANGE_CLOSED,
+            ('W1', 'trees'): CHANGE_CLOSED,
+            ('W2', 'debris'): CHANGE_REOPENED,
+            ('W3', 'trees'): CHANGE_REMOVED,
+            ('W4', 'muck_out'): CHANGE_NEW,
+        }
+        report = store.report_rows(store.changes(1, 3), CHANGE_CLOSED, 3)
+        assert list(report.columns) == COLUMNS + ['Change Type']
+        assert report['Work Types'].tolist() == ['muck_out', 'trees']
+
+
+def test_snapshots_are_ingested_oldest_first(tmp_path):
+    with _store(tmp_path) as store:
+        with pytest.raises(ValueError, match="older than the latest snapshot"):
+            store.ingest(WEEKS[0], label='late', taken_at=datetime(2025, 1, 2))
+        assert store.latest_snapshot() == 3
+
+
+def test_report_from_store_uses_output_format(tmp_path):
+    _store(tmp_path).close()
+    new_cases_file, closed_file = generate_weekly_report_from_store(
+        str(tmp_path / 'snapshots.db'), 1, 2, output_dir=str(tmp_path), label='week 1', output_format=FORMAT_CSV_GZIP,
+    )
+    assert os.path.basename(closed_file) == 'closed_cases_report week 1.csv.gz'
+    assert pd.read_csv(new_cases_file)['Case Number'].tolist() == ['W4']
+    with gzip.open(closed_file, 'rt', encoding='utf-8') as f:
+        assert f.readline() == '"Case Number","Work Types","Statuses","Claimed By","Change Type"\n'
+
+
+EXPORT = """\
+Case Number,Work Types,Statuses,Claimed By
+W1,muck_out|trees,"Open, unassigned|Closed, completed",Org A
+"""
+
+
+def _export(tmp_path, name, taken_at):
+    path = tmp_path / name
+    path.write_text(EXPORT, encoding='utf-8')
+    os.utime(path, (taken_at.timestamp(), taken_at.timestamp()))
+    return str(path)
+
+
+@pytest.mark.parametrize('chunksize', [None, 1])
+def test_cleanup_snapshots_are_dated_by_export(tmp_path, chunksize):
+    store_path = str(tmp_path / 'snapshots.db')
+    export = _export(tmp_path, 'export.csv', datetime(2025, 3, 1, 9))
+    output_file = str(tmp_path / 'cleaned.csv')
+    generate_csv_cleanup(export, chunksize=chunksize, use_cache=False, output_file=output_file,
+                         snapshot_store=store_path, workers=1)
+    with SnapshotStore(store_path) as store:
+        snapshot = store.snapshots().iloc[0]
+    assert snapshot['taken_at'] == datetime(2025, 3, 1, 9).isoformat()
+    assert snapshot['source_file'] == os.path.abspath(output_file)
+    assert snapshot_time(export) == datetime(2025, 3, 1, 9)
+
+
+@pytest.mark.parametrize('chunksize', [None, 1])
+def test_cleanup_of_older_export_fails_before_writing(tmp_path, chunksize):
+    store_path = str(tmp_path / 'snapshots.db')
+    with SnapshotStore(store_path) as store:
+        store.ingest(WEEKS[0], label='week 0', taken_at=datetime(2025, 3, 8))
+    export = _export(tmp_path, 'export.csv', datetime(2025, 3, 1))
+    with pytest.raises(ValueError, match="older than the latest snapshot"):
+        generate_csv_cleanup(export, chunksize=chunksize, use_cache=False, output_file=str(tmp_path / 'cleaned.csv'),
+                             snapshot_store=store_path, workers=1)
+    assert sorted(os.listdir(tmp_path)) == ['export.csv', 'snapshots.db']
@@ -0,0 +1,131 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from reports.trend_report import (
+    UNCLAIMED, claimer_throughput, diff_snapshots, generate_trend_report, time_to_close, weekly_counts,
+)
+
+
+COLUMNS = ['Case Number', 'Work Types', 'Statuses', 'Claimed By']
+
+OPEN = 'Open, unassigned'
+CLOSED = 'Closed, completed'
+
+# The last gap is two weeks
+TIMES = [datetime(2025, 1, 1), datetime(2025, 1, 8), datetime(2025, 1, 15), datetime(2025, 1, 22),
+         datetime(2025, 2, 5)]
+
+# (case, work type) -> (status, claimer) per snapshot; None where the work order is not in it
+HISTORY = {
+    # Closed in the first week; opened before the first snapshot, so never timed
+    ('A', 'trees'): [(OPEN, None), (CLOSED, 'Org X'), (CLOSED, 'Org X'), (CLOSED, 'Org X'), (CLOSED, 'Org X')],
+    # Reassigned, then closed by nobody
+    ('B', 'debris'): [(OPEN, 'Org X'), (OPEN, 'Org Z'), (CLOSED, ''), (CLOSED, ''), (CLOSED, '')],
+    # Reopened and never closed again
+    ('C', 'muck_out'): [(CLOSED, 'Org Y'), (OPEN, 'Org Y'), (OPEN, 'Org Y'), (OPEN, 'Org Y'), (OPEN, 'Org Y')],
+    # New, closed a week later
+    ('D', 'trees'): [None, (OPEN, None), (CLOSED, 'Org X'), (CLOSED, 'Org X'), (CLOSED, 'Org X')],
+    # Closed, dropped out, appeared again and closed again two weeks later
+    ('E', 'ash'): [(OPEN, None), (CLOSED, 'Org Z'), None, (OPEN, None), (CLOSED, 'Org Z')],
+    # New and never closed
+    ('F', 'ash'): [None, None, None, (OPEN, None), (OPEN, None)],
+    # New, dropped out, new again and closed: timed from its second appearance
+    ('G', 'debris'): [None, (OPEN, None), None, (OPEN, None), (CLOSED, 'Org X')],
+}
+
+
+def _snapshots():
+    snapshots = []
+    for i in range(len(TIMES)):
+        rows = [[case, work_type, *states[i]] for (case, work_type), states in HISTORY.items() if states[i]]
+        df = pd.DataFrame(rows, columns=COLUMNS).replace('', None)
+        snapshots.append(df.astype({column: 'category' for column in COLUMNS[1:]}))
+    return snapshots
+
+
+def _diffs():
+    snapshots = _snapshots()
+    return [diff_snapshots(old, new) for old, new in zip(snapshots, snapshots[1:])]
+
+
+EXPECTED_TREND = pd.DataFrame({
+    'Week Ending': ['2025-01-08', '2025-01-15', '2025-01-22', '2025-02-05'],
+    'Days': [7.0, 7.0, 7.0, 14.0],
+    'Opened': [2, 0, 3, 0],
+    'Closed': [2, 2, 0, 2],
+    'Reopened': [1, 0, 0, 0],
+    'Reassigned': [1, 0, 0, 0],
+    'Removed': [0, 2, 0, 0],
+    'Open Work Orders': [4, 1, 4, 2],
+    'Closed Work Orders': [2, 3, 3, 5],
+})
+
+EXPECTED_TIME_TO_CLOSE = pd.DataFrame({
+    'Work Types': ['ash', 'debris', 'trees'],
+    'Closed': [1, 1, 1],
+    'Median Days': [14.0, 14.0, 7.0],
+    'Mean Days': [14.0, 14.0, 7.0],
+    'Max Days': [14.0, 14.0, 7.0],
+})
+
+EXPECTED_THROUGHPUT = pd.DataFrame({
+    'Claimed By': ['Org X', 'Org Z', UNCLAIMED],
+    '2025-01-08': [1, 1, 0],
+    '2025-01-15': [1, 0, 1],
+    '2025-01-22': [0, 0, 0],
+    '2025-02-05': [1, 1, 0],
+    'Total': [3, 2, 1],
+})
+
+
+def test_weekly_counts():
+    counts = [pair_counts for pair_counts, _, _ in _diffs()]
+    pd.testing.assert_frame_equal(weekly_counts(TIMES, counts), EXPECTED_TREND)
+
+
+def test_opened_and_closed_keys():
+    _, opened, closed = zip(*_diffs())
+    assert [sorted(frame['Case Number']) for frame in opened] == [['D', 'G'], [], ['E', 'F', 'G'], []]
+    assert [sorted(frame['Case Number']) for frame in closed] == [['A', 'E'], ['B', 'D'], [], ['E', 'G']]
+
+
+def test_time_to_close():
+    _, opened, closed = zip(*_diffs())
+    result = time_to_close(TIMES, list(opened), list(closed)).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, EXPECTED_TIME_TO_CLOSE, check_dtype=False)
+
+
+def test_time_to_close_without_closures():
+    _, opened, closed = zip(*_diffs())
+    assert time_to_close(TIMES[2:4], [opened[2]], [closed[2]]).empty
+
+
+def test_claimer_throughput():
+    _, _, closed = zip(*_diffs())
+    pd.testing.assert_frame_equal(claimer_throughput(TIMES, list(closed)), EXPECTED_THROUGHPUT, check_dtype=False)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_generate_trend_report(tmp_path, workers):
+    paths = []
+    for when, df in zip(TIMES, _snapshots()):
+        paths.append(str(tmp_path / f"csv_cleanup {when.strftime('%m-%d-%y %H%M%S')}.csv"))
+        df.to_csv(paths[-1], index=False)
+    # Ordered by when each snapshot was taken, not as given
+    outputs = generate_trend_report(paths[::-1], use_cache=False, output_dir=str(tmp_path), label='t',
+                                    workers=workers)
+    assert [os.path.basename(path) for path in outputs] == [
+        'trend_report t.csv', 'time_to_close_report t.csv', 'claimer_throughput_report t.csv',
+    ]
+    expected = [EXPECTED_TREND, EXPECTED_TIME_TO_CLOSE, EXPECTED_THROUGHPUT]
+    for path, frame in zip(outputs, expected):
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == frame.to_csv(index=False)
+
+
+def test_needs_two_snapshots(tmp_path):
+    with pytest.raises(ValueError, match="At least two snapshots"):
+        generate_trend_report([str(tmp_path / 'one.csv')])
@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from reports import vocabulary
+from reports.vocabulary import (
+    CHANGE_CLOSED, CHANGE_REASSIGNED, CHANGE_REOPENED, CHANGE_UNCHANGED, STATE_CLOSED, STATE_MISSING, STATE_OPEN,
+    StateModel, default_state_model, map_distinct,
+)
+
+
+STATUSES = pd.Series(['Open, unassigned', 'Closed, completed', None, 'CLOSED, duplicate', 'Open, assigned',
+                      'Closed, completed', np.nan, 'Open, needs follow-up'])
+
+
+@pytest.mark.parametrize('categorical', [False, True], ids=['text', 'categorical'])
+def test_state_codes(categorical):
+    statuses = STATUSES.astype('category') if categorical else STATUSES
+    assert StateModel().state_codes(statuses).tolist() == [
+        STATE_OPEN, STATE_CLOSED, STATE_MISSING, STATE_CLOSED, STATE_OPEN, STATE_CLOSED, STATE_MISSING, STATE_OPEN,
+    ]
+
+
+def test_state_of_values_that_are_not_text():
+    model = StateModel()
+    assert model.state_of(3) == STATE_OPEN
+    assert model.state_of(float('nan')) == STATE_MISSING
+
+
+def test_status_overrides_and_pattern():
+    model = StateModel(closed_pattern='completed|done', statuses={'Open, needs follow-up': 'closed'})
+    assert model.is_closed(STATUSES).tolist() == [False, True, False, False, False, True, False, True]
+
+
+def test_classify():
+    model = StateModel()
+    old = np.array([STATE_OPEN, STATE_MISSING, STATE_CLOSED, STATE_CLOSED, STATE_OPEN, STATE_OPEN, STATE_CLOSED])
+    new = np.array([STATE_CLOSED, STATE_CLOSED, STATE_OPEN, STATE_MISSING, STATE_OPEN, STATE_OPEN, STATE_CLOSED])
+    claimer_changed = np.array([True, False, True, False, True, False, True])
+    assert model.classify(old, new, claimer_changed).tolist() == [
+        # A transition wins over a change of claimer
+        CHANGE_CLOSED, CHANGE_CLOSED, CHANGE_REOPENED, CHANGE_REOPENED,
+        CHANGE_REASSIGNED, CHANGE_UNCHANGED,
+        # New claimer of a closed work order is not a reassignment
+        CHANGE_UNCHANGED,
+    ]
+    assert model.classify(old, new).tolist()[4] == CHANGE_UNCHANGED
+
+
+def test_unknown_state_name():
+    with pytest.raises(ValueError, match="Unknown state 'done'"):
+        StateModel(statuses={'Done': 'done'})
+
+
+def test_unknown_change_type():
+    # The Closed Cases report would silently come out empty for a model that never says CHANGE_CLOSED
+    with pytest.raises(ValueError, match="Unknown change type 'Finished'"):
+        StateModel(transitions={('open', 'closed'): 'Finished'})
+
+
+def test_model_from_file(tmp_path, monkeypatch):
+    path = tmp_path / 'model.json'
+    path.write_text(json.dumps({
+        'closed_pattern': 'completed',
+        'transitions': [['open', 'closed', 'Reopened']],
+        'reassign_states': [],
+    }), encoding='utf-8')
+    model = StateModel.from_file(path)
+    codes = model.state_codes(pd.Series(['Open', 'Closed, duplicate', 'Closed, completed']))
+    assert codes.tolist() == [STATE_OPEN, STATE_OPEN, STATE_CLOSED]
+    old = np.array([STATE_OPEN, STATE_CLOSED, STATE_OPEN])
+    new = np.array([STATE_CLOSED, STATE_OPEN, STATE_OPEN])
+    assert model.classify(old, new, np.array([False, False, True])).tolist() == [
+        CHANGE_REOPENED, CHANGE_UNCHANGED, CHANGE_UNCHANGED,
+    ]
+
+    monkeypatch.setattr(vocabulary, '_default_model', None)
+    monkeypatch.setenv(vocabulary.STATE_MODEL_ENV, str(path))
+    assert default_state_model().changes == model.changes
+    assert default_state_model() is default_state_model()
+
+
+def test_status_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(vocabulary, 'MAX_CACHED_STATUSES', 3)
+    model = StateModel()
+    for i in range(10):
+        assert model.state_of(f'Closed {i}') == STATE_CLOSED
+    assert len(model._states) <= 3
+
+
+def test_map_distinct_calls_once_per_value():
+    calls = []
+
+    def upper(value):
+        calls.append(value)
+        return value.upper()
+
+    assert map_distinct(pd.Series(['a', 'b', None, 'a']), upper).tolist() == ['A', 'B', None, 'A']
+    assert calls == ['a', 'b']
@@ -0,0 +1,81 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+from reports import watch
+from reports.watch import MAX_DIGEST_ATTEMPTS, ExportWatcher
+
+
+EXPORT = """\
+Case Number,Work Types,Statuses,Claimed By
+W1,muck_out|trees,"Open, unassigned|Closed, completed",Org A
+W2,debris,"Open, unassigned",
+"""
+
+# The same export a week later: W2 closed, W3 new
+NEXT_EXPORT = EXPORT.replace('debris,"Open, unassigned",', 'debris,"Closed, completed",Org B') + \
+    'W3,trees,"Open, unassigned",\n'
+
+
+class _Clock:
+    """
+    Stands in for datetime in the watcher, one second later on every call.
+    """
+
+    def __init__(self):
+        self.current = datetime(2025, 3, 1, 9)
+
+    def now(self):
+        self.current += timedelta(seconds=1)
+        return self.current
+
+
+def _watcher(tmp_path):
+    (tmp_path / 'downloads').mkdir(exist_ok=True)
+    return ExportWatcher(str(tmp_path / 'downloads'), str(tmp_path / 'reports'), interval=0.01, settle_seconds=0,
+                         workers=1, use_cache=False)
+
+
+def _run_once(watcher):
+    # Fails the test rather than hanging it if the watcher never goes idle
+    stop = threading.Event()
+    timer = threading.Timer(60, stop.set)
+    timer.start()
+    try:
+        watcher.run(stop=stop, once=True)
+    finally:
+        timer.cancel()
+    assert not stop.is_set(), "the watcher did not finish"
+
+
+def _reports(tmp_path, prefix):
+    return sorted(
+        name for name in os.listdir(tmp_path / 'reports') if name.startswith(prefix) and name.endswith('.csv')
+    )
+
+
+def test_unreadable_export_does_not_keep_once_running(tmp_path, monkeypatch, capsys):
+    attempts = []
+
+    def locked(path):
+        attempts.append(path)
+        raise PermissionError(13, 'Permission denied', path)
+
+    monkeypatch.setattr(watch, 'file_digest', locked)
+    watcher = _watcher(tmp_path)
+    (tmp_path / 'downloads' / 'export.csv').write_text(EXPORT, encoding='utf-8')
+    _run_once(watcher)
+    assert len(attempts) == MAX_DIGEST_ATTEMPTS
+    assert 'FAILED read' in capsys.readouterr().err
+
+
+def test_redownload_under_same_name_keeps_earlier_reports(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch, 'c_time', _Clock())
+    watcher = _watcher(tmp_path)
+    # Every week's export is downloaded to the same file name
+    for text in (EXPORT, NEXT_EXPORT, NEXT_EXPORT + 'W4,trees,"Open, unassigned",\n'):
+        (tmp_path / 'downloads' / 'export.csv').write_text(text, encoding='utf-8')
+        _run_once(watcher)
+
+    assert len(_reports(tmp_path, 'new_cases_report export to export')) == 2
+    assert len(_reports(tmp_path, 'closed_cases_report export to export')) == 2
@@ -0,0 +1,132 @@
+import pandas as pd
+
+from reports.csv_cleanup import generate_csv_cleanup
+from reports.pipeline import generate_weekly_report_from_exports
+from reports.vocabulary import StateModel
+from reports.weekly_report import (
+    CHANGE_CLOSED, CHANGE_NEW, CHANGE_REASSIGNED, CHANGE_REOPENED, CHANGE_UNCHANGED, compare_reports, diff_reports,
+    generate_weekly_report,
+)
+
+
+COLUMNS = ['Case Number', 'Work Types', 'Statuses', 'Claimed By']
+
+OLD = pd.DataFrame([
+    ['W1', 'muck_out', 'Open, unassigned', None],
+    ['W1', 'trees', 'Open, assigned', 'Org A'],
+    ['W2', 'debris', 'Closed, completed', 'Org B'],
+    ['W3', 'muck_out', 'Open, assigned', 'Org A'],
+    ['W4', 'trees', 'Open, assigned', 'Org A'],
+    ['W5', 'trees', None, None],
+    # Duplicate key: the first occurrence is the one compared
+    ['W6', 'debris', 'Open, assigned', 'Org A'],
+    ['W6', 'debris', 'Closed, completed', 'Org A'],
+    [None, 'trees', 'Open, assigned', None],
+], columns=COLUMNS)
+
+NEW = pd.DataFrame([
+    ['W1', 'muck_out', 'Closed, completed', 'Org A'],
+    ['W1', 'trees', 'Open, assigned', 'Org A'],
+    ['W2', 'debris', 'Open, unassigned', None],
+    ['W3', 'muck_out', 'Open, assigned', 'Org C'],
+    ['W5', 'trees', 'closed, duplicate', None],
+    ['W6', 'debris', 'Closed, completed', 'Org A'],
+    ['W7', 'muck_out', 'Closed, completed', 'Org A'],
+    [None, 'trees', 'Open, assigned', None],
+], columns=COLUMNS, index=range(10, 18))
+
+
+def test_diff_reports():
+    change_types, removed = diff_reports(OLD, NEW, model=StateModel())
+    assert list(change_types.index) == list(NEW.index)
+    assert list(change_types) == [
+        CHANGE_CLOSED,      # open -> closed
+        CHANGE_UNCHANGED,
+        CHANGE_REOPENED,    # closed -> open
+        CHANGE_REASSIGNED,  # still open, new claimer
+        CHANGE_CLOSED,      # missing status -> closed, in any case
+        CHANGE_CLOSED,      # compared with the first W6 row
+        CHANGE_NEW,
+        CHANGE_UNCHANGED,   # missing case numbers match each other
+    ]
+    assert list(removed['Case Number']) == ['W4']
+
+
+def test_diff_reports_without_claimers():
+    change_types, _ = diff_reports(OLD.drop(columns='Claimed By'), NEW, model=StateModel())
+    # W3 only changed claimer, which is not compared
+    assert change_types[13] == CHANGE_UNCHANGED
+
+
+def test_diff_reports_with_custom_model():
+    model = StateModel(closed_pattern='completed', reassign_states=[])
+    change_types, _ = diff_reports(OLD, NEW, model=model)
+    assert change_types[14] == CHANGE_UNCHANGED
+    assert change_types[13] == CHANGE_UNCHANGED
+
+
+def test_compare_reports():
+    new_cases, changed_to_closed = compare_reports(OLD, NEW)
+    assert list(new_cases['Case Number']) == ['W7']
+    assert list(changed_to_closed['Case Number']) == ['W1', 'W5', 'W6']
+    assert set(changed_to_closed['Change Type']) == {CHANGE_CLOSED}
+    assert list(changed_to_closed.columns) == COLUMNS + ['Change Type']
+
+
+# Coordinates a report must write back as exported: trailing zeros, exponents and text
+COORDINATE_EXPORTS = ["""\
+Case Number,Work Types,Statuses,Claimed By,Latitude,Longitude
+W1,muck_out|trees,"Open, unassigned|Open, assigned",Org A,35.10,-80.500
+W2,debris,"Open, assigned",Org B,unknown,unknown
+W3,trees,"Open, unassigned",,1e-7,-82.0
+""", """\
+Case Number,Work Types,Statuses,Claimed By,Latitude,Longitude
+W1,muck_out|trees,"Closed, completed|Open, assigned",Org A,35.10,-80.500
+W2,debris,"Closed, completed",Org B,unknown,unknown
+W3,trees,"Open, unassigned",,1e-7,-82.0
+W4,muck_out,"Open, unassigned",,36.250,n/a
+"""]
+
+# Written by the original CSV Cleanup and weekly report for COORDINATE_EXPORTS
+COORDINATE_NEW_CASES = (
+    '"Case Number","Work Types","Statuses","Claimed By","Latitude","Longitude","Change Type"\n'
+    '"W4","muck_out","Open, unassigned","","36.250","","New Case"\n'
+)
+COORDINATE_CLOSED_CASES = (
+    '"Case Number","Work Types","Statuses","Claimed By","Latitude","Longitude","Change Type"\n'
+    '"W1","muck_out","Closed, completed","Org A","35.10","-80.500","Changed to Closed"\n'
+    '"W2","debris","Closed, completed","Org B","unknown","unknown","Changed to Closed"\n'
+)
+COORDINATE_CLEANED_NEW = (
+    'Case Number,Work Types,Statuses,Claimed By,Latitude,Longitude\n'
+    'W1,muck_out,"Closed, completed",Org A,35.10,-80.500\n'
+    'W1,trees,"Open, assigned",,35.10,-80.500\n'
+    'W2,debris,"Closed, completed",Org B,unknown,unknown\n'
+    'W3,trees,"Open, unassigned",,1e-7,-82.0\n'
+    'W4,muck_out,"Open, unassigned",,36.250,\n'
+)
+
+
+def _read_text(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def test_coordinates_are_written_as_exported(tmp_path):
+    exports = []
+    for name, text in zip(('old', 'new'), COORDINATE_EXPORTS):
+        exports.append(tmp_path / f'{name}.csv')
+        exports[-1].write_text(text, encoding='utf-8')
+    cleaned = [
+        generate_csv_cleanup(str(export), use_cache=False, output_file=str(tmp_path / f'cleaned_{export.name}'),
+                             workers=1)
+        for export in exports
+    ]
+    assert _read_text(cleaned[1]) == COORDINATE_CLEANED_NEW
+
+    reports = generate_weekly_report(*cleaned, use_cache=False, output_dir=str(tmp_path), label='cleaned')
+    fused = generate_weekly_report_from_exports(*map(str, exports), use_cache=False, output_dir=str(tmp_path),
+                                                label='fused')
+    for new_cases_file, closed_file in (reports, fused):
+        assert _read_text(new_cases_file) == COORDINATE_NEW_CASES
+        assert _read_text(closed_file) == COORDINATE_CLOSED_CASES
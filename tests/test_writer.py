@@ -0,0 +1,121 @@
+import csv
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from reports import writer
+from reports.writer import FORMAT_CSV, FORMAT_CSV_GZIP, format_pool, output_path, write_report
+
+
+def _report(rows=23):
+    # Quotes, separators, line breaks, missing values and numbers all have to survive block by block
+    return pd.DataFrame({
+        'Case Number': [f'W{i}' for i in range(rows)],
+        'Work Types': ['muck_out', 'trees', None, 'debris, "heavy"'] * (rows // 4) + ['trees'] * (rows % 4),
+        'Claimed By': [None if i % 3 else f'Org {i}' for i in range(rows)],
+        'Notes': ['two\nlines' if i % 5 == 0 else '' for i in range(rows)],
+        'Latitude': np.linspace(35.0, 36.0, rows),
+    })
+
+
+def _read(path, opener=open):
+    with opener(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def small_parallel(monkeypatch):
+    # Send the small test reports to worker processes too
+    monkeypatch.setattr(writer, 'PARALLEL_FORMAT_MIN_ROWS', 0)
+
+
+@pytest.fixture
+def pool_sizes(monkeypatch):
+    sizes = []
+    job_process_pool = writer.job_process_pool
+
+    def recording_pool(max_workers):
+        sizes.append(max_workers)
+        return job_process_pool(max_workers)
+
+    monkeypatch.setattr(writer, 'job_process_pool', recording_pool)
+    return sizes
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('quoting', [csv.QUOTE_MINIMAL, csv.QUOTE_ALL], ids=['minimal', 'all'])
+def test_blocks_match_single_to_csv(tmp_path, small_parallel, workers, quoting):
+    df = _report()
+    df.to_csv(tmp_path / 'reference.csv', index=False, quoting=quoting)
+    write_report(df, str(tmp_path / 'blocks.csv'), quoting=quoting, workers=workers, block_rows=4)
+    assert _read(tmp_path / 'blocks.csv') == _read(tmp_path / 'reference.csv')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_frames_match_their_concatenation(tmp_path, small_parallel, workers):
+    df = _report()
+    frames = [df.iloc[:1], df.iloc[1:10], df.iloc[10:]]
+    df.to_csv(tmp_path / 'reference.csv', index=False)
+    write_report(iter(frames), str(tmp_path / 'frames.csv'), workers=workers, block_rows=3)
+    assert _read(tmp_path / 'frames.csv') == _read(tmp_path / 'reference.csv')
+
+
+def test_gzip_holds_the_csv_text(tmp_path, small_parallel):
+    df = _report()
+    df.to_csv(tmp_path / 'reference.csv', index=False, quoting=csv.QUOTE_ALL)
+    path = output_path(str(tmp_path / 'report.csv'), FORMAT_CSV_GZIP)
+    assert path.endswith('report.csv.gz')
+    write_report(df, path, quoting=csv.QUOTE_ALL, output_format=FORMAT_CSV_GZIP, workers=2, block_rows=5)
+    assert _read(path, gzip.open) == _read(tmp_path / 'reference.csv')
+
+
+def test_empty_report_has_header_only(tmp_path):
+    df = _report().iloc[:0]
+    write_report(df, str(tmp_path / 'empty.csv'), output_format=FORMAT_CSV)
+    assert _read(tmp_path / 'empty.csv') == df.to_csv(index=False).encode('utf-8')
+
+
+def test_small_reports_are_formatted_here(tmp_path, pool_sizes):
+    df = _report()
+    write_report(df, str(tmp_path / 'small.csv'), workers=4, block_rows=4)
+    assert pool_sizes == []
+    assert _read(tmp_path / 'small.csv') == df.to_csv(index=False).encode('utf-8')
+
+
+def test_workers_capped_at_blocks(tmp_path, small_parallel, pool_sizes):
+    df = _report()
+    # The first of three blocks is formatted here, so two workers are enough
+    write_report(df, str(tmp_path / 'capped.csv'), workers=8, block_rows=10)
+    write_report(iter([df.iloc[:10], df.iloc[10:]]), str(tmp_path / 'frames.csv'), workers=8, block_rows=10)
+    assert pool_sizes == [2, 2]
+    for name in ('capped.csv', 'frames.csv'):
+        assert _read(tmp_path / name) == df.to_csv(index=False).encode('utf-8')
+
+
+def test_frames_of_unknown_size_counted_as_formatted(tmp_path, monkeypatch, pool_sizes):
+    monkeypatch.setattr(writer, 'PARALLEL_FORMAT_MIN_ROWS', 12)
+    df = _report()
+    # 12 rows are formatted here before the remaining 11 go to the pool
+    write_report(iter([df]), str(tmp_path / 'frames.csv'), workers=8, block_rows=3)
+    assert pool_sizes == [4]
+    assert _read(tmp_path / 'frames.csv') == df.to_csv(index=False).encode('utf-8')
+
+
+def test_one_pool_for_every_report_of_a_job(tmp_path, small_parallel, pool_sizes):
+    df = _report()
+    with format_pool(2, len(df), block_rows=4) as executor:
+        assert executor is not None
+        for name in ('first.csv', 'second.csv'):
+            write_report(df, str(tmp_path / name), workers=2, block_rows=4, executor=executor)
+    assert pool_sizes == [2]
+    for name in ('first.csv', 'second.csv'):
+        assert _read(tmp_path / name) == df.to_csv(index=False).encode('utf-8')
+
+
+def test_no_pool_for_small_jobs():
+    with format_pool(8, writer.PARALLEL_FORMAT_MIN_ROWS - 1) as executor:
+        assert executor is None
+    with format_pool(1, writer.PARALLEL_FORMAT_MIN_ROWS) as executor:
+        assert executor is None